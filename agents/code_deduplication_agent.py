@@ -0,0 +1,155 @@
+"""
+Code Deduplication Agent:
+Collapses generated candidates that differ only in comments, docstrings, identifier names or
+formatting. Each candidate is parsed into a canonical form (docstrings and annotations removed,
+locally bound names renamed in order of first use, re-emitted by ast.unparse); candidates with the same
+canonical form are represented by the first of them, with a multiplicity count.
+"""
+
+import ast
+from typing import Dict, List, Optional
+
+from app.utils.helpers import content_hash, normalize_code
+
+# Called by the tests by name, so never renamed
+ENTRY_POINT = "calculate_risk_weight"
+
+
+def _strip_docstrings(tree: ast.AST):
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and node.body:
+            first = node.body[0]
+            if isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant) and isinstance(first.value.value, str):
+                node.body = node.body[1:] or [ast.Pass()]
+
+
+def _bound_names(tree: ast.AST) -> set:
+    # Names the code binds itself; free names (builtins, imported modules) keep their meaning
+    bound = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            bound.add(node.id)
+        elif isinstance(node, ast.arg):
+            bound.add(node.arg)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            bound.add(node.name)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            bound.add(node.name)
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            bound.difference_update((alias.asname or alias.name).split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ClassDef):
+            # Class members are also reached as attributes, which are not renamed
+            for member in node.body:
+                if isinstance(member, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    bound.discard(member.name)
+                for target in ast.walk(member) if isinstance(member, (ast.Assign, ast.AnnAssign, ast.AugAssign)) else []:
+                    if isinstance(target, ast.Name) and isinstance(target.ctx, ast.Store):
+                        bound.discard(target.id)
+    bound.discard(ENTRY_POINT)
+    return bound
+
+
+class _AlphaRenamer(ast.NodeTransformer):
+    def __init__(self, bound: set, defined: set):
+        """
+        Args:
+            bound (set): Names to rename.
+            defined (set): Functions and classes defined in the code; keyword arguments of calls
+                to them name their (renamed) parameters.
+        """
+        self.bound = bound
+        self.defined = defined
+        self.names: Dict[str, str] = {}
+
+    def _rename(self, name: str) -> str:
+        if name not in self.bound:
+            return name
+        if name not in self.names:
+            self.names[name] = f"v{len(self.names)}"
+        return self.names[name]
+
+    def visit_Name(self, node):
+        node.id = self._rename(node.id)
+        return node
+
+    def visit_arg(self, node):
+        node.arg = self._rename(node.arg)
+        node.annotation = None
+        return node
+
+    def _visit_definition(self, node):
+        node.name = self._rename(node.name)
+        if not isinstance(node, ast.ClassDef):
+            node.returns = None
+        return self.generic_visit(node)
+
+    visit_FunctionDef = visit_AsyncFunctionDef = visit_ClassDef = _visit_definition
+
+    def visit_ExceptHandler(self, node):
+        if node.name:
+            node.name = self._rename(node.name)
+        return self.generic_visit(node)
+
+    def visit_Call(self, node):
+        # Only keywords of the code's own functions name renamed parameters; others (sorted(key=...),
+        # round(ndigits=...)) belong to functions defined elsewhere and keep their name
+        if isinstance(node.func, ast.Name) and node.func.id in self.defined:
+            for keyword in node.keywords:
+                if keyword.arg:
+                    keyword.arg = self._rename(keyword.arg)
+        return self.generic_visit(node)
+
+    def visit_Global(self, node):
+        node.names = [self._rename(name) for name in node.names]
+        return node
+
+    visit_Nonlocal = visit_Global
+
+
+def canonical_code(code: str) -> Optional[str]:
+    """
+    Returns the canonical form of a candidate, or None if it does not parse.
+    """
+    try:
+        tree = ast.parse(normalize_code(code))
+    except SyntaxError:
+        return None
+    _strip_docstrings(tree)
+    defined = {
+        node.name for node in ast.walk(tree) if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+    }
+    tree = _AlphaRenamer(_bound_names(tree), defined).visit(tree)
+    return ast.unparse(tree)
+
+
+class CodeDeduplicationAgent:
+    def deduplicate(self, codes: List[str]) -> Dict:
+        """
+        Groups the candidates by canonical form. Candidates that do not parse are only grouped
+        with textually identical ones.
+
+        Args:
+            codes (List[str]): Cleaned candidate codes.
+
+        Returns:
+            Dict: "codes" (one representative per group, in order of first occurrence),
+                "multiplicity" (group sizes, aligned with "codes") and "keys" (group keys).
+        """
+        groups: Dict[str, int] = {}
+        result = {"codes": [], "multiplicity": [], "keys": []}
+        for code in codes:
+            key = self.key(code)
+            if key in groups:
+                result["multiplicity"][groups[key]] += 1
+                continue
+            groups[key] = len(result["codes"])
+            result["codes"].append(code)
+            result["multiplicity"].append(1)
+            result["keys"].append(key)
+        return result
+
+    @staticmethod
+    def key(code: str) -> str:
+        canonical = canonical_code(code)
+        return content_hash("ast", canonical) if canonical is not None else content_hash("text", normalize_code(code))
@@ -4,25 +4,44 @@ Generates Python code to compute risk weights based on Basel III regulatory text
 """
 
 import os
+import re
+from concurrent.futures import as_completed
 from dotenv import load_dotenv
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
 from langchain_openai import ChatOpenAI
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from app.services.llm_cache import response_cache_for
 from prompts.code_generation_prompt import code_gen_prompt
+from prompts.code_repair_prompt import code_repair_prompt
 
 load_dotenv()
 
 class CodeGenerationAgent:
-    def __init__(self, model_name: str = "gpt-4o", temperature: float = 1.0):
+    def __init__(self, model_name: str = "gpt-4o", temperature: float = 1.0, max_concurrency: int = 10):
         """
         Initializes the code generation agent with an LLM.
+
+        Args:
+            model_name (str): The OpenAI model to use.
+            temperature (float): The randomness level for responses.
+            max_concurrency (int): Maximum number of LLM calls in flight at once.
         """
         self.llm = ChatOpenAI(
             model=model_name,
             temperature=temperature,
-            api_key=os.getenv("OPENAI_API_KEY")
+            api_key=os.getenv("OPENAI_API_KEY"),
+            cache=response_cache_for(temperature)
         )
+        self.max_concurrency = max_concurrency
 
-    def generate_code_variants(self, regulatory_text: str, assumptions: str, input_variables: str, num_variants: int = 3) -> List[str]:
+    def generate_code_variants(
+        self,
+        regulatory_text: str,
+        assumptions: str,
+        input_variables: str,
+        num_variants: int = 3,
+        concurrent: bool = True
+    ) -> List[str]:
         """
         Generates multiple code implementations based on the same input.
 
@@ -30,20 +49,160 @@ class CodeGenerationAgent:
             regulatory_text (str): Basel III regulation section.
             assumptions (str): Domain assumptions.
             input_variables (List[str]): List of variable names in order.
-            count (int): Number of code variants to generate.
+            num_variants (int): Number of code variants to generate.
+            concurrent (bool): Issue the calls concurrently (bounded by max_concurrency)
+                instead of one after another.
 
         Returns:
-            List[str]: A list of generated Python function strings.
+            List[str]: A list of generated Python function strings, in request order.
+                In concurrent mode, failed calls are dropped and the remaining variants are kept.
         """
+        prompt = code_gen_prompt.format(
+            regulatory_text=regulatory_text,
+            assumptions=assumptions,
+            input_variables=input_variables
+        )
+
+        if not concurrent:
+            return [self.llm.invoke(prompt) for _ in range(num_variants)]
+
+        # batch() keeps the input order and, with return_exceptions, isolates failing calls
+        responses = self.llm.batch(
+            [prompt] * num_variants,
+            config={"max_concurrency": self.max_concurrency},
+            return_exceptions=True
+        )
+
         generated_codes = []
+        for idx, response in enumerate(responses, start=1):
+            if isinstance(response, Exception):
+                print(f"⚠️ Code variant {idx} failed: {response}")
+                continue
+            generated_codes.append(response)
+
+        return generated_codes
+
+    def stream_code_variants(
+        self,
+        regulatory_text: str,
+        assumptions: str,
+        input_variables: str,
+        num_variants: int = 3,
+        max_concurrency: int = None
+    ) -> Iterator[Tuple[int, object]]:
+        """
+        Generates code variants concurrently and yields each one as soon as it arrives.
+        Closing the generator cancels every call that has not started yet.
+
+        Args:
+            num_variants (int): Maximum number of code variants to generate.
+            max_concurrency (int): Calls in flight at once (defaults to the agent's limit).
+                Lower values let an early stop save more calls.
+
+        Yields:
+            Tuple[int, object]: (variant index, LLM response), in completion order.
+        """
+        prompt = code_gen_prompt.format(
+            regulatory_text=regulatory_text,
+            assumptions=assumptions,
+            input_variables=input_variables
+        )
+
+        executor = ContextThreadPoolExecutor(max_workers=max_concurrency or self.max_concurrency)
+        futures = {executor.submit(self.llm.invoke, prompt): idx for idx in range(num_variants)}
+        try:
+            for future in as_completed(futures):
+                idx = futures[future]
+                try:
+                    response = future.result()
+                except Exception as exc:
+                    print(f"⚠️ Code variant {idx + 1} failed: {exc}")
+                    continue
+                yield idx, response
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
-        for _ in range(num_variants):
-            prompt = code_gen_prompt.format(
+    def repair_code_variants(
+        self,
+        regulatory_text: str,
+        assumptions: str,
+        input_variables: str,
+        failure_reports: Dict[str, Dict],
+        test_cases: List[str] = None,
+        num_candidates: int = 3,
+        token_budget: Optional[int] = None
+    ) -> Tuple[List[str], int]:
+        """
+        Repairs the most promising failed candidates, showing the model the source of each failing
+        test together with its observed result.
+
+        Args:
+            failure_reports (Dict[str, Dict]): Execution report by code ID, as produced by
+                ExecutionTestingAgent.run_tests ("code", "report", "failures", "individual_test_results").
+            test_cases (List[str]): The test suite the reports refer to (indexed by "failures").
+            num_candidates (int): How many candidates to repair (those passing the most tests first).
+            token_budget (int): Candidates whose estimated cost would exceed this many tokens are skipped.
+
+        Returns:
+            Tuple:
+                - repaired: Repaired code responses, in order of promise.
+                - tokens_used: Tokens consumed by the repair calls.
+        """
+        def pass_ratio(entry: Dict) -> float:
+            results = entry.get("individual_test_results") or []
+            return sum(results) / len(results) if results else 0.0
+
+        ranked = sorted((entry for entry in failure_reports.values() if entry.get("code")), key=pass_ratio, reverse=True)
+
+        prompts = []
+        estimated_tokens = 0
+        for entry in ranked[:num_candidates]:
+            prompt = code_repair_prompt.format(
                 regulatory_text=regulatory_text,
                 assumptions=assumptions,
-                input_variables=input_variables
+                input_variables=input_variables,
+                code=entry["code"],
+                failing_tests=self._describe_failures(entry, test_cases or [])
             )
-            response = self.llm.invoke(prompt)
-            generated_codes.append(response)
+            # Rough estimate (~4 characters per token) of prompt plus a rewritten function
+            estimate = (len(prompt) + len(entry["code"])) // 4
+            if token_budget is not None and estimated_tokens + estimate > token_budget:
+                break
+            estimated_tokens += estimate
+            prompts.append(prompt)
+
+        if not prompts:
+            return [], 0
+
+        responses = self.llm.batch(
+            prompts,
+            config={"max_concurrency": self.max_concurrency},
+            return_exceptions=True
+        )
 
-        return generated_codes
\ No newline at end of file
+        repaired = []
+        tokens_used = 0
+        for prompt, response in zip(prompts, responses):
+            if isinstance(response, Exception):
+                print(f"⚠️ Code repair failed: {response}")
+                continue
+            usage = getattr(response, "usage_metadata", None) or {}
+            tokens_used += usage.get("total_tokens") or (len(prompt) + len(response.content)) // 4
+            repaired.append(response)
+
+        return repaired, tokens_used
+
+    def _describe_failures(self, entry: Dict, test_cases: List[str], max_tests: int = 5) -> str:
+        """
+        Lists the failing tests of one candidate: test source and observed result. Falls back to
+        the report when no test ran (e.g. the code did not import).
+        """
+        sections = []
+        for failure in entry.get("failures", [])[:max_tests]:
+            index = failure["test"]
+            source = test_cases[index] if index < len(test_cases) else f"test_case_{index + 1}"
+            source = re.sub(r"```(?:python)?|```", "", source).strip()
+            sections.append(f"```python\n{source}\n```\nObserved: {failure['detail']}")
+        if not sections:
+            return f"```\n{entry.get('report', '')[:3000]}\n```"
+        return "\n\n".join(sections)
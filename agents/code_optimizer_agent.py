@@ -3,6 +3,7 @@ from dotenv import load_dotenv
 from typing import Tuple
 from langchain_openai import ChatOpenAI
 from prompts.code_optimizer_prompt import optimize_prompt
+from app.services.llm_cache import response_cache_for
 
 load_dotenv()
 
@@ -11,7 +12,8 @@ class CodeOptimizerAgent:
         self.llm = ChatOpenAI(
             model=model_name,
             temperature=temperature,
-            api_key=os.getenv("OPENAI_API_KEY")
+            api_key=os.getenv("OPENAI_API_KEY"),
+            cache=response_cache_for(temperature)
         )
     
     def optimize(self, code: str, evaluation_summary: str) -> str:
@@ -1,51 +1,103 @@
 """
 Elo Rating Agent using Cross-Encoder similarity for pairwise ranking of code snippets.
+All pairs are scored in one batched CrossEncoder pass (in both orientations) and the ratings
+are fitted jointly with a Bradley–Terry model, so the result does not depend on pair order.
 """
 
-from typing import List, Tuple
-from sentence_transformers import CrossEncoder
+from typing import List, Optional
 import numpy as np
-import itertools
+
+from app.services.metrics import model_call
+from app.services.model_registry import DEFAULT_CROSS_ENCODER, get_cross_encoder
+
+def outputs_logits(model) -> bool:
+    """
+    Whether a CrossEncoder returns raw logits. sentence-transformers applies the model's configured
+    activation (Sigmoid for single-label models by default) unless that activation is the identity.
+    """
+    activation = getattr(model, "activation_fct", None)
+    return activation is not None and type(activation).__name__ == "Identity"
+
 
 class EloRatingAgent:
-    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2", k: int = 32):
-        self.model = CrossEncoder(model_name)
-        self.k = k  # Elo update factor
+    def __init__(
+        self,
+        model_name: str = DEFAULT_CROSS_ENCODER,
+        batch_size: int = 32,
+        prior: float = 1.0,
+        max_iter: int = 1000,
+        tol: float = 1e-8,
+        epsilon: float = 1e-6,
+        logits: Optional[bool] = None
+    ):
+        """
+        Args:
+            model_name (str): CrossEncoder used to compare two snippets (shared via the model registry).
+            batch_size (int): Number of pairs per CrossEncoder forward pass.
+            prior (float): Virtual drawn games added to every pair; keeps the fit finite
+                when one snippet wins all of its comparisons.
+            max_iter (int): Iteration cap for the Bradley–Terry fit.
+            tol (float): Convergence tolerance on the log-strengths.
+            epsilon (float): Preference probabilities are clipped to [epsilon, 1 - epsilon].
+            logits (bool): The CrossEncoder returns logits, which are mapped through a sigmoid
+                (defaults to the model's configured output activation, see outputs_logits).
+        """
+        self.model = get_cross_encoder(model_name)
+        self.batch_size = batch_size
+        self.prior = prior
+        self.max_iter = max_iter
+        self.tol = tol
+        self.epsilon = epsilon
+        self.logits = outputs_logits(self.model) if logits is None else logits
 
     def initialize_ratings(self, codes: List[str]) -> List[float]:
         return [1000.0 for _ in codes]
-    
-    def _expected_score(self, r1, r2):
-        return 1 / (1 + 10 ** ((r2 - r1) / 400))
-    
-    def _update_rating(self, r1, r2, outcome):
-        expected_r1 = self._expected_score(r1, r2)
-        new_r1 = r1 + self.k * (outcome - expected_r1)
-        return new_r1
-    
+
     def compute_elo_scores(self, codes: List[str]) -> List[float]:
         n = len(codes)
-        ratings = self.initialize_ratings(codes)
+        if n < 2:
+            return self.initialize_ratings(codes)
+
+        # Every ordered pair (i, j), i != j, scored in a single batched call
+        rows, cols = np.where(~np.eye(n, dtype=bool))
+        pairs = [(codes[i], codes[j]) for i, j in zip(rows, cols)]
+        with model_call():
+            scores = np.asarray(self.model.predict(pairs, batch_size=self.batch_size), dtype=float)
+
+        preference = np.zeros((n, n))
+        preference[rows, cols] = self._to_probabilities(scores)
+
+        # P(i beats j): average of "i preferred over j" and "j not preferred over i"
+        wins = (preference + (1.0 - preference.T)) / 2.0
+        np.fill_diagonal(wins, 0.0)
 
-        # Create all pairwise combinations
-        pairs = list(itertools.combinations(range(n), 2))
+        return self._fit_bradley_terry(wins)
 
-        for i, j in pairs:
-            c1, c2 = codes[i], codes[j]
-            score = self.model.predict([(c1, c2)])[0]
+    def _to_probabilities(self, scores: np.ndarray) -> np.ndarray:
+        # Decided once per model, not per batch, so the same output always means the same preference
+        if self.logits:
+            scores = 1.0 / (1.0 + np.exp(-scores))
+        return np.clip(scores, self.epsilon, 1.0 - self.epsilon)
 
-            # Interpret score: > 0.5 → c1 wins, < 0.5 → c2 wins, == 0.5 → draw
-            if score > 0.5:
-                outcome_i, outcome_j = 1, 0
-            elif score < 0.5:
-                outcome_i, outcome_j = 0, 1
-            else:
-                outcome_i = outcome_j = 0.5
+    def _fit_bradley_terry(self, wins: np.ndarray) -> List[float]:
+        """
+        Fits Bradley–Terry strengths with the MM algorithm (Hunter, 2004) and maps them
+        onto the Elo scale (mean rating 1000, 400 points per factor of 10 in odds).
+        """
+        n = wins.shape[0]
+        off_diagonal = ~np.eye(n, dtype=bool)
+        games = np.where(off_diagonal, 1.0 + self.prior, 0.0)
+        won = np.where(off_diagonal, wins + self.prior / 2.0, 0.0).sum(axis=1)
 
-            new_i = self._update_rating(ratings[i], ratings[j], outcome_i)
-            new_j = self._update_rating(ratings[j], ratings[i], outcome_j)
+        strength = np.ones(n)
+        for _ in range(self.max_iter):
+            denominator = (games / (strength[:, None] + strength[None, :])).sum(axis=1)
+            updated = won / denominator
+            updated /= np.exp(np.log(updated).mean())
 
-            ratings[i] = new_i
-            ratings[j] = new_j
+            converged = np.max(np.abs(np.log(updated) - np.log(strength))) < self.tol
+            strength = updated
+            if converged:
+                break
 
-        return ratings
\ No newline at end of file
+        return (1000.0 + 400.0 * np.log10(strength)).tolist()
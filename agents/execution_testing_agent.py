@@ -4,18 +4,45 @@
 Execution & Testing Agent:
 Executes each generated Python function against all formatted test cases (pytest-style).
 Filters out code that fails any test.
+Candidates run in parallel on the execution engine's worker pool; pytest subprocesses are the fallback.
+Outcomes are cached per (code, test) pair, so identical pairs only execute once; within a run
+they are also kept in an ExecutionMatrix, which Phase 2 reuses and which orders the tests for fail-fast runs.
 """
 
 import os
 import tempfile
 import subprocess
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 import re
 
+from app.services.execution_cache import ExecutionCache, get_execution_cache
+from app.services.execution_engine import ExecutionEngine, format_report, get_execution_engine
+from app.services.execution_matrix import ExecutionMatrix
+from app.services.metrics import record, record_cache_lookup
+
+# Outcome of a test a fail-fast run did not reach; never cached
+SKIPPED_OUTCOME = {"passed": False, "detail": "Not run (fail-fast)", "skipped": True}
+
 
 class ExecutionTestingAgent:
-    def __init__(self):
-        pass
+    def __init__(
+        self,
+        use_engine: bool = True,
+        engine: ExecutionEngine = None,
+        use_cache: bool = True,
+        cache: ExecutionCache = None
+    ):
+        """
+        Args:
+            use_engine (bool): Run candidates in the pre-warmed worker pool instead of
+                one pytest subprocess per candidate.
+            engine (ExecutionEngine): Engine to use (defaults to the process-wide one).
+            use_cache (bool): Reuse stored outcomes for code/test pairs that already ran.
+            cache (ExecutionCache): Cache to use (defaults to the process-wide one).
+        """
+        self.use_engine = use_engine
+        self.engine = engine or (get_execution_engine() if use_engine else None)
+        self.cache = cache or (get_execution_cache() if use_cache else None)
 
     def clean_code_block(self, code: str) -> str:
         """
@@ -49,17 +76,29 @@ class ExecutionTestingAgent:
         if not raw_output:
             return []
 
-        lines = raw_output.strip().splitlines()
-        test_line = next((line for line in lines if set(line.strip()) <= set(".F")), "")
-        return [c == "." for c in test_line.strip()] if test_line else []
+        lines = [re.sub(r"\s*\[\s*\d+%\]$", "", line).strip() for line in raw_output.strip().splitlines()]
+        test_line = next((line for line in lines if line and set(line) <= set(".F")), "")
+        return [c == "." for c in test_line] if test_line else []
     
-    def run_tests(self, codes: List[str], test_cases: List[str]) -> Tuple[Dict[str, bool], List[str]]:
+    def run_tests(
+        self,
+        codes: List[str],
+        test_cases: List[str],
+        code_ids: List[str] = None,
+        matrix: ExecutionMatrix = None,
+        fail_fast: bool = False
+    ) -> Tuple[Dict[str, bool], List[str]]:
         """
         Runs all test cases against each code snippet individually.
 
         Args:
             codes (List[str]): List of generated Python functions.
             test_cases (List[str]): List of pytest-style test functions.
+            code_ids (List[str]): IDs to report the codes under (default: code_1, code_2, ...).
+            matrix (ExecutionMatrix): Outcomes of the run so far; pairs found in it are not executed
+                again, and new outcomes are added to it.
+            fail_fast (bool): Stop each code at its first failing test, running the tests that
+                failed most often (per the matrix) first. Tests not reached are reported as skipped.
 
         Returns:
             Tuple:
@@ -71,46 +110,173 @@ class ExecutionTestingAgent:
 
         renamed_tests = self.rename_test_functions(test_cases)
 
-        for i, raw_code in enumerate(codes):
+        cleaned_codes = []
+        for raw_code in codes:
             code_str = raw_code.content if hasattr(raw_code, "content") else raw_code
-            cleaned_code = self.clean_code_block(code_str)
-            full_code = f"{cleaned_code}\n\n" + "\n\n".join(renamed_tests)
-
-            with tempfile.NamedTemporaryFile(suffix="_test.py", delete=False, mode="w") as f:
-                f.write(full_code)
-                test_file_path = f.name
-
-            try:
-                completed = subprocess.run(
-                    ["pytest", test_file_path, "--tb=short", "-q"],
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                )
-                passed = completed.returncode == 0
-            except Exception:
-                passed = False
-                completed = None
-
-            code_id = f"code_{i+1}"
-            print(f"\n🔎 Testing {code_id}... {'✅ PASSED' if passed else '❌ FAILED'}")
+            cleaned_codes.append(self.clean_code_block(code_str))
+
+        if matrix is None:
+            matrix = ExecutionMatrix()
+        test_keys = [matrix.test_key(test) for test in renamed_tests]
+        code_keys = [matrix.code_key(code) for code in cleaned_codes]
+        order = matrix.order_tests(test_keys) if fail_fast else list(range(len(renamed_tests)))
 
-            if completed:
-                summary_lines = completed.stdout.strip().split("\n")
-                print(f"--- Pytest Output for {code_id} ---")
-                print("\n".join(summary_lines))
+        # Look up every code/test pair first; only pairs without a known outcome are executed
+        keys = [[self.cache.key(code, test) if self.cache else None for test in renamed_tests] for code in cleaned_codes]
+        outcomes = [
+            [self._known_outcome(matrix, code_keys[i], test_keys[j], key, j) for j, key in enumerate(row)]
+            for i, row in enumerate(keys)
+        ]
+        pending = [[j for j in order if row[j] is None] for row in outcomes]
+        if fail_fast:
+            # A known failure already decides the code; its remaining tests are not run
+            pending = [
+                [] if any(o is not None and not o["passed"] for o in outcomes[i]) else missing
+                for i, missing in enumerate(pending)
+            ]
+
+        sources = {
+            i: f"{cleaned_codes[i]}\n\n" + "\n\n".join(renamed_tests[j] for j in missing)
+            for i, missing in enumerate(pending) if missing
+        }
+        runs = {}
+        if self.use_engine and sources:
+            runs = dict(zip(sources, self.engine.run(list(sources.values()), fail_fast=fail_fast)))
+            record(engine_runs=len(sources))
+
+        for i, cleaned_code in enumerate(cleaned_codes):
+            error = None
+            if i in sources:
+                run = runs.get(i)
+                if run is None or run["unsupported"]:
+                    # Tests relying on pytest fixtures/marks still go through pytest itself
+                    run = self._run_pytest(sources[i], fail_fast=fail_fast)
+                error = run["error"]
+                self._store_outcomes(run, pending[i], keys[i], outcomes[i], matrix, code_keys[i], test_keys, fail_fast)
+            outcomes[i] = [
+                o if o is not None else {"name": f"test_case_{j+1}", **SKIPPED_OUTCOME} for j, o in enumerate(outcomes[i])
+            ]
+
+            passed = error is None and bool(outcomes[i]) and all(o["passed"] for o in outcomes[i])
+            report = format_report(outcomes[i], error)
+
+            code_id = code_ids[i] if code_ids else f"code_{i+1}"
+            print(f"\n🔎 Testing {code_id}... {'✅ PASSED' if passed else '❌ FAILED'}")
+            print(f"--- Pytest Output for {code_id} ---")
+            print(report)
 
             results[code_id] = {
                 "passed": passed,
-                "report": completed.stdout.strip() if completed else "Test execution error",
+                "report": report,
                 "code": cleaned_code,
-                "individual_test_results": self._extract_test_results(completed.stdout if completed else "")
+                "individual_test_results": [o["passed"] for o in outcomes[i]],
+                # Index into test_cases and observed result of every failing test (used by repair)
+                "failures": [
+                    {"test": j, "detail": o["detail"]}
+                    for j, o in enumerate(outcomes[i]) if not o["passed"] and not o.get("skipped")
+                ]
             }
 
             if passed:
                 filtered_codes.append(cleaned_code)
 
-            os.remove(test_file_path)
-
         print(f"\n✅ {len(filtered_codes)} out of {len(codes)} codes passed all tests.")
         return results, filtered_codes
+
+    def _known_outcome(
+        self,
+        matrix: ExecutionMatrix,
+        code_key: str,
+        test_key: str,
+        cache_key: Optional[str],
+        index: int
+    ) -> Optional[Dict]:
+        outcome = matrix.get(code_key, test_key)
+        record_cache_lookup("execution_matrix", hit=outcome is not None)
+        if outcome is None and cache_key:
+            outcome = self.cache.get(cache_key)
+            record_cache_lookup("execution", hit=outcome is not None)
+            if outcome is not None:
+                matrix.put(code_key, test_key, outcome)
+        if outcome is not None:
+            outcome["name"] = f"test_case_{index+1}"
+        return outcome
+
+    def _store_outcomes(
+        self,
+        run: Dict,
+        pending: List[int],
+        keys: List[str],
+        outcomes: List[Optional[Dict]],
+        matrix: ExecutionMatrix,
+        code_key: str,
+        test_keys: List[str],
+        fail_fast: bool = False
+    ):
+        """
+        Fills the executed tests into the candidate's outcome list, the cache and the matrix.
+        Tests that did not run (import error, crashed worker, timeout) count as failed for this
+        call, but only real per-test outcomes of runs without an error are stored: an
+        infrastructure failure must not mark the code/test pair as failing for good.
+        Tests a fail-fast run stopped before are left open.
+        """
+        by_name = {o["name"]: o for o in run["outcomes"]}
+        stopped = fail_fast and run["error"] is None and any(not o["passed"] for o in run["outcomes"])
+
+        for j in pending:
+            name = f"test_case_{j+1}"
+            executed = by_name.get(name)
+            if executed is not None:
+                outcome = {"passed": executed["passed"], "detail": executed["detail"]}
+            elif stopped:
+                continue
+            else:
+                outcome = {"passed": False, "detail": run["error"] or "Test was not run"}
+
+            if executed is not None and run["error"] is None and not run["timed_out"]:
+                if self.cache:
+                    self.cache.put(keys[j], outcome)
+                matrix.put(code_key, test_keys[j], outcome)
+            outcomes[j] = {"name": name, **outcome}
+
+    def _run_pytest(self, full_code: str, fail_fast: bool = False) -> Dict:
+        """
+        Runs one candidate module in a fresh pytest subprocess (with -x if fail_fast).
+        Returns the same shape as the execution engine: {"outcomes", "error", "timed_out", "unsupported"}.
+        """
+        with tempfile.NamedTemporaryFile(suffix="_test.py", delete=False, mode="w") as f:
+            f.write(full_code)
+            test_file_path = f.name
+
+        record(subprocesses=1)
+        try:
+            completed = subprocess.run(
+                ["pytest", test_file_path, "--tb=short", "-q", *(["-x"] if fail_fast else [])],
+                capture_output=True,
+                text=True,
+                timeout=10,
+            )
+        except subprocess.TimeoutExpired:
+            return {"outcomes": [], "error": "Timeout: candidate exceeded 10s", "timed_out": True, "unsupported": False}
+        except Exception:
+            return {"outcomes": [], "error": "Test execution error", "timed_out": True, "unsupported": False}
+        finally:
+            os.remove(test_file_path)
+
+        names = re.findall(r"^def (test_\w+)", full_code, re.MULTILINE)
+        flags = self._extract_test_results(completed.stdout)
+        if fail_fast and flags and not flags[-1] and len(flags) < len(names):
+            # -x stopped at the first failure; the remaining tests did not run
+            names = names[:len(flags)]
+        if len(flags) != len(names):
+            # Collection error: pytest did not run the tests individually
+            lines = completed.stdout.strip().splitlines()
+            error = next((line for line in lines if line.startswith("ERROR ")), lines[-1] if lines else "Test execution error")
+            return {"outcomes": [], "error": error, "timed_out": False, "unsupported": False}
+
+        details = dict(re.findall(r"^FAILED \S*::(test_\w+) - (.*)$", completed.stdout, re.MULTILINE))
+        outcomes = [
+            {"name": name, "passed": flag, "detail": "" if flag else details.get(name, "AssertionError")}
+            for name, flag in zip(names, flags)
+        ]
+        return {"outcomes": outcomes, "error": None, "timed_out": False, "unsupported": False}
@@ -3,6 +3,7 @@ from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import JsonOutputParser
 from prompts.input_processing_prompt import input_processing_prompt
+from app.services.llm_cache import response_cache_for
 
 
 load_dotenv()
@@ -19,7 +20,8 @@ class InputProcessingAgent:
         self.llm = ChatOpenAI(
             model=model_name,
             temperature=temperature,
-            api_key=os.getenv("OPENAI_API_KEY")  # Fetch from .env
+            api_key=os.getenv("OPENAI_API_KEY"),  # Fetch from .env
+            cache=response_cache_for(temperature)
         )
         self.parser = JsonOutputParser()
 
@@ -6,65 +6,102 @@ Evaluates and ranks a list of Python code implementations based on multiple scor
 """
 
 from typing import List, Dict
-from sentence_transformers import SentenceTransformer, util
 from sklearn.preprocessing import MinMaxScaler
 
+from app.services.embedding_store import cosine_similarity_matrix, get_embedding_store
+from app.services.model_registry import DEFAULT_SENTENCE_TRANSFORMER, get_sentence_transformer
+
 from scoring.strategies.complexity import ComplexityScoringStrategy
 from scoring.strategies.llm_feedback import LLMFeedbackScoringStrategy
 from scoring.strategies.test_coverage import TestCoverageScoringStrategy
+from scoring.registry import ScoringStrategyRegistry
+from scoring.scheduler import CPU, MODEL, NETWORK, NEUTRAL_SCORE, ScoringScheduler
 from agents.elo_rating_agent import EloRatingAgent
 
 
 class ScoringAndRankingAgent:
-    def __init__(self, test_results: Dict[str, List[bool]] = None):
-        self.embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-        self.elo_agent = EloRatingAgent()
-        self.complexity_strategy = ComplexityScoringStrategy()
-        self.llm_strategy = LLMFeedbackScoringStrategy()
+    def __init__(
+        self,
+        test_results: Dict[str, List[bool]] = None,
+        timeouts: Dict[str, float] = None,
+        weights: Dict[str, float] = None,
+        disabled: List[str] = None,
+        top_k: int = None,
+        early_termination: bool = None
+    ):
+        """
+        Args:
+            test_results: Per-test pass/fail lists by code key, ExecutionMatrix.code_key (defaults for score_codes).
+            timeouts (Dict[str, float]): Seconds per scoring strategy (see ScoringScheduler).
+            weights, disabled, top_k, early_termination: Strategy configuration
+                (see ScoringStrategyRegistry; defaults come from the environment).
+        """
+        self.registry = ScoringStrategyRegistry(
+            weights=weights,
+            disabled=disabled,
+            top_k=top_k,
+            early_termination=early_termination,
+            scheduler=ScoringScheduler(timeouts=timeouts)
+        )
         self.test_coverage_strategy = TestCoverageScoringStrategy(test_results or {})
+        self.complexity_strategy = ComplexityScoringStrategy()
 
-    def score_codes(self, codes: List[str]) -> List[Dict]:
-        # Initialize score containers
-        scored_entries = []
-
-        # === Core raw scores ===
-        embeddings = self.embedding_model.encode(codes, convert_to_tensor=True)
-        similarity_matrix = util.cos_sim(embeddings, embeddings)
+        self.registry.register("quality", CPU, lambda codes, _: [self._score_quality(code) for code in codes])
+        self.registry.register("complexity", CPU, lambda codes, _: self.complexity_strategy.score(codes))
+        self.registry.register(
+            "test_coverage", CPU,
+            lambda codes, context: self.test_coverage_strategy.score(codes, context.get("test_results"))
+        )
+
+        # Models and clients are only built for enabled strategies; they come from the process-wide
+        # registry, so building an agent does not reload them
+        self.embedding_model = self.embedding_store = self.elo_agent = self.llm_strategy = None
+        if self.registry.is_enabled("similarity"):
+            self.embedding_model = get_sentence_transformer()
+            self.embedding_store = get_embedding_store()
+            self.registry.register("similarity", MODEL, lambda codes, _: self._score_similarity(codes))
+        if self.registry.is_enabled("elo"):
+            self.elo_agent = EloRatingAgent()
+            self.registry.register("elo", MODEL, lambda codes, _: self.elo_agent.compute_elo_scores(codes))
+        if self.registry.is_enabled("llm_feedback"):
+            self.llm_strategy = LLMFeedbackScoringStrategy()
+            self.registry.register("llm_feedback", NETWORK, lambda codes, _: self.llm_strategy.score(codes))
+
+    def score_codes(self, codes: List[str], test_results: Dict[str, List[bool]] = None) -> List[Dict]:
+        """
+        Scores and ranks the codes. Strategies run from the cheapest cost class to the most
+        expensive one, concurrently within a stage (see ScoringStrategyRegistry.stages). A strategy that fails or times out gives
+        every code a neutral score ("degraded_strategies"); expensive strategies that can no
+        longer change the top-k are not run ("skipped_strategies") and count as neutral too.
+
+        Args:
+            codes (List[str]): Validated code implementations.
+            test_results: Per-test pass/fail lists by code key (ExecutionMatrix.code_key) for this call
+                (defaults to the ones given at construction).
+        """
+        result = self.registry.run(codes, self._normalize, {"test_results": test_results})
+        total_weight = self.registry.total_weight() or 1.0
 
+        scored_entries = []
         for i, code in enumerate(codes):
-            scored_entries.append({
-                "code_id": f"code_{i+1}",
-                "code": code,
-                "quality": self._score_quality(code),
-                "similarity": float(similarity_matrix[i].mean())
-            })
-
-        # === Add scores from other strategies ===
-        # Elo rating
-        elo_scores = self.elo_agent.compute_elo_scores(codes)
-        for i, entry in enumerate(scored_entries):
-            entry["elo"] = elo_scores[i]
-
-        # Complexity
-        complexity_scores = self.complexity_strategy.score(codes)
-        for i, entry in enumerate(scored_entries):
-            entry["complexity"] = complexity_scores[i]
-
-        # LLM Feedback
-        llm_scores = self.llm_strategy.score(codes)
-        for i, entry in enumerate(scored_entries):
-            entry["llm_feedback"] = llm_scores[i]
-
-        # Test Coverage
-        coverage_scores = self.test_coverage_strategy.score(codes)
-        for i, entry in enumerate(scored_entries):
-            entry["test_coverage"] = coverage_scores[i]
-
-        # === Normalize and compute total score ===
-        scored_entries = self._normalize_and_rank(scored_entries)
+            entry = {"code_id": f"code_{i+1}", "code": code}
+            entry.update({name: values[i] for name, values in result["scores"].items()})
+            entry.update({f"normalized_{name}": values[i] for name, values in result["normalized"].items()})
+            entry["total_score"] = round(sum(
+                spec["weight"] * result["normalized"][name][i] for name, spec in self.registry.strategies.items()
+            ) / total_weight, 4)
+            entry["degraded_strategies"] = sorted(result["degraded"])
+            entry["skipped_strategies"] = result["skipped"]
+            scored_entries.append(entry)
 
         return sorted(scored_entries, key=lambda x: x["total_score"], reverse=True)
 
+    def _score_similarity(self, codes: List[str]) -> List[float]:
+        # Only codes without a stored embedding are encoded; similarity is a plain matrix product
+        embeddings = self.embedding_store.embed(codes, self.embedding_model, DEFAULT_SENTENCE_TRANSFORMER)
+        similarity_matrix = cosine_similarity_matrix(embeddings)
+        return [float(similarity_matrix[i].mean()) for i in range(len(codes))]
+
     def _score_quality(self, code: str) -> float:
         import re
         lines = code.strip().split("\n")
@@ -74,28 +111,9 @@ class ScoringAndRankingAgent:
         has_docstring = bool(re.search(r'"""[\s\S]+?"""', code)) or bool(re.search(r"'''[\s\S]+?'''", code))
         return min(1.0, comment_ratio + (0.2 if has_docstring else 0))
 
-    def _normalize_and_rank(self, scores: List[Dict]) -> List[Dict]:
-        keys_to_normalize = ["quality", "similarity", "elo", "complexity", "llm_feedback", "test_coverage"]
-        scalers = {key: MinMaxScaler() for key in keys_to_normalize}
-
-        for key in keys_to_normalize:
-            values = [[s[key]] for s in scores]
-            try:
-                normalized = scalers[key].fit_transform(values)
-            except ValueError:
-                normalized = [[0.5] for _ in values]
-            for i, s in enumerate(scores):
-                s[f"normalized_{key}"] = float(normalized[i])
-
-        # Weighting: adjust as needed
-        for s in scores:
-            s["total_score"] = round((
-                0.15 * s["normalized_quality"] +
-                0.10 * s["normalized_similarity"] +
-                0.20 * s["normalized_elo"] +
-                0.15 * s["normalized_complexity"] +
-                0.20 * s["normalized_llm_feedback"] +
-                0.20 * s["normalized_test_coverage"]
-            ), 4)
-
-        return scores
\ No newline at end of file
+    def _normalize(self, values: List[float]) -> List[float]:
+        try:
+            normalized = MinMaxScaler().fit_transform([[value] for value in values])
+        except ValueError:
+            return [NEUTRAL_SCORE for _ in values]
+        return [float(value[0]) for value in normalized]
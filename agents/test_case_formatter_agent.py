@@ -1,11 +1,158 @@
+import ast
+import keyword
 import os
+import re
+from collections import Counter
 from dotenv import load_dotenv
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from langchain_openai import ChatOpenAI
 from prompts.test_case_format_prompt import test_case_format_prompt
+from app.services.llm_cache import response_cache_for
 
 load_dotenv()
 
+RISKWEIGHT_TAG = re.compile(r"<riskweight>(.*?)</riskweight>", re.IGNORECASE | re.DOTALL)
+LINE_PREFIX = re.compile(r"^\s*(?:[-*•]|\d+[.)])?\s*")
+ASSIGNMENT_TARGET = re.compile(r"^([A-Za-z_]\w*)\s*=[^=]")
+IDENTIFIER = re.compile(r"[A-Za-z_]\w*")
+# Separators of a structured variable list: "rating, maturity", "rating and maturity", one per line
+VARIABLE_SEPARATOR = re.compile(r"\s*(?:[,;\n]|\band\b)\s*")
+INVALID_OUTPUT = "Invalid input value!"
+# Names that describe the expected result rather than an input value
+RESULT_NAMES = ("expected", "result", "riskweight", "risk_weight", "output")
+_UNPARSEABLE = object()
+
+
+def parse_input_variable_names(input_variables: str) -> List[str]:
+    """
+    Returns the parameter names of a structured input variable list ("rating, maturity",
+    "rating and maturity", one name per line), in order. A prose description returns [];
+    see mentioned_names.
+    """
+    items = [item.strip(" \t-*•`'\"") for item in VARIABLE_SEPARATOR.split(input_variables or "")]
+    items = [item for item in items if item]
+    if not items or not all(IDENTIFIER.fullmatch(item) and not keyword.iskeyword(item) for item in items):
+        return []
+    return list(dict.fromkeys(items))
+
+
+def mentioned_names(input_variables: str) -> List[str]:
+    """
+    Returns every identifier-shaped word of a (prose) input variable description, in order of first
+    mention. Python keywords cannot be parameter names and are skipped.
+    """
+    names = IDENTIFIER.findall(input_variables or "")
+    return list(dict.fromkeys(name for name in names if not keyword.iskeyword(name)))
+
+
+def parse_test_case(raw_test_case, input_variables: str = "") -> Optional[Tuple[Dict[str, object], object]]:
+    """
+    Parses a raw test case ("var = value" lines plus a <riskweight> tag) locally.
+
+    Args:
+        raw_test_case: Test case text (or LLM message with .content).
+        input_variables (str): Input variable description. A structured list (see
+            parse_input_variable_names) is the exact parameter list: only these names are read and
+            every one of them must be assigned. For a prose description every assigned input must be
+            mentioned in it. Either way the description defines the argument order.
+
+    Returns:
+        Optional[Tuple]: (ordered input assignments, expected output), or None if
+            the case is ambiguous or cannot be parsed.
+    """
+    text = raw_test_case.content if hasattr(raw_test_case, "content") else str(raw_test_case)
+
+    tags = {tag.strip() for tag in RISKWEIGHT_TAG.findall(text)}
+    if len(tags) != 1:
+        return None
+    expected = _parse_expected(tags.pop())
+    if expected is None:
+        return None
+
+    declared = parse_input_variable_names(input_variables)
+    mentioned = [] if declared else mentioned_names(input_variables)
+    assignments = {}
+
+    for line in RISKWEIGHT_TAG.sub("", text).splitlines():
+        statement = LINE_PREFIX.sub("", line).strip().strip("`").strip()
+        target = ASSIGNMENT_TARGET.match(statement)
+        if not target:
+            continue
+
+        name = target.group(1)
+        if declared and name not in declared:
+            continue
+        if not declared and any(marker in name.lower() for marker in RESULT_NAMES):
+            continue
+        if mentioned and name not in mentioned:
+            # Not a parameter the description names: the LLM formatter decides what it is
+            return None
+
+        value = _parse_assignment_value(statement)
+        if value is _UNPARSEABLE:
+            # An input we cannot evaluate locally would silently drop an argument
+            return None
+        if name in assignments and assignments[name] != value:
+            return None
+        assignments[name] = value
+
+    if not assignments:
+        return None
+    if declared and set(assignments) != set(declared):
+        # A missing input would call the function with too few (or shifted) arguments
+        return None
+
+    if declared or mentioned:
+        order = [name for name in declared or mentioned if name in assignments]
+    else:
+        order = list(assignments)
+    return {name: assignments[name] for name in order}, expected
+
+
+def render_pytest_function(inputs: Dict[str, object], expected, index: int) -> str:
+    """
+    Emits a pytest function calling calculate_risk_weight() with the inputs in order.
+    """
+    lines = [f"def test_case_{index}():"]
+    lines.extend(f"    {name} = {value!r}" for name, value in inputs.items())
+    lines.append(f"    expected_output = {expected!r}")
+    lines.append(f"    result = calculate_risk_weight({', '.join(inputs)})")
+    lines.append("    assert result == expected_output")
+    return "\n".join(lines)
+
+
+def _parse_assignment_value(statement: str):
+    try:
+        tree = ast.parse(statement)
+    except SyntaxError:
+        return _UNPARSEABLE
+
+    if len(tree.body) != 1 or not isinstance(tree.body[0], ast.Assign) or len(tree.body[0].targets) != 1:
+        return _UNPARSEABLE
+
+    try:
+        return ast.literal_eval(tree.body[0].value)
+    except (ValueError, TypeError, SyntaxError):
+        return _UNPARSEABLE
+
+
+def _parse_expected(tag_content: str):
+    value = tag_content.strip().strip("\"'`“”").strip()
+    if "invalid" in value.lower():
+        return INVALID_OUTPUT
+
+    number = value.rstrip("%").strip()
+    try:
+        return int(number)
+    except ValueError:
+        pass
+    try:
+        as_float = float(number)
+    except ValueError:
+        return None
+    return int(as_float) if as_float.is_integer() else as_float
+
+
 class TestCaseFormatterAgent:
     def __init__(self, model_name: str = "gpt-4o", temperature: float = 0.0):
         """
@@ -14,24 +161,46 @@ class TestCaseFormatterAgent:
         self.llm = ChatOpenAI(
             model=model_name,
             temperature=temperature,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            cache=response_cache_for(temperature)
         )
 
-    def format_test_cases(self, raw_test_cases: List[str]) -> List[str]:
+    def format_test_cases(self, raw_test_cases: List[str], input_variables: str = "") -> List[str]:
         """
         Formats a list of test case strings into pytest functions.
+        Cases are parsed and emitted locally; only those that cannot be parsed
+        are sent to the LLM.
 
         Args:
             raw_test_cases (List[str]): List of test case strings (with <riskweight>).
+            input_variables (str): Input variable description defining the argument order.
 
         Returns:
             List[str]: Formatted pytest-style test functions.
         """
-        formatted_tests = []
+        formatted_tests = [None] * len(raw_test_cases)
+        parsed_cases = [parse_test_case(raw_test_case, input_variables) for raw_test_case in raw_test_cases]
+
+        signature = None
+        if not parse_input_variable_names(input_variables):
+            # Without an exact parameter list, the inputs most cases assign are taken as the signature;
+            # a case assigning other inputs would call the function with missing or extra arguments
+            signatures = Counter(tuple(parsed[0]) for parsed in parsed_cases if parsed is not None)
+            signature = signatures.most_common(1)[0][0] if signatures else None
+
+        fallback_indices = []
+        for idx, parsed in enumerate(parsed_cases):
+            if parsed is None or (signature is not None and tuple(parsed[0]) != signature):
+                fallback_indices.append(idx)
+                continue
+            inputs, expected = parsed
+            formatted_tests[idx] = render_pytest_function(inputs, expected, idx + 1)
 
-        for idx, raw_test_case in enumerate(raw_test_cases, start=1):
-            prompt = test_case_format_prompt.format(test_case=raw_test_case)
-            response = self.llm.invoke(prompt)
-            formatted_tests.append(response.content)
+        if fallback_indices:
+            print(f"⚠️ {len(fallback_indices)} test case(s) could not be parsed locally, formatting with LLM...")
+            prompts = [test_case_format_prompt.format(test_case=raw_test_cases[i]) for i in fallback_indices]
+            responses = self.llm.batch(prompts)
+            for i, response in zip(fallback_indices, responses):
+                formatted_tests[i] = response.content
 
-        return formatted_tests
\ No newline at end of file
+        return formatted_tests
@@ -0,0 +1,95 @@
+"""
+Test Deduplication Agent:
+Reduces raw test cases to canonical (inputs, expected result) tuples and drops exact and equivalent
+duplicates (same input values written in another order, quote style or format), so each distinct
+case is formatted and executed once. Cases that expect different results for the same inputs are
+flagged as conflicts. Runs locally, without LLM calls.
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from agents.test_case_formatter_agent import parse_test_case
+
+
+def _freeze(value):
+    # Hashable form that keeps the type: 1, 1.0 and True are different inputs for a validating function
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_freeze(item) for item in value))
+    if isinstance(value, (set, frozenset)):
+        return ("set", tuple(sorted((_freeze(item) for item in value), key=repr)))
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted(((repr(key), _freeze(item)) for key, item in value.items()), key=repr)))
+    return (type(value).__name__, value)
+
+
+def canonical_test_case(raw_test_case, input_variables: str = "") -> Optional[Tuple[tuple, object]]:
+    """
+    Returns (canonical inputs, expected result) for a raw test case, or None if it cannot be parsed.
+    """
+    parsed = parse_test_case(raw_test_case, input_variables)
+    if parsed is None:
+        return None
+    inputs, expected = parsed
+    return tuple((name, _freeze(value)) for name, value in inputs.items()), expected
+
+
+class TestDeduplicationAgent:
+    def deduplicate(self, valid_tests: List[str], invalid_tests: List[str], input_variables: str = "") -> Dict:
+        """
+        Deduplicates the valid and invalid test cases together. Of each group of cases with the
+        same inputs the first one is kept. If the group disagrees on the expected result, the
+        result a strict majority expects wins; without a majority the whole group is dropped.
+
+        Args:
+            valid_tests (List[str]): Raw valid test cases.
+            invalid_tests (List[str]): Raw invalid test cases.
+            input_variables (str): Input variable description (defines which assignments are inputs).
+
+        Returns:
+            Dict: "valid_tests" and "invalid_tests" (kept cases, in order), "dropped" (duplicates and
+                conflicting cases removed, per test type) and "conflicts" (one entry per disagreeing
+                group: "inputs", the "expectations" of its cases and the "kept" result or None).
+        """
+        cases = [("valid", test) for test in valid_tests] + [("invalid", test) for test in invalid_tests]
+
+        groups = defaultdict(list)
+        for position, (test_type, test) in enumerate(cases):
+            canonical = canonical_test_case(test, input_variables)
+            if canonical is None:
+                # Unparseable cases go to the LLM formatter; only identical texts count as duplicates
+                key, expected = ("raw", re.sub(r"\s+", " ", str(getattr(test, "content", test))).strip()), None
+            else:
+                key, expected = canonical
+            groups[key].append((position, expected))
+
+        kept = set()
+        conflicts = []
+        for key, members in groups.items():
+            counts = defaultdict(int)
+            for _, expected in members:
+                counts[repr(expected)] += 1
+            if len(counts) == 1:
+                kept.add(members[0][0])
+                continue
+
+            winner, votes = max(counts.items(), key=lambda item: item[1])
+            kept_expected = None
+            if votes * 2 > len(members):
+                position, kept_expected = next(member for member in members if repr(member[1]) == winner)
+                kept.add(position)
+            conflicts.append({
+                "inputs": parse_test_case(cases[members[0][0]][1], input_variables)[0],
+                "expectations": [
+                    {"expected": expected, "test_type": cases[position][0]} for position, expected in members
+                ],
+                "kept": kept_expected
+            })
+
+        result = {"valid_tests": [], "invalid_tests": [], "dropped": {"valid": 0, "invalid": 0}, "conflicts": conflicts}
+        for position, (test_type, test) in enumerate(cases):
+            if position in kept:
+                result[f"{test_type}_tests"].append(test)
+            else:
+                result["dropped"][test_type] += 1
+        return result
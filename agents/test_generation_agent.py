@@ -8,7 +8,11 @@ import os
 from dotenv import load_dotenv
 from typing import List
 from langchain_openai import ChatOpenAI
-from prompts.test_case_prompt import test_case_prompt
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.exceptions import OutputParserException
+from prompts.test_case_prompt import test_case_prompt, test_case_batch_prompt
+from agents.test_case_formatter_agent import RISKWEIGHT_TAG
+from app.services.llm_cache import response_cache_for
 
 load_dotenv()
 
@@ -20,8 +24,10 @@ class TestGenerationAgent:
         self.llm = ChatOpenAI(
             model=model_name,
             temperature=temperature,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            cache=response_cache_for(temperature)
         )
+        self.parser = JsonOutputParser()
 
     def generate_test_cases(
         self,
@@ -29,9 +35,12 @@ class TestGenerationAgent:
         assumptions: str,
         input_variables: str,
         test_type: str = "valid",  # or "invalid"
-        num_cases: int = 10
+        num_cases: int = 10,
+        batched: bool = True,
+        max_retries: int = 2,
+        exclude: List[str] = None
     ) -> List[str]:
-        
+
         """
         Generates test cases (valid or invalid) as text examples.
 
@@ -40,12 +49,22 @@ class TestGenerationAgent:
             assumptions (str): Context assumptions.
             input_variables (List[str]): Input variable names.
             test_type (str): "valid" or "invalid".
-            count (int): Number of test cases to generate.
+            num_cases (int): Number of test cases to generate.
+            batched (bool): Request all cases as one JSON list instead of one call per case.
+            max_retries (int): Batched mode only. Number of follow-up calls used to replace
+                malformed or duplicate entries (0 keeps whatever the first call returned).
+            exclude (List[str]): Batched mode only. Test cases that already exist; the prompt asks
+                for other input combinations and identical cases are not returned again.
 
         Returns:
             List[str]: A list of generated test case strings with <riskweight> tag.
         """
 
+        if batched:
+            return self._generate_batched(
+                regulatory_text, assumptions, input_variables, test_type, num_cases, max_retries, exclude or []
+            )
+
         test_cases = []
 
         for _ in range(num_cases):
@@ -58,4 +77,107 @@ class TestGenerationAgent:
             response = self.llm.invoke(prompt)
             test_cases.append(response)
 
-        return test_cases
\ No newline at end of file
+        return test_cases
+
+    def _generate_batched(
+        self,
+        regulatory_text: str,
+        assumptions: str,
+        input_variables: str,
+        test_type: str,
+        num_cases: int,
+        max_retries: int,
+        exclude: List[str]
+    ) -> List[str]:
+        """
+        Requests the test cases as a single JSON list and only asks again for
+        the entries that were missing, malformed or duplicated.
+        """
+        test_cases = []
+        attempt = 0
+        excluded_cases = ""
+        if exclude:
+            covered = "\n".join(f"- {self._describe_inputs(case)}" for case in exclude)
+            excluded_cases = f"\nThese input combinations are already covered, do not repeat them:\n{covered}\n"
+
+        while len(test_cases) < num_cases and attempt <= max_retries:
+            missing = num_cases - len(test_cases)
+            prompt = test_case_batch_prompt.format(
+                regulatory_text=regulatory_text,
+                assumptions=assumptions,
+                test_type=test_type,
+                input_variables=input_variables,
+                num_cases=missing,
+                excluded_cases=excluded_cases
+            )
+            response = self.llm.invoke(prompt)
+
+            for entry in self._parse_entries(response.content):
+                if not self._is_valid_entry(entry):
+                    continue
+                test_case = self._render_test_case(entry)
+                if test_case not in test_cases and test_case not in exclude:
+                    test_cases.append(test_case)
+                if len(test_cases) == num_cases:
+                    break
+
+            attempt += 1
+
+        if len(test_cases) < num_cases:
+            print(f"⚠️ Only {len(test_cases)} of {num_cases} {test_type} test cases were well-formed.")
+
+        return test_cases
+
+    def _describe_inputs(self, test_case) -> str:
+        """
+        Returns the input assignments of a rendered test case on one line.
+        """
+        text = RISKWEIGHT_TAG.sub("", test_case.content if hasattr(test_case, "content") else str(test_case))
+        return ", ".join(line.strip() for line in text.splitlines() if line.strip())
+
+    def _parse_entries(self, content: str) -> list:
+        """
+        Parses the JSON list from the LLM reply. A list wrapped in an object
+        (e.g. {"test_cases": [...]}) is unwrapped; anything else yields no entries.
+        """
+        try:
+            parsed = self.parser.parse(content)
+        except OutputParserException:
+            return []
+
+        if isinstance(parsed, dict):
+            parsed = next((value for value in parsed.values() if isinstance(value, list)), [])
+
+        return parsed if isinstance(parsed, list) else []
+
+    def _is_valid_entry(self, entry) -> bool:
+        """
+        Validates one entry against the expected schema:
+        {"inputs": {<identifier>: <JSON value>, ...}, "riskweight": <number or string>}
+        """
+        if not isinstance(entry, dict):
+            return False
+
+        inputs = entry.get("inputs")
+        if not isinstance(inputs, dict) or not inputs:
+            return False
+        if not all(isinstance(name, str) and name.isidentifier() for name in inputs):
+            return False
+        if any(isinstance(value, dict) for value in inputs.values()):
+            return False
+
+        riskweight = entry.get("riskweight")
+        if isinstance(riskweight, bool):
+            return False
+        if isinstance(riskweight, str):
+            return bool(riskweight.strip())
+        return isinstance(riskweight, (int, float))
+
+    def _render_test_case(self, entry: dict) -> str:
+        """
+        Renders a validated entry in the same text format as the single-case prompt:
+        Python-style assignments followed by the <riskweight> tag.
+        """
+        lines = [f"{name} = {value!r}" for name, value in entry["inputs"].items()]
+        lines.append(f"<riskweight>{entry['riskweight']}</riskweight>")
+        return "\n".join(lines)
@@ -0,0 +1,185 @@
+"""
+Test Selection Agent:
+Ranks formatted pytest test cases by structural features and picks the most complex valid and
+invalid test for Phase 1 filtering. Runs locally in milliseconds, without LLM calls.
+"""
+
+import ast
+import re
+from typing import Dict, List, Optional
+from agents.test_case_formatter_agent import RESULT_NAMES
+
+CODE_FENCE = re.compile(r"```(?:python)?\s*(.*?)```", re.DOTALL)
+
+# How much each (per test set normalized) feature contributes to a test's complexity score
+DEFAULT_FEATURE_WEIGHTS = {
+    "ast_size": 0.2,          # size of the test function
+    "distinct_values": 0.2,   # number of distinct input values
+    "boundary_values": 0.3,   # inputs at the edge of the tested range or next to an output change
+    "disagreement": 0.3       # how often similar tests expect a different output
+}
+
+
+def extract_test_features(test) -> Optional[Dict]:
+    """
+    Parses a pytest function into its input assignments, expected output and AST size.
+
+    Returns:
+        Optional[Dict]: {"inputs", "expected", "ast_size"}, or None if the test cannot be parsed.
+    """
+    text = test.content if hasattr(test, "content") else str(test)
+    fenced = CODE_FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+
+    try:
+        tree = ast.parse(text)
+    except SyntaxError:
+        return None
+
+    function = next((node for node in tree.body if isinstance(node, ast.FunctionDef)), None)
+    if function is None:
+        return None
+
+    inputs = {}
+    expected = None
+    for statement in function.body:
+        if not isinstance(statement, ast.Assign) or len(statement.targets) != 1:
+            continue
+        target = statement.targets[0]
+        if not isinstance(target, ast.Name):
+            continue
+        try:
+            value = ast.literal_eval(statement.value)
+        except (ValueError, TypeError, SyntaxError):
+            continue
+        if target.id.startswith("expected"):
+            expected = value
+        elif not any(marker in target.id.lower() for marker in RESULT_NAMES):
+            inputs[target.id] = value
+
+    return {"inputs": inputs, "expected": expected, "ast_size": sum(1 for _ in ast.walk(function))}
+
+
+def _flatten(value) -> List:
+    if isinstance(value, dict):
+        return [item for pair in value.items() for part in pair for item in _flatten(part)]
+    if isinstance(value, (list, tuple, set)):
+        return [item for part in value for item in _flatten(part)]
+    return [value]
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class TestSelectionAgent:
+    def __init__(self, weights: Dict[str, float] = None):
+        """
+        Args:
+            weights (Dict[str, float]): Feature weights (see DEFAULT_FEATURE_WEIGHTS).
+        """
+        self.weights = weights or DEFAULT_FEATURE_WEIGHTS
+
+    def rank_tests(self, tests: List[str]) -> List[Dict]:
+        """
+        Scores every test of one kind (valid or invalid) by structural complexity.
+
+        Returns:
+            List[Dict]: {"index", "score", "features"} per test, most complex first.
+                Tests that cannot be parsed score 0.
+        """
+        parsed = [extract_test_features(test) for test in tests]
+        usable = [i for i, features in enumerate(parsed) if features is not None]
+
+        raw = {i: {} for i in usable}
+        boundary = self._boundary_counts(parsed, usable)
+        for i in usable:
+            values = [repr(v) for value in parsed[i]["inputs"].values() for v in _flatten(value)]
+            raw[i]["ast_size"] = parsed[i]["ast_size"]
+            raw[i]["distinct_values"] = len(set(values))
+            raw[i]["boundary_values"] = boundary[i]
+            raw[i]["disagreement"] = self._disagreement(parsed, usable, i)
+
+        # Normalize each feature by its maximum within the set, so weights are comparable
+        maxima = {name: max((raw[i][name] for i in usable), default=0) for name in self.weights}
+        ranking = []
+        for i in range(len(tests)):
+            features = {
+                name: (raw[i][name] / maxima[name] if maxima[name] else 0.0)
+                for name in self.weights
+            } if i in raw else {name: 0.0 for name in self.weights}
+            score = sum(self.weights[name] * features[name] for name in self.weights)
+            ranking.append({"index": i, "score": round(score, 4), "features": features})
+
+        ranking.sort(key=lambda entry: (-entry["score"], entry["index"]))
+        return ranking
+
+    def select(self, valid_tests: List[str], invalid_tests: List[str]) -> Dict:
+        """
+        Picks the most complex valid and invalid test case.
+
+        Returns:
+            Dict: "valid_index", "invalid_index" (None if there is no test of that kind) and
+                "valid_confidence", "invalid_confidence" in [0, 1]: how clearly the pick beats
+                the runner-up (1.0 for a single test, 0.0 for a tie).
+        """
+        selection = {}
+        for kind, tests in (("valid", valid_tests), ("invalid", invalid_tests)):
+            ranking = self.rank_tests(tests)
+            index, confidence = None, 0.0
+            if ranking:
+                index = ranking[0]["index"]
+                best = ranking[0]["score"]
+                runner_up = ranking[1]["score"] if len(ranking) > 1 else 0.0
+                confidence = round((best - runner_up) / best, 4) if best > 0 else 0.0
+            selection[f"{kind}_index"] = index
+            selection[f"{kind}_confidence"] = confidence
+        return selection
+
+    def _boundary_counts(self, parsed: List[Optional[Dict]], usable: List[int]) -> Dict[int, int]:
+        """
+        Counts per test the inputs that are at the edge of the tested range (min/max/zero/empty)
+        or whose nearest neighbour along that variable expects a different output.
+        """
+        counts = {i: 0 for i in usable}
+        names = {name for i in usable for name in parsed[i]["inputs"]}
+
+        for name in names:
+            numeric = sorted(
+                (parsed[i]["inputs"][name], i) for i in usable
+                if _is_number(parsed[i]["inputs"].get(name))
+            )
+            for position, (value, i) in enumerate(numeric):
+                at_edge = value <= 0 or value == numeric[0][0] or value == numeric[-1][0]
+                neighbours = [numeric[p][1] for p in (position - 1, position + 1) if 0 <= p < len(numeric)]
+                at_change = any(parsed[j]["expected"] != parsed[i]["expected"] for j in neighbours)
+                counts[i] += at_edge + at_change
+
+            # None, empty and whitespace-padded values are edge cases of their own
+            for i in usable:
+                if name not in parsed[i]["inputs"]:
+                    continue
+                value = parsed[i]["inputs"][name]
+                if value is None or value in ("", [], {}) or (isinstance(value, str) and value != value.strip()):
+                    counts[i] += 1
+
+        return counts
+
+    def _disagreement(self, parsed: List[Optional[Dict]], usable: List[int], i: int) -> float:
+        """
+        Share of the other tests expecting a different output, weighted by how many inputs they share.
+        """
+        inputs = parsed[i]["inputs"]
+        total = 0.0
+        for j in usable:
+            if j == i:
+                continue
+            other = parsed[j]["inputs"]
+            names = set(inputs) | set(other)
+            if not names:
+                continue
+            shared = sum(1 for name in names if name in inputs and name in other and inputs[name] == other[name])
+            if parsed[j]["expected"] != parsed[i]["expected"]:
+                total += shared / len(names)
+        return total / (len(usable) - 1) if len(usable) > 1 else 0.0
@@ -0,0 +1,107 @@
+"""
+API Routes:
+Submit workflow jobs, poll their status, follow per-node progress over Server-Sent Events,
+answer test selections and fetch the final artifacts. /metrics exposes run metrics for Prometheus.
+"""
+
+import json
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from app.api.schemas import JobCreated, JobRequest, JobResult, JobStatus, TestSelection
+from app.services.metrics import get_metrics_sink
+from app.services.orchestrator import AWAITING_SELECTION, QueueFullError, get_orchestrator
+
+router = APIRouter()
+
+
+def _get_job(job_id: str):
+    job = get_orchestrator().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+@router.get("/health")
+async def health():
+    orchestrator = get_orchestrator()
+    return {"status": "ok", "queued_jobs": orchestrator.queue_size(), "max_queue_size": orchestrator.max_queue_size}
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # Counters over the runs finished in this process, in the Prometheus text format
+    return get_metrics_sink().prometheus_text()
+
+
+@router.post("/jobs", response_model=JobCreated, status_code=202)
+async def submit_job(request: JobRequest):
+    try:
+        job = get_orchestrator().submit(request.user_input, human_selection=request.human_selection)
+    except QueueFullError as exc:
+        raise HTTPException(status_code=429, detail=str(exc))
+    return JobCreated(job_id=job.id, status=job.status)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job_status(job_id: str):
+    job = _get_job(job_id)
+    return JobStatus(
+        job_id=job.id,
+        status=job.status,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        current_node=job.current_node,
+        completed_nodes=job.completed_nodes,
+        error=job.error,
+        selection_request=job.selection_request
+    )
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    _get_job(job_id)
+    # Reconnecting clients continue after the last event they received
+    after = int(request.headers.get("last-event-id", "0") or 0)
+
+    async def event_stream():
+        async for event in get_orchestrator().events(job_id, after=after):
+            if await request.is_disconnected():
+                break
+            yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/jobs/{job_id}/selection", response_model=JobCreated, status_code=202)
+async def submit_test_selection(job_id: str, selection: TestSelection):
+    job = _get_job(job_id)
+    if job.status != AWAITING_SELECTION:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is not waiting for a test selection")
+    try:
+        get_orchestrator().submit_selection(job_id, selection.valid_index, selection.invalid_index)
+    except KeyError:
+        # Resumed (e.g. by the selection timeout), finished or evicted since the check above
+        raise HTTPException(status_code=404, detail=f"Job {job_id} is not waiting for a test selection")
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except QueueFullError as exc:
+        raise HTTPException(status_code=429, detail=str(exc))
+    return JobCreated(job_id=job.id, status=job.status)
+
+
+@router.get("/jobs/{job_id}/result", response_model=JobResult)
+async def get_job_result(job_id: str):
+    job = _get_job(job_id)
+    if not job.finished:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status}")
+    if job.error:
+        raise HTTPException(status_code=500, detail=job.error)
+    artifacts = {key: value for key, value in (job.result or {}).items() if value is not None}
+    return JobResult(job_id=job.id, status=job.status, **artifacts)
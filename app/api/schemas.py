@@ -0,0 +1,55 @@
+"""
+API Schemas:
+Request and response models of the workflow job API.
+"""
+
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+
+class JobRequest(BaseModel):
+    user_input: str = Field(..., min_length=1, description="General question or Basel III code request.")
+    human_selection: bool = Field(
+        False, description="Pause for a human to pick the complex test cases instead of selecting them automatically."
+    )
+
+
+class JobCreated(BaseModel):
+    job_id: str
+    status: str
+
+
+class SelectionRequest(BaseModel):
+    valid_tests: List[str]
+    invalid_tests: List[str]
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    current_node: Optional[str] = None
+    completed_nodes: List[str] = []
+    error: Optional[str] = None
+    selection_request: Optional[SelectionRequest] = None
+
+
+class TestSelection(BaseModel):
+    valid_index: int = Field(..., ge=0)
+    invalid_index: int = Field(..., ge=0)
+
+
+class JobResult(BaseModel):
+    job_id: str
+    status: str
+    request_type: Optional[str] = None
+    general_answer: Optional[str] = None
+    final_validated_codes: List[str] = []
+    scoring_results: List[Dict[str, Any]] = []
+    best_code: Optional[str] = None
+    evaluation_summary: Optional[str] = None
+    optimized_code: Optional[str] = None
+    test_selection: Optional[Dict[str, Any]] = None
+    metrics: Optional[Dict[str, Any]] = None
@@ -0,0 +1,43 @@
+"""
+API Service:
+FastAPI app serving the workflow as asynchronous jobs (see app/api/routes.py).
+Run with `python -m app.main` or `uvicorn app.main:app`.
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
+from fastapi import FastAPI
+
+from app.api.routes import router
+from app.services.orchestrator import get_orchestrator
+
+load_dotenv()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pay model loading and worker start-up once at boot instead of in the first request
+    if os.getenv("WARM_UP_ON_STARTUP", "1") == "1":
+        from app.services.execution_engine import get_execution_engine
+        from app.services.model_registry import warm_up_models
+
+        await asyncio.to_thread(warm_up_models)
+        await asyncio.to_thread(get_execution_engine().warm_up)
+
+    orchestrator = get_orchestrator()
+    await orchestrator.start()
+    yield
+    await orchestrator.stop()
+
+
+app = FastAPI(title="Code-Gen5-LangGraph", lifespan=lifespan)
+app.include_router(router)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=os.getenv("HOST", "127.0.0.1"), port=int(os.getenv("PORT", "8000")))
@@ -0,0 +1,244 @@
+"""
+Batch Runner:
+Streams a JSONL file of requests through the workflow with bounded concurrency and per-request
+timeouts (enforced by the caller while the run streams in its own thread). Every finished request is appended (and fsynced) to an output JSONL right away, so a crash
+loses no finished work and a rerun skips what is already done. Every run is checkpointed under the
+thread id written to its record, so a request that failed midway can also be continued with resume_workflow.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, TimeoutError as FutureTimeoutError, as_completed, wait
+from typing import Dict, Iterator, List, Optional, Set
+
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+
+from app.services.metrics import get_metrics_sink
+from app.services.orchestrator import RESULT_KEYS
+from app.utils.helpers import percentile
+from graphs.workflow import get_app, run_config
+
+COMPLETED = "completed"
+FAILED = "failed"
+TIMED_OUT = "timed_out"
+
+# Fields read as the request text, in order of preference
+INPUT_FIELDS = ("user_input", "body", "request", "text")
+ID_FIELDS = ("id", "request_id")
+
+
+class RequestTimeout(Exception):
+    pass
+
+
+def read_requests(path: str) -> Iterator[Dict]:
+    """
+    Yields {"id", "user_input"} per non-empty line of a JSONL file. The id defaults to the line number.
+    """
+    with open(path, encoding="utf-8") as requests_file:
+        for line_number, line in enumerate(requests_file, start=1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if isinstance(entry, str):
+                entry = {"user_input": entry}
+            request_id = next((str(entry[key]) for key in ID_FIELDS if entry.get(key) is not None), str(line_number))
+            user_input = next((entry[key] for key in INPUT_FIELDS if entry.get(key)), None)
+            if user_input is None:
+                raise ValueError(f"{path}:{line_number}: no request text (expected one of {', '.join(INPUT_FIELDS)})")
+            yield {"id": request_id, "user_input": user_input}
+
+
+def read_finished_ids(path: str) -> Set[str]:
+    """
+    Returns the ids already completed in an output JSONL (a partially written last line is ignored).
+    """
+    finished = set()
+    if not os.path.exists(path):
+        return finished
+    with open(path, encoding="utf-8") as output_file:
+        for line in output_file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") == COMPLETED:
+                finished.add(record["id"])
+    return finished
+
+
+class BatchRunner:
+    def __init__(
+        self,
+        concurrency: int = None,
+        timeout: Optional[float] = 900,
+        streaming: bool = None,
+        checkpointed: bool = True
+    ):
+        """
+        Args:
+            concurrency (int): Requests in flight at once (default: 4 per CPU; the runs mostly wait
+                on LLM calls, code execution goes to the execution engine's process pool).
+            timeout (float): Seconds per request. Each run streams in its own thread; once the
+                timeout passes the request is recorded as timed_out right away (even mid-node).
+                The abandoned run cannot be interrupted inside a node: it is cancelled before its
+                next node starts and keeps its concurrency slot until then, so no more than
+                `concurrency` runs ever execute at once.
+            streaming (bool): Use the streaming pipeline (see get_app).
+            checkpointed (bool): Store checkpoints per request so failed runs can be resumed.
+        """
+        self.concurrency = concurrency or 4 * (os.cpu_count() or 1)
+        self.timeout = timeout
+        self.streaming = streaming
+        self.checkpointed = checkpointed
+        self._write_lock = threading.Lock()
+        self._slots = None
+
+    def run(self, input_path: str, output_path: str, resume: bool = True, progress=None) -> Dict:
+        """
+        Processes every request of input_path and appends one JSON record per request to output_path.
+
+        Args:
+            resume (bool): Skip requests already completed in output_path.
+            progress (Callable): Called with each record as it is written.
+
+        Returns:
+            Dict: Summary (see summarize).
+        """
+        skip = read_finished_ids(output_path) if resume else set()
+        # Held by a run from its start until its thread actually stops (also after a timeout)
+        self._slots = threading.Semaphore(self.concurrency)
+        app = get_app(streaming=self.streaming, checkpointed=self.checkpointed, human_selection=False)
+
+        records = []
+        skipped = 0
+        started = time.time()
+        with open(output_path, "a", encoding="utf-8") as output_file, \
+                ContextThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            in_flight = set()
+            for request in read_requests(input_path):
+                if request["id"] in skip:
+                    skipped += 1
+                    continue
+                # Read the input lazily: never hold more than `concurrency` requests in flight
+                if len(in_flight) >= self.concurrency:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        records.append(self._write(output_file, future.result(), progress))
+                in_flight.add(executor.submit(self._run_request, app, request))
+
+            for future in as_completed(in_flight):
+                records.append(self._write(output_file, future.result(), progress))
+
+        return summarize(records, time.time() - started, skipped=skipped)
+
+    def _run_request(self, app, request: Dict) -> Dict:
+        # A fresh thread per attempt: reusing one would merge the state of an earlier attempt
+        thread_id = f"batch-{request['id']}-{uuid.uuid4().hex[:8]}"
+        config = run_config(thread_id, streaming=self.streaming, human_selection=False) if self.checkpointed else {}
+        record = {"id": request["id"], "thread_id": thread_id if self.checkpointed else None}
+        progress = {"values": {}, "node_seconds": defaultdict(float), "last_node": None}
+        stop = threading.Event()
+
+        def stream_run():
+            try:
+                last = time.time()
+                # Nodes run one after another, so the time between two updates is the node's duration
+                stream = app.stream({"user_input": request["user_input"]}, config, stream_mode=["updates", "values"])
+                for mode, chunk in stream:
+                    if mode == "values":
+                        progress["values"] = chunk
+                        continue
+                    now = time.time()
+                    for node in chunk:
+                        progress["node_seconds"][node] += now - last
+                        progress["last_node"] = node
+                    last = now
+                    if stop.is_set():
+                        # Timed out: cancel before the next node (and its LLM calls) starts
+                        raise RequestTimeout(f"Stopped after {', '.join(chunk)}")
+            finally:
+                self._slots.release()
+
+        # Waits while runs abandoned after a timeout are still finishing their current node
+        self._slots.acquire()
+        started = time.time()
+        runner = ContextThreadPoolExecutor(max_workers=1)
+        try:
+            runner.submit(stream_run).result(timeout=self.timeout)
+            record["status"] = COMPLETED
+            values = progress["values"]
+            record["result"] = {key: values.get(key) for key in RESULT_KEYS if key in values}
+        except FutureTimeoutError:
+            stop.set()
+            record["status"] = TIMED_OUT
+            record["error"] = f"Exceeded {self.timeout}s (last completed node: {progress['last_node'] or 'none'})"
+        except Exception as exc:
+            record["status"] = FAILED
+            record["error"] = f"{type(exc).__name__}: {exc}"
+        finally:
+            runner.shutdown(wait=False)
+
+        record["seconds"] = round(time.time() - started, 3)
+        record["node_seconds"] = {node: round(seconds, 3) for node, seconds in dict(progress["node_seconds"]).items()}
+        get_metrics_sink().record_run(thread_id, progress["values"].get("metrics"), status=record["status"])
+        return record
+
+    def _write(self, output_file, record: Dict, progress) -> Dict:
+        with self._write_lock:
+            output_file.write(json.dumps(record, default=str) + "\n")
+            output_file.flush()
+            os.fsync(output_file.fileno())
+        if progress:
+            progress(record)
+        return record
+
+
+def summarize(records: List[Dict], wall_seconds: float, skipped: int = 0) -> Dict:
+    """
+    Aggregates batch records into counts, throughput and latency percentiles (overall and per node).
+    """
+    statuses = defaultdict(int)
+    for record in records:
+        statuses[record["status"]] += 1
+
+    per_node = defaultdict(list)
+    for record in records:
+        for node, seconds in record.get("node_seconds", {}).items():
+            per_node[node].append(seconds)
+
+    latencies = [record["seconds"] for record in records]
+    return {
+        "requests": len(records),
+        "skipped": skipped,
+        "statuses": dict(statuses),
+        "wall_seconds": round(wall_seconds, 3),
+        "requests_per_minute": round(statuses[COMPLETED] / wall_seconds * 60, 2) if wall_seconds > 0 else 0.0,
+        "latency": {"p50": round(percentile(latencies, 50), 3), "p95": round(percentile(latencies, 95), 3)},
+        "nodes": {
+            node: {
+                "count": len(seconds),
+                "p50": round(percentile(seconds, 50), 3),
+                "p95": round(percentile(seconds, 95), 3)
+            }
+            for node, seconds in sorted(per_node.items())
+        }
+    }
+
+
+def format_summary(summary: Dict) -> str:
+    lines = [
+        f"\n📈 Batch summary: {summary['requests']} requests in {summary['wall_seconds']:.1f}s "
+        f"({summary['requests_per_minute']} completed/min, {summary['skipped']} skipped as already done)",
+        "   " + ", ".join(f"{status}: {count}" for status, count in sorted(summary["statuses"].items())),
+        f"   latency p50 {summary['latency']['p50']:.2f}s, p95 {summary['latency']['p95']:.2f}s",
+        "",
+        f"   {'node':<28}{'count':>7}{'p50 (s)':>10}{'p95 (s)':>10}"
+    ]
+    for node, stats in summary["nodes"].items():
+        lines.append(f"   {node:<28}{stats['count']:>7}{stats['p50']:>10.2f}{stats['p95']:>10.2f}")
+    return "\n".join(lines)
@@ -0,0 +1,44 @@
+"""
+Workflow Checkpointer:
+Local SQLite checkpointer for the LangGraph workflow. Every completed node is persisted
+per run (thread id), so a crashed or interrupted run can be resumed from its last completed
+node and its stored state can be inspected afterwards.
+"""
+
+import os
+import sqlite3
+import threading
+
+DEFAULT_CHECKPOINT_PATH = ".workflow_checkpoints.sqlite"
+
+_checkpointer = None
+_checkpointer_lock = threading.Lock()
+
+
+def create_checkpointer(path: str = DEFAULT_CHECKPOINT_PATH):
+    """
+    Creates a SqliteSaver on its own connection. The connection is shared between threads
+    (the saver serializes access itself) and uses WAL, so readers inspecting a run do not
+    block the run writing its checkpoints.
+    """
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return SqliteSaver(conn)
+
+
+def get_checkpointer():
+    """
+    Returns the process-wide checkpointer, configured from the environment (WORKFLOW_CHECKPOINT_PATH).
+    """
+    global _checkpointer
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            _checkpointer = create_checkpointer(os.getenv("WORKFLOW_CHECKPOINT_PATH", DEFAULT_CHECKPOINT_PATH))
+        return _checkpointer
@@ -0,0 +1,171 @@
+"""
+Embedding Store:
+Content-addressed cache of code embeddings, keyed by a hash of (model name, normalised code).
+Vectors are float32, held in an in-memory LRU and optionally persisted as SQLite blobs, so
+regeneration rounds and repeated submissions only encode code the model has not seen before.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.services.metrics import model_call, record_cache_lookup
+from app.utils.helpers import content_hash, normalize_code
+
+DEFAULT_EMBEDDING_CACHE_PATH = ".embedding_cache.sqlite"
+
+
+def cosine_similarity_matrix(embeddings: np.ndarray) -> np.ndarray:
+    """
+    Returns the pairwise cosine similarities of the rows of an (n, d) matrix.
+    """
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    unit = embeddings / np.where(norms == 0, 1.0, norms)
+    return unit @ unit.T
+
+
+class EmbeddingStore:
+    def __init__(self, max_entries: int = 10000, path: Optional[str] = None, max_disk_entries: int = 100000):
+        """
+        Args:
+            max_entries (int): Size bound of the in-memory LRU.
+            path (str): Optional SQLite file to persist embeddings across runs.
+            max_disk_entries (int): Size bound of the on-disk store (least recently used rows are evicted).
+        """
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key TEXT PRIMARY KEY, dimension INTEGER NOT NULL, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def key(model_name: str, code: str) -> str:
+        return content_hash(model_name, normalize_code(code))
+
+    def embed(self, codes: List[str], model, model_name: str) -> np.ndarray:
+        """
+        Returns the (len(codes), d) float32 embeddings of the codes. Codes not in the store are
+        encoded with model in a single batch and stored.
+
+        Args:
+            codes (List[str]): Code texts.
+            model: SentenceTransformer (anything with encode(texts) returning an array).
+            model_name (str): Name the embeddings are stored under.
+        """
+        keys = [self.key(model_name, code) for code in codes]
+        found = self.get_many(keys)
+
+        missing = {}
+        for key, code in zip(keys, codes):
+            record_cache_lookup("embedding", hit=key in found)
+            if key not in found:
+                missing.setdefault(key, normalize_code(code))
+
+        if missing:
+            with model_call():
+                encoded = np.asarray(model.encode(list(missing.values()), convert_to_numpy=True), dtype=np.float32)
+            new = dict(zip(missing, encoded))
+            self.put_many(new)
+            found.update(new)
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = vector
+
+            unseen = list(dict.fromkeys(key for key in keys if key not in found))
+            if self._db is not None and unseen:
+                # SQLite limits the number of bound parameters per statement
+                for start in range(0, len(unseen), 500):
+                    chunk = unseen[start:start + 500]
+                    rows = self._db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({', '.join('?' * len(chunk))})", chunk
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = np.frombuffer(blob, dtype=np.float32)
+                        found[key] = vector
+                        self._remember(key, vector)
+                    now = time.time()
+                    self._db.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, key) for key, _ in rows]
+                    )
+                self._db.commit()
+
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def put_many(self, vectors: Dict[str, np.ndarray]):
+        with self._lock:
+            now = time.time()
+            rows = []
+            for key, vector in vectors.items():
+                vector = np.ascontiguousarray(vector, dtype=np.float32)
+                self._remember(key, vector)
+                rows.append((key, vector.shape[0], vector.tobytes(), now))
+            if self._db is not None and rows:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, dimension, vector, last_used) VALUES (?, ?, ?, ?)", rows
+                )
+                self._db.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,)
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM embeddings")
+                self._db.commit()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_embedding_store() -> EmbeddingStore:
+    """
+    Returns the process-wide embedding store, configured from the environment (EMBEDDING_CACHE_PATH,
+    set it empty to keep embeddings in memory only; EMBEDDING_CACHE_MAX_ENTRIES, EMBEDDING_CACHE_MAX_DISK_ENTRIES).
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = EmbeddingStore(
+                max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "10000")),
+                path=os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_EMBEDDING_CACHE_PATH) or None,
+                max_disk_entries=int(os.getenv("EMBEDDING_CACHE_MAX_DISK_ENTRIES", "100000"))
+            )
+        return _store
@@ -0,0 +1,111 @@
+"""
+Execution Cache:
+Content-addressed store of per-test execution outcomes, keyed by a hash of
+(normalised code, normalised test). Lets the regeneration loop and Phase 2
+reuse results instead of re-executing identical code/test pairs.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from app.utils.helpers import content_hash, normalize_code, normalize_test
+
+
+class ExecutionCache:
+    def __init__(self, max_entries: int = 10000, path: Optional[str] = None, max_disk_entries: int = 100000):
+        """
+        Args:
+            max_entries (int): Size bound of the in-memory LRU.
+            path (str): Optional SQLite file to persist outcomes across runs.
+            max_disk_entries (int): Size bound of the on-disk store (least recently used rows are evicted).
+        """
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS outcomes (key TEXT PRIMARY KEY, outcome TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def key(code: str, test: str) -> str:
+        """
+        Hashes a code/test pair (see normalize_test).
+        """
+        return content_hash(normalize_code(code), normalize_test(test))
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            outcome = self._entries.get(key)
+            if outcome is not None:
+                self._entries.move_to_end(key)
+            elif self._db is not None:
+                row = self._db.execute("SELECT outcome FROM outcomes WHERE key = ?", (key,)).fetchone()
+                if row:
+                    outcome = json.loads(row[0])
+                    self._db.execute("UPDATE outcomes SET last_used = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+                    self._remember(key, outcome)
+
+            if outcome is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return dict(outcome)
+
+    def put(self, key: str, outcome: Dict):
+        with self._lock:
+            self._remember(key, dict(outcome))
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO outcomes (key, outcome, last_used) VALUES (?, ?, ?)",
+                    (key, json.dumps(outcome), time.time())
+                )
+                self._db.execute(
+                    "DELETE FROM outcomes WHERE key IN (SELECT key FROM outcomes ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,)
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, outcome: Dict):
+        self._entries[key] = outcome
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM outcomes")
+                self._db.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_execution_cache() -> ExecutionCache:
+    """
+    Returns the process-wide execution cache. Set EXECUTION_CACHE_PATH to persist it on disk.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ExecutionCache(
+                max_entries=int(os.getenv("EXECUTION_CACHE_MAX_ENTRIES", "10000")),
+                path=os.getenv("EXECUTION_CACHE_PATH") or None
+            )
+        return _cache
@@ -0,0 +1,440 @@
+"""
+Execution Engine:
+Runs candidate code against pytest-style test functions in a pool of pre-warmed worker processes.
+Each candidate is loaded as an in-memory module (no temp files, no pytest start-up per candidate),
+under per-run CPU/memory rlimits and a wall-clock timeout. Bare asserts in the tests are rewritten
+to report the compared values, as pytest does.
+"""
+
+import ast
+import atexit
+import builtins
+import contextlib
+import inspect
+import io
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+DEFAULT_TIMEOUT = 10  # seconds per candidate, same budget as the former pytest subprocess
+DEFAULT_MEMORY_LIMIT = 1024 * 1024 * 1024  # address space per worker, in bytes
+CANDIDATE_FILENAME = "<candidate>"
+
+
+class _RunTimeout(BaseException):
+    """Raised inside a worker when a candidate exceeds its wall-clock budget."""
+
+
+def _init_worker(memory_limit: Optional[int]):
+    """
+    Warms up a worker: pre-imports pytest (tests often `import pytest`) and applies the memory limit.
+    """
+    try:
+        import pytest  # noqa: F401
+    except ImportError:
+        pass
+
+    if resource is not None and memory_limit:
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+        except (ValueError, OSError):
+            pass
+
+    # Only the parent handles Ctrl+C
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _on_alarm(signum, frame):
+    raise _RunTimeout()
+
+
+@contextlib.contextmanager
+def _run_limits(timeout: float):
+    """
+    Applies the per-run limits: a wall-clock alarm and a soft CPU limit relative to the CPU
+    already used by this worker. Exceeding the CPU limit kills the worker (SIGXCPU), which
+    the parent detects as a timeout and the pool replaces.
+    """
+    previous_handler = signal.signal(signal.SIGALRM, _on_alarm)
+    previous_cpu = None
+
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        previous_cpu = resource.getrlimit(resource.RLIMIT_CPU)
+        cpu_budget = int(usage.ru_utime + usage.ru_stime + timeout) + 1
+        hard = previous_cpu[1]
+        if hard == resource.RLIM_INFINITY or cpu_budget <= hard:
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_budget, hard))
+
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+        if previous_cpu is not None:
+            resource.setrlimit(resource.RLIMIT_CPU, previous_cpu)
+
+
+def _collect_tests(module: types.ModuleType) -> Optional[list]:
+    """
+    Collects the test functions defined in the candidate module, in definition order.
+    Returns None if a test needs pytest machinery we do not emulate (fixtures, marks).
+    """
+    tests = []
+    for name, obj in vars(module).items():
+        if not name.startswith("test") or not inspect.isfunction(obj):
+            continue
+        if obj.__code__.co_filename != CANDIDATE_FILENAME:
+            continue
+        if inspect.signature(obj).parameters or hasattr(obj, "pytestmark"):
+            return None
+        tests.append((name, obj))
+    return tests
+
+
+def _describe(exc: BaseException) -> str:
+    message = str(exc).strip().splitlines()
+    return f"{type(exc).__name__}: {message[0]}" if message else type(exc).__name__
+
+
+def _assertion_message(source: str, *values) -> str:
+    """
+    Failure message of a rewritten assert: the compared values, like pytest's "assert 0.5 == 1.0",
+    followed by the original expression.
+    """
+    if len(values) == 3:
+        left, op, right = values
+        shown = f"assert {left!r} {op} {right!r}"
+    else:
+        shown = f"assert {values[0]!r}"
+    return shown if shown == f"assert {source}" else f"{shown} (from: assert {source})"
+
+
+_COMPARE_OPERATORS = {
+    ast.Eq: "==", ast.NotEq: "!=", ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">=",
+    ast.Is: "is", ast.IsNot: "is not", ast.In: "in", ast.NotIn: "not in"
+}
+
+
+class _AssertRewriter(ast.NodeTransformer):
+    """
+    Gives the bare asserts of test functions a message with the observed values, so a failure
+    reads "assert 0.5 == 1.0" instead of just "AssertionError". Each operand is evaluated once.
+    """
+
+    def visit_FunctionDef(self, node):
+        if node.name.startswith("test"):
+            self._in_test = True
+            self.generic_visit(node)
+            self._in_test = False
+        return node
+
+    def visit_Assert(self, node):
+        if not getattr(self, "_in_test", False) or node.msg is not None:
+            return node
+        source = ast.unparse(node.test)
+        test = node.test
+        if isinstance(test, ast.Compare) and len(test.ops) == 1 and type(test.ops[0]) in _COMPARE_OPERATORS:
+            left = ast.NamedExpr(target=ast.Name("_assert_left", ast.Store()), value=test.left)
+            right = ast.NamedExpr(target=ast.Name("_assert_right", ast.Store()), value=test.comparators[0])
+            node.test = ast.Compare(left=left, ops=test.ops, comparators=[right])
+            values = [
+                ast.Name("_assert_left", ast.Load()),
+                ast.Constant(_COMPARE_OPERATORS[type(test.ops[0])]),
+                ast.Name("_assert_right", ast.Load())
+            ]
+        else:
+            node.test = ast.NamedExpr(target=ast.Name("_assert_value", ast.Store()), value=test)
+            values = [ast.Name("_assert_value", ast.Load())]
+        node.msg = ast.Call(
+            func=ast.Name("__assertion_message__", ast.Load()), args=[ast.Constant(source), *values], keywords=[]
+        )
+        return ast.fix_missing_locations(ast.copy_location(node, node))
+
+
+def _compile_candidate(source: str):
+    tree = _AssertRewriter().visit(ast.parse(source, CANDIDATE_FILENAME))
+    return compile(tree, CANDIDATE_FILENAME, "exec")
+
+
+def _run_candidate(source: str, timeout: float, fail_fast: bool = False) -> Dict:
+    """
+    Worker entry point: executes one candidate module (code + tests) and runs its tests.
+    With fail_fast the remaining tests are not run after the first failure.
+
+    Returns:
+        Dict: {"outcomes": [{"name", "passed", "detail"}], "error": Optional[str],
+               "timed_out": bool, "unsupported": bool}
+    """
+    module = types.ModuleType("candidate")
+    module.__dict__["__builtins__"] = builtins
+    module.__dict__["__assertion_message__"] = _assertion_message
+    outcomes = []
+    error = None
+    timed_out = False
+
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        try:
+            with _run_limits(timeout):
+                try:
+                    exec(_compile_candidate(source), module.__dict__)
+                except _RunTimeout:
+                    raise
+                except BaseException as exc:
+                    return {"outcomes": [], "error": _describe(exc), "timed_out": False, "unsupported": False}
+
+                tests = _collect_tests(module)
+                if tests is None:
+                    return {"outcomes": [], "error": None, "timed_out": False, "unsupported": True}
+
+                for name, test in tests:
+                    try:
+                        test()
+                        outcomes.append({"name": name, "passed": True, "detail": ""})
+                    except _RunTimeout:
+                        raise
+                    except BaseException as exc:
+                        outcomes.append({"name": name, "passed": False, "detail": _describe(exc)})
+                        if fail_fast:
+                            break
+        except _RunTimeout:
+            error = f"Timeout: candidate exceeded {timeout}s"
+            timed_out = True
+
+    return {"outcomes": outcomes, "error": error, "timed_out": timed_out, "unsupported": False}
+
+
+def format_report(outcomes: List[Dict], error: Optional[str] = None) -> str:
+    """
+    Renders outcomes in the shape of `pytest -q` output: a progress line of "." / "F" / "s",
+    one FAILED line per failing test and a summary line. Outcomes marked "skipped" are tests
+    a fail-fast run did not reach.
+    """
+    lines = []
+    if outcomes:
+        lines.append("".join("s" if o.get("skipped") else "." if o["passed"] else "F" for o in outcomes))
+    for outcome in outcomes:
+        if not outcome["passed"] and not outcome.get("skipped"):
+            lines.append(f"FAILED {outcome['name']} - {outcome['detail']}")
+    if error:
+        lines.append(f"ERROR {CANDIDATE_FILENAME} - {error}")
+
+    skipped = sum(1 for o in outcomes if o.get("skipped"))
+    failed = sum(1 for o in outcomes if not o["passed"]) - skipped
+    passed = len(outcomes) - failed - skipped
+    summary = [
+        f"{count} {label}" for count, label in ((failed, "failed"), (passed, "passed"), (skipped, "skipped")) if count
+    ]
+    if error:
+        summary.append("1 error")
+    lines.append(", ".join(summary) if summary else "no tests ran")
+    return "\n".join(lines)
+
+
+def _worker_main(conn, memory_limit: Optional[int]):
+    """
+    Worker process loop: runs one candidate per ("run", source, timeout, fail_fast) message,
+    answers ("ping",) and exits on None or when the parent goes away.
+    """
+    _init_worker(memory_limit)
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+        if message[0] == "ping":
+            conn.send("pong")
+        else:
+            _, source, timeout, fail_fast = message
+            conn.send(_run_candidate(source, timeout, fail_fast))
+
+
+class _Worker:
+    def __init__(self, context, memory_limit: Optional[int]):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, memory_limit), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        self.kill()
+
+
+def _failure(error: str, timed_out: bool) -> Dict:
+    return {"outcomes": [], "error": error, "timed_out": timed_out, "unsupported": False}
+
+
+class ExecutionEngine:
+    def __init__(
+        self,
+        processes: int = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        memory_limit: Optional[int] = DEFAULT_MEMORY_LIMIT,
+        max_tasks_per_child: int = 100
+    ):
+        """
+        Pool of isolated worker processes for running candidates in parallel. The pool can be
+        shared by concurrent callers: a candidate's time budget starts when a worker picks it
+        up, and a worker that exceeds it (or dies) is replaced on its own, without affecting
+        the candidates other workers are running.
+
+        Args:
+            processes (int): Number of workers (defaults to the CPU count).
+            timeout (float): Wall-clock budget per candidate, in seconds.
+            memory_limit (int): Address-space limit per worker in bytes (None to disable).
+            max_tasks_per_child (int): Workers are recycled after this many candidates,
+                so state leaked by one candidate cannot accumulate.
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.max_tasks_per_child = max_tasks_per_child
+        self._context = None
+        self._idle = None
+        self._workers = set()
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._idle is None:
+                # forkserver/spawn workers start from a clean interpreter instead of
+                # forking a parent that may hold torch or HTTP client threads
+                methods = multiprocessing.get_all_start_methods()
+                self._context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                self._idle = queue.Queue()
+                for _ in range(self.processes):
+                    self._idle.put(self._spawn())
+            return self._idle
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._context, self.memory_limit)
+        self._workers.add(worker)
+        return worker
+
+    def _replace(self, worker: _Worker, graceful: bool = False) -> _Worker:
+        if graceful:
+            worker.stop()
+        else:
+            worker.kill()
+        with self._lock:
+            self._workers.discard(worker)
+            return self._spawn()
+
+    def warm_up(self):
+        """
+        Starts the worker processes ahead of the first request.
+        """
+        idle = self._start()
+        workers = [idle.get() for _ in range(self.processes)]
+        for worker in workers:
+            try:
+                worker.conn.send(("ping",))
+                worker.conn.recv()
+            except (EOFError, OSError):
+                worker = self._replace(worker)
+            idle.put(worker)
+
+    def run(self, sources: List[str], fail_fast: bool = False) -> List[Dict]:
+        """
+        Runs every candidate source (code + tests as one module) in parallel.
+
+        Args:
+            sources (List[str]): Full module sources, one per candidate.
+            fail_fast (bool): Stop each candidate at its first failing test.
+
+        Returns:
+            List[Dict]: Per candidate, in input order: {"outcomes", "error", "timed_out", "unsupported"}.
+        """
+        if not sources:
+            return []
+
+        self._start()
+        with ThreadPoolExecutor(max_workers=min(len(sources), self.processes)) as executor:
+            return list(executor.map(lambda source: self._run_one(source, fail_fast), sources))
+
+    def _run_one(self, source: str, fail_fast: bool) -> Dict:
+        # Waiting for a free worker does not count against the candidate's budget
+        idle = self._idle
+        worker = idle.get()
+        try:
+            result, broken = self._execute(worker, source, fail_fast)
+            worker.tasks += 1
+            if broken or worker.tasks >= self.max_tasks_per_child:
+                # Only this worker is replaced; the others keep running their candidates
+                worker = self._replace(worker, graceful=not broken)
+        finally:
+            idle.put(worker)
+        return result
+
+    def _execute(self, worker: _Worker, source: str, fail_fast: bool) -> Tuple[Dict, bool]:
+        """
+        Runs one candidate on a worker. Returns the result and whether the worker must be replaced.
+        """
+        try:
+            worker.conn.send(("run", source, self.timeout, fail_fast))
+            # The worker enforces the timeout itself; this only catches workers that ignore it
+            if not worker.conn.poll(self.timeout + 5):
+                return _failure(f"Timeout: candidate exceeded {self.timeout}s", timed_out=True), True
+            return worker.conn.recv(), False
+        except (EOFError, OSError):
+            # The worker died: killed by its CPU limit (a timeout) or crashed
+            worker.process.join(timeout=1)
+            exitcode = worker.process.exitcode
+            if resource is not None and exitcode == -signal.SIGXCPU:
+                return _failure(f"Timeout: candidate exceeded {self.timeout}s", timed_out=True), True
+            return _failure(f"Worker crashed (exit code {exitcode})", timed_out=False), True
+        except Exception as exc:
+            # E.g. a result that cannot be pickled; the worker itself is still usable
+            return _failure(_describe(exc), timed_out=False), False
+
+    def shutdown(self):
+        """
+        Stops all workers. Only for process exit: candidates still running fail.
+        """
+        with self._lock:
+            workers, self._workers = self._workers, set()
+            self._idle = None
+        for worker in workers:
+            worker.kill()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_execution_engine() -> ExecutionEngine:
+    """
+    Returns the process-wide execution engine, creating it on first use.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = ExecutionEngine()
+            atexit.register(_engine.shutdown)
+        return _engine
@@ -0,0 +1,50 @@
+"""
+Execution Matrix:
+Codes × tests outcome table of one workflow run, kept in the state ("execution_matrix") so Phase 2
+and later regeneration rounds only execute the code/test pairs that have not run yet. It also
+provides the per-test failure history used to run the most discriminating tests first.
+"""
+
+from typing import Dict, List, Optional
+
+from app.utils.helpers import content_hash, normalize_code, normalize_test
+
+
+class ExecutionMatrix:
+    def __init__(self, data: Dict[str, Dict[str, Dict]] = None):
+        """
+        Args:
+            data: {code key: {test key: {"passed", "detail"}}}, as stored in the state.
+                Copied, so the state passed in is not modified.
+        """
+        self.data = {code: dict(tests) for code, tests in (data or {}).items()}
+
+    @staticmethod
+    def code_key(code: str) -> str:
+        return content_hash(normalize_code(code))
+
+    @staticmethod
+    def test_key(test: str) -> str:
+        return content_hash(normalize_test(test))
+
+    def get(self, code_key: str, test_key: str) -> Optional[Dict]:
+        outcome = self.data.get(code_key, {}).get(test_key)
+        return dict(outcome) if outcome is not None else None
+
+    def put(self, code_key: str, test_key: str, outcome: Dict):
+        self.data.setdefault(code_key, {})[test_key] = {"passed": outcome["passed"], "detail": outcome["detail"]}
+
+    def failure_rate(self, test_key: str) -> float:
+        """
+        Share of the codes run so far that failed the test, smoothed towards 0.5 for tests with
+        little history.
+        """
+        runs = [tests[test_key]["passed"] for tests in self.data.values() if test_key in tests]
+        return (runs.count(False) + 1) / (len(runs) + 2)
+
+    def order_tests(self, test_keys: List[str]) -> List[int]:
+        """
+        Returns the test indices ordered by failure rate, highest first (ties keep the given order).
+        """
+        rates = [self.failure_rate(key) for key in test_keys]
+        return sorted(range(len(test_keys)), key=lambda j: -rates[j])
@@ -0,0 +1,291 @@
+"""
+HITL Handler:
+The one path for runs whose test selection pauses on a graph interrupt (CLI and API): starts them,
+resumes them once a selection is submitted, and answers timed-out selections automatically.
+A paused run holds no thread, model or client: its state lives in the checkpointer, so one worker
+can keep many runs waiting for a person.
+"""
+
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from langgraph.types import Command
+
+from agents.test_selection_agent import TestSelectionAgent
+from graphs.workflow import get_app, get_run_app, run_config
+
+DEFAULT_SELECTION_TIMEOUT = 15 * 60
+
+
+def auto_select_tests(valid_tests: List[str], invalid_tests: List[str]) -> Dict[str, int]:
+    """
+    Automatic selection used when nobody answers in time (see TestSelectionAgent).
+    """
+    selection = TestSelectionAgent().select(valid_tests, invalid_tests)
+    return {"valid_index": selection["valid_index"] or 0, "invalid_index": selection["invalid_index"] or 0}
+
+
+class HITLHandler:
+    def __init__(
+        self,
+        timeout_seconds: Optional[float] = DEFAULT_SELECTION_TIMEOUT,
+        sweep_interval: float = 5.0,
+        resume_workers: int = 2,
+        on_complete: Optional[Callable[[str, Dict], None]] = None,
+        on_timeout: Optional[Callable[[Dict], None]] = None
+    ):
+        """
+        Args:
+            timeout_seconds (float): Seconds a run waits for a selection before it is resumed
+                with auto_select_tests (None: wait forever).
+            sweep_interval (float): How often pending runs are checked for timeouts.
+            resume_workers (int): Threads resuming timed-out runs.
+            on_complete (Callable): Called with (thread_id, result) whenever a run resumed after a
+                timeout stops again, since there is no caller to return the result to.
+            on_timeout (Callable): Replaces the automatic resume: called with the pending run
+                (see pending_runs) once its deadline passes, e.g. to queue it elsewhere.
+        """
+        self.timeout_seconds = timeout_seconds
+        self.sweep_interval = sweep_interval
+        self.on_complete = on_complete
+        self.on_timeout = on_timeout
+        self._pending: Dict[str, Dict] = {}
+        self._resuming = set()
+        self._lock = threading.Lock()
+        self._executor = ContextThreadPoolExecutor(max_workers=resume_workers)
+        self._sweeper = None
+        self._stop = threading.Event()
+
+    def start_run(
+        self,
+        user_input: str,
+        thread_id: str = None,
+        human_selection: bool = True,
+        on_node: Optional[Callable[[str], None]] = None
+    ) -> Dict:
+        """
+        Runs the workflow until it finishes or pauses for a test selection.
+        With human_selection=False the tests are selected automatically and the run never pauses.
+
+        Args:
+            on_node (Callable): Called with the name of every node as it completes.
+
+        Returns:
+            Dict: {"thread_id", "status": "awaiting_selection", "valid_tests", "invalid_tests"}
+                or {"thread_id", "status": "completed", "state"}.
+        """
+        thread_id = thread_id or uuid.uuid4().hex
+        app = get_app(checkpointed=True, human_selection=human_selection)
+        config = run_config(thread_id, human_selection=human_selection)
+        return self._run(thread_id, app, {"user_input": user_input}, config, on_node)
+
+    def pending_runs(self) -> List[Dict]:
+        """
+        Returns the runs waiting for a selection, oldest first.
+        """
+        with self._lock:
+            return sorted(self._pending.values(), key=lambda pending: pending["created"])
+
+    def get_pending(self, thread_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self._pending.get(thread_id)
+
+    def submit_selection(
+        self,
+        thread_id: str,
+        valid_index: int,
+        invalid_index: int,
+        source: str = "human",
+        on_node: Optional[Callable[[str], None]] = None
+    ) -> Dict:
+        """
+        Resumes a paused run with the selected test indices and runs it until it finishes
+        (or pauses again). See claim_selection and resume.
+
+        Raises:
+            KeyError: The run is not waiting for a selection (or was already answered).
+            ValueError: An index is out of range.
+        """
+        selection = self.claim_selection(thread_id, valid_index, invalid_index, source)
+        return self.resume(thread_id, selection, on_node)
+
+    def claim_selection(self, thread_id: str, valid_index: int, invalid_index: int, source: str = "human") -> Dict:
+        """
+        Validates a selection for a paused run and takes the run off the pending list, so only one
+        of human and timeout answers it. Runs paused before a restart are found through their checkpoint.
+        The run must then be continued with resume(thread_id, selection).
+
+        Returns:
+            Dict: The resume value ({"valid_index", "invalid_index", "source"}).
+
+        Raises:
+            KeyError: The run is not waiting for a selection (or was already answered).
+            ValueError: An index is out of range.
+        """
+        with self._lock:
+            pending = None
+            if thread_id not in self._resuming:
+                pending = self._pending.get(thread_id) or self._load_pending(thread_id)
+            if pending is None:
+                raise KeyError(f"Run {thread_id} is not waiting for a test selection")
+            if not 0 <= valid_index < len(pending["valid_tests"]):
+                raise ValueError(f"Valid test index {valid_index} out of range")
+            if not 0 <= invalid_index < len(pending["invalid_tests"]):
+                raise ValueError(f"Invalid test index {invalid_index} out of range")
+            self._pending.pop(thread_id, None)
+            self._resuming.add(thread_id)
+        return {"valid_index": valid_index, "invalid_index": invalid_index, "source": source}
+
+    def resume(
+        self,
+        thread_id: str,
+        selection: Optional[Dict] = None,
+        on_node: Optional[Callable[[str], None]] = None
+    ) -> Dict:
+        """
+        Continues a checkpointed run: with a claimed selection if it paused for one, otherwise
+        from its last completed node (a run still waiting for a selection then pauses again).
+
+        Returns:
+            Dict: As for start_run.
+        """
+        config = {"configurable": {"thread_id": thread_id}}
+        if selection is not None:
+            print(
+                f"\n▶️ Resuming run {thread_id} with {selection.get('source', 'human')} test selection "
+                f"({selection['valid_index']}, {selection['invalid_index']})"
+            )
+        try:
+            graph_input = Command(resume=selection) if selection is not None else None
+            return self._run(thread_id, get_run_app(thread_id), graph_input, config, on_node)
+        finally:
+            with self._lock:
+                self._resuming.discard(thread_id)
+
+    def expire_pending(self, now: float = None) -> List[str]:
+        """
+        Resumes every run whose selection deadline has passed with an automatic selection
+        (or hands it to on_timeout).
+
+        Returns:
+            List[str]: Thread ids of the runs being resumed.
+        """
+        now = now or time.time()
+        with self._lock:
+            expired = [p for p in self._pending.values() if p["deadline"] is not None and p["deadline"] <= now]
+            for pending in expired:
+                pending["deadline"] = None  # scheduled once; a human answer until then still wins
+
+        for pending in expired:
+            if self.on_timeout:
+                self.on_timeout(pending)
+            else:
+                self._executor.submit(self._resume_automatically, pending)
+        return [pending["thread_id"] for pending in expired]
+
+    def shutdown(self):
+        self._stop.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _resume_automatically(self, pending: Dict):
+        selection = auto_select_tests(pending["valid_tests"], pending["invalid_tests"])
+        try:
+            result = self.submit_selection(pending["thread_id"], source="automatic", **selection)
+        except KeyError:
+            return  # answered in the meantime
+        except Exception as exc:
+            print(f"⚠️ Resuming run {pending['thread_id']} after selection timeout failed: {exc}")
+            return
+        if self.on_complete:
+            self.on_complete(pending["thread_id"], result)
+
+    def _run(self, thread_id: str, app, graph_input, config: Dict, on_node) -> Dict:
+        for update in app.stream(graph_input, config, stream_mode="updates"):
+            for node in update:
+                if node != "__interrupt__" and on_node:
+                    on_node(node)
+        return self._after_step(thread_id, app.get_state(config))
+
+    def _after_step(self, thread_id: str, snapshot) -> Dict:
+        if not snapshot.interrupts:
+            return {"thread_id": thread_id, "status": "completed", "state": snapshot.values}
+
+        pending = self._new_pending(thread_id, snapshot.interrupts[0].value)
+        with self._lock:
+            self._pending[thread_id] = pending
+        self._ensure_sweeper()
+
+        print(f"\n⏸️ Run {thread_id} is waiting for a test selection")
+        return {
+            "thread_id": thread_id,
+            "status": "awaiting_selection",
+            "valid_tests": pending["valid_tests"],
+            "invalid_tests": pending["invalid_tests"]
+        }
+
+    def _new_pending(self, thread_id: str, payload: Dict) -> Dict:
+        created = time.time()
+        return {
+            "thread_id": thread_id,
+            "valid_tests": payload.get("valid_tests", []),
+            "invalid_tests": payload.get("invalid_tests", []),
+            "created": created,
+            "deadline": created + self.timeout_seconds if self.timeout_seconds is not None else None
+        }
+
+    def _load_pending(self, thread_id: str) -> Optional[Dict]:
+        try:
+            snapshot = get_run_app(thread_id).get_state({"configurable": {"thread_id": thread_id}})
+        except ValueError:
+            return None
+        if not snapshot.interrupts:
+            return None
+        return self._new_pending(thread_id, snapshot.interrupts[0].value)
+
+    def _ensure_sweeper(self):
+        if self.timeout_seconds is None or (self._sweeper and self._sweeper.is_alive()):
+            return
+        with self._lock:
+            if self._sweeper is None or not self._sweeper.is_alive():
+                self._sweeper = threading.Thread(target=self._sweep, name="hitl-timeouts", daemon=True)
+                self._sweeper.start()
+
+    def _sweep(self):
+        while not self._stop.wait(self.sweep_interval):
+            self.expire_pending()
+
+
+def answer_on_console(handler: HITLHandler, outcome: Dict) -> Dict:
+    """
+    Asks on the console for every test selection the run pauses for, until it completes.
+
+    Returns:
+        Dict: The run's final state.
+    """
+    from graphs.human_test_selector_node import prompt_console_selection
+
+    while outcome["status"] == "awaiting_selection":
+        selection = prompt_console_selection(outcome["valid_tests"], outcome["invalid_tests"])
+        outcome = handler.submit_selection(outcome["thread_id"], **selection)
+    return outcome["state"]
+
+
+_handler = None
+_handler_lock = threading.Lock()
+
+
+def get_hitl_handler() -> HITLHandler:
+    """
+    Returns the process-wide handler, configured from the environment (HITL_SELECTION_TIMEOUT_SECONDS;
+    0 or less waits forever).
+    """
+    global _handler
+    with _handler_lock:
+        if _handler is None:
+            timeout = float(os.getenv("HITL_SELECTION_TIMEOUT_SECONDS", str(DEFAULT_SELECTION_TIMEOUT)))
+            _handler = HITLHandler(timeout_seconds=timeout if timeout > 0 else None)
+        return _handler
@@ -0,0 +1,140 @@
+"""
+LLM Response Cache:
+Persistent SQLite cache for deterministic (temperature 0) LLM calls, plugged into LangChain's
+cache interface. Entries are keyed by the model parameters (model, temperature, ...) and a
+hash of the prompt, expire after a TTL and are evicted least-recently-used beyond a size bound.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+from app.services.metrics import record_cache_lookup
+from app.utils.helpers import content_hash
+
+DEFAULT_CACHE_PATH = ".llm_cache.sqlite"
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+class SQLiteResponseCache(BaseCache):
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+        max_entries: int = 50000
+    ):
+        """
+        Args:
+            path (str): SQLite file holding the responses.
+            ttl_seconds (float): Entries older than this are ignored and removed (None = no expiry).
+            max_entries (int): Size bound; least recently used entries are evicted.
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        # llm_string is LangChain's serialisation of the model parameters (model, temperature, ...)
+        return content_hash(llm_string, content_hash(prompt))
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        key = self._key(prompt, llm_string)
+        now = time.time()
+
+        with self._lock:
+            row = self._db.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                row = None
+
+            if row is None:
+                self.misses += 1
+                record_cache_lookup("llm_response", hit=False)
+                return None
+
+            self.hits += 1
+            record_cache_lookup("llm_response", hit=True)
+            self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._db.commit()
+
+        return [loads(generation) for generation in json.loads(row[0])]
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        key = self._key(prompt, llm_string)
+        response = json.dumps([dumps(generation) for generation in return_val])
+        now = time.time()
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._db.commit()
+
+    def clear(self, **kwargs) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters for this process and the current number of stored entries.
+        """
+        with self._lock:
+            size = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": size}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> SQLiteResponseCache:
+    """
+    Returns the process-wide response cache, configured from the environment
+    (LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_ENTRIES; a TTL of 0 or less never expires).
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            ttl = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(DEFAULT_TTL_SECONDS)))
+            _cache = SQLiteResponseCache(
+                path=os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH),
+                ttl_seconds=ttl if ttl > 0 else None,
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+            )
+        return _cache
+
+
+def response_cache_for(temperature: float):
+    """
+    Chooses the `cache` argument for a chat model; every agent passes its temperature through here.
+    Deterministic (temperature 0) models share the response cache; sampling models (code and test
+    generation) get False so they bypass every cache, including a global LangChain cache.
+    Set LLM_CACHE_ENABLED=0 to disable caching altogether.
+    """
+    if temperature > 0 or os.getenv("LLM_CACHE_ENABLED", "1") == "0":
+        return False
+    return get_response_cache()
@@ -0,0 +1,312 @@
+"""
+Run Metrics:
+Instrumentation for workflow runs. Every graph node runs inside track_node, which collects its
+wall time, queue time, LLM calls and tokens (via a LangChain callback handler attached to every
+chat model call made from the node), cache hits, subprocesses, model calls and model load time.
+The per-node records end up in the run's state under "metrics" and can be exported to a local
+JSONL file and a Prometheus text file (MetricsSink).
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+# Counters summed over all nodes of a run
+COUNTERS = (
+    "wall_seconds", "queue_seconds", "llm_calls", "llm_cached_calls", "llm_errors", "llm_seconds",
+    "prompt_tokens", "completion_tokens", "subprocesses", "engine_runs", "model_calls", "model_seconds",
+    "model_load_seconds"
+)
+
+_current_node: ContextVar[Optional["NodeMetrics"]] = ContextVar("workflow_node_metrics", default=None)
+_callback_handler: ContextVar[Optional["MetricsCallbackHandler"]] = ContextVar("workflow_metrics_callback", default=None)
+
+# LangChain adds the handler in this variable to every chat model call made in the same context
+register_configure_hook(_callback_handler, inheritable=True)
+
+
+class NodeMetrics:
+    """
+    Counters of one node execution. Updated from the node's thread and the worker threads it spawns.
+    """
+
+    def __init__(self, node: str, queue_seconds: float = 0.0):
+        self.node = node
+        self.started_at = time.time()
+        self.ended_at = None
+        self.counters = {counter: 0 for counter in COUNTERS}
+        self.counters["queue_seconds"] = round(queue_seconds, 4)
+        self.caches: Dict[str, Dict[str, int]] = {}
+        self.model_loads: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for counter, value in counts.items():
+                self.counters[counter] += value
+
+    def add_cache_lookup(self, cache: str, hit: bool):
+        with self._lock:
+            entry = self.caches.setdefault(cache, {"hits": 0, "misses": 0})
+            entry["hits" if hit else "misses"] += 1
+
+    def add_model_load(self, model: str, seconds: float):
+        with self._lock:
+            self.model_loads[model] = self.model_loads.get(model, 0.0) + seconds
+            self.counters["model_load_seconds"] += seconds
+
+    def as_dict(self) -> Dict:
+        with self._lock:
+            record = {"node": self.node, "started_at": self.started_at, "ended_at": self.ended_at}
+            record.update({counter: _round(value) for counter, value in self.counters.items()})
+            record["caches"] = {cache: dict(entry) for cache, entry in self.caches.items()}
+            record["model_loads"] = {model: round(seconds, 4) for model, seconds in self.model_loads.items()}
+        return record
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Records duration and token usage of every chat model call into the node's metrics.
+    Cached responses are counted as cached calls, without tokens.
+    """
+
+    def __init__(self, metrics: NodeMetrics):
+        self.metrics = metrics
+        self._started: Dict = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        started = self._started.pop(run_id, None)
+        seconds = time.perf_counter() - started if started is not None else 0.0
+
+        prompt_tokens = completion_tokens = 0
+        cached = False
+        for generation in (response.generations[0] if response.generations else []):
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            # LangChain zeroes the cost of responses served from the cache
+            cached = cached or usage.get("total_cost") == 0
+            prompt_tokens += usage.get("input_tokens", 0)
+            completion_tokens += usage.get("output_tokens", 0)
+
+        if cached:
+            self.metrics.add(llm_calls=1, llm_cached_calls=1, llm_seconds=seconds)
+        else:
+            self.metrics.add(
+                llm_calls=1, llm_seconds=seconds, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+            )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        started = self._started.pop(run_id, None)
+        seconds = time.perf_counter() - started if started is not None else 0.0
+        self.metrics.add(llm_calls=1, llm_errors=1, llm_seconds=seconds)
+
+
+def _round(value):
+    return round(value, 4) if isinstance(value, float) else value
+
+
+@contextmanager
+def track_node(node: str, previous: Optional[Dict] = None):
+    """
+    Collects metrics for everything executed in this context (and in threads started from it
+    with a copied context, e.g. ContextThreadPoolExecutor or Runnable.batch).
+
+    Args:
+        node (str): Node name.
+        previous (Dict): The run's metrics so far; the time since its last node ended is the queue time
+            (scheduling, checkpoint writes, waiting in the job queue or for a test selection).
+    """
+    last_node = (previous or {}).get("nodes", [])[-1:]
+    queue_seconds = max(time.time() - last_node[0]["ended_at"], 0.0) if last_node else 0.0
+
+    metrics = NodeMetrics(node, queue_seconds=queue_seconds)
+    node_token = _current_node.set(metrics)
+    handler_token = _callback_handler.set(MetricsCallbackHandler(metrics))
+    started = time.perf_counter()
+    try:
+        yield metrics
+    finally:
+        metrics.add(wall_seconds=time.perf_counter() - started)
+        metrics.ended_at = time.time()
+        _callback_handler.reset(handler_token)
+        _current_node.reset(node_token)
+
+
+def record(**counts):
+    """
+    Adds to counters of the node currently being tracked (no-op outside a node).
+    """
+    metrics = _current_node.get()
+    if metrics is not None:
+        metrics.add(**counts)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    metrics = _current_node.get()
+    if metrics is not None:
+        metrics.add_cache_lookup(cache, hit)
+
+
+def record_model_load(model: str, seconds: float):
+    metrics = _current_node.get()
+    if metrics is not None:
+        metrics.add_model_load(model, seconds)
+
+
+@contextmanager
+def model_call():
+    """
+    Times a call into a local model (embedding, cross-encoder).
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(model_calls=1, model_seconds=time.perf_counter() - started)
+
+
+def summarize_nodes(nodes: List[Dict]) -> Dict:
+    """
+    Sums the per-node records of a run into run totals.
+    """
+    totals = {counter: 0 for counter in COUNTERS}
+    caches = {}
+    for node in nodes:
+        for counter in COUNTERS:
+            totals[counter] += node.get(counter, 0)
+        for cache, entry in node.get("caches", {}).items():
+            summed = caches.setdefault(cache, {"hits": 0, "misses": 0})
+            summed["hits"] += entry["hits"]
+            summed["misses"] += entry["misses"]
+    totals = {counter: _round(value) for counter, value in totals.items()}
+    totals["caches"] = caches
+    return totals
+
+
+def merge_metrics(left: Optional[Dict], right: Optional[Dict]) -> Dict:
+    """
+    State reducer for "metrics": appends the node records of an update and recomputes the totals.
+    """
+    nodes = (left or {}).get("nodes", []) + (right or {}).get("nodes", [])
+    return {"nodes": nodes, "totals": summarize_nodes(nodes)}
+
+
+def format_metrics(metrics: Dict) -> str:
+    lines = [f"   {'node':<26}{'seconds':>9}{'queue':>8}{'llm':>6}{'cached':>8}{'tokens in':>11}{'tokens out':>12}{'procs':>7}"]
+    for node in metrics.get("nodes", []):
+        lines.append(
+            f"   {node['node']:<26}{node['wall_seconds']:>9.2f}{node['queue_seconds']:>8.2f}{node['llm_calls']:>6}"
+            f"{node['llm_cached_calls']:>8}{node['prompt_tokens']:>11}{node['completion_tokens']:>12}"
+            f"{node['subprocesses'] + node['engine_runs']:>7}"
+        )
+    return "\n".join(lines)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsSink:
+    def __init__(self, jsonl_path: str = None, prometheus_path: str = None):
+        """
+        Args:
+            jsonl_path (str): Append one JSON line per recorded run here.
+            prometheus_path (str): Keep counters over all recorded runs of this process in this file,
+                in the Prometheus text format (e.g. for the node exporter's textfile collector).
+        """
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self._samples: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def record_run(self, run_id: str, metrics: Optional[Dict], status: str = "completed"):
+        """
+        Exports the metrics of one finished run.
+        """
+        metrics = metrics or {"nodes": [], "totals": summarize_nodes([])}
+        with self._lock:
+            self._aggregate(metrics, status)
+            if self.jsonl_path:
+                with open(self.jsonl_path, "a", encoding="utf-8") as jsonl_file:
+                    jsonl_file.write(json.dumps({"run_id": run_id, "status": status, "recorded_at": time.time(), **metrics}) + "\n")
+            if self.prometheus_path:
+                # Write-then-rename, so a scraper never sees a half-written file
+                temp_path = f"{self.prometheus_path}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as prometheus_file:
+                    prometheus_file.write(self._render())
+                os.replace(temp_path, self.prometheus_path)
+
+    def prometheus_text(self) -> str:
+        with self._lock:
+            return self._render()
+
+    def _add(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        self._samples[key] = self._samples.get(key, 0) + value
+
+    def _aggregate(self, metrics: Dict, status: str):
+        self._add("codegen_runs_total", 1, status=status)
+        for node in metrics.get("nodes", []):
+            name = node["node"]
+            self._add("codegen_node_seconds_sum", node["wall_seconds"], node=name)
+            self._add("codegen_node_seconds_count", 1, node=name)
+            self._add("codegen_node_queue_seconds_total", node["queue_seconds"], node=name)
+            self._add("codegen_llm_calls_total", node["llm_calls"] - node["llm_cached_calls"], node=name, cached="false")
+            self._add("codegen_llm_calls_total", node["llm_cached_calls"], node=name, cached="true")
+            self._add("codegen_llm_errors_total", node["llm_errors"], node=name)
+            self._add("codegen_llm_seconds_total", node["llm_seconds"], node=name)
+            self._add("codegen_llm_tokens_total", node["prompt_tokens"], node=name, type="prompt")
+            self._add("codegen_llm_tokens_total", node["completion_tokens"], node=name, type="completion")
+            self._add("codegen_subprocesses_total", node["subprocesses"], node=name)
+            self._add("codegen_engine_runs_total", node["engine_runs"], node=name)
+            self._add("codegen_model_calls_total", node["model_calls"], node=name)
+            self._add("codegen_model_seconds_total", node["model_seconds"], node=name)
+            for cache, entry in node.get("caches", {}).items():
+                self._add("codegen_cache_lookups_total", entry["hits"], cache=cache, result="hit")
+                self._add("codegen_cache_lookups_total", entry["misses"], cache=cache, result="miss")
+            for model, seconds in node.get("model_loads", {}).items():
+                self._add("codegen_model_load_seconds_total", seconds, model=model)
+
+    def _render(self) -> str:
+        lines = []
+        declared = set()
+        for (name, labels), value in sorted(self._samples.items()):
+            family = name.rsplit("_", 1)[0] if name.endswith(("_sum", "_count")) else name
+            if family not in declared:
+                declared.add(family)
+                kind = "summary" if family != name else "counter"
+                lines.append(f"# TYPE {family} {kind}")
+            label_text = ",".join(f'{key}="{_escape(label)}"' for key, label in labels)
+            lines.append(f"{name}{{{label_text}}} {round(value, 6)}" if label_text else f"{name} {round(value, 6)}")
+        return "\n".join(lines) + "\n"
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_metrics_sink() -> MetricsSink:
+    """
+    Returns the process-wide metrics sink, configured from the environment
+    (WORKFLOW_METRICS_JSONL, WORKFLOW_METRICS_PROMETHEUS; unset: keep counters in memory only).
+    """
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            _sink = MetricsSink(
+                jsonl_path=os.getenv("WORKFLOW_METRICS_JSONL") or None,
+                prometheus_path=os.getenv("WORKFLOW_METRICS_PROMETHEUS") or None
+            )
+        return _sink
@@ -0,0 +1,152 @@
+"""
+Model Registry:
+Process-wide, thread-safe registry of heavy models (SentenceTransformer, CrossEncoder).
+Each model is loaded lazily once per process and shared by every agent; load time and
+resident memory growth are recorded per model. Loaders can be overridden (e.g. by benchmarks).
+Inference can be run on a shared, bounded executor (get_model_executor), so concurrent runs
+do not oversubscribe the CPU with model passes.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+
+from app.services.metrics import record_model_load
+from app.utils.helpers import current_rss_bytes
+
+DEFAULT_SENTENCE_TRANSFORMER = "all-MiniLM-L6-v2"
+DEFAULT_CROSS_ENCODER = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], object]] = {}
+        self._models: Dict[str, object] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, key: str, loader: Callable[[], object], replace: bool = False):
+        """
+        Registers how to load a model. With replace=True an existing loader (and any
+        already loaded instance) is swapped out.
+        """
+        with self._lock:
+            if key in self._loaders and not replace:
+                return
+            self._loaders[key] = loader
+            self._locks.setdefault(key, threading.Lock())
+            if replace:
+                self._models.pop(key, None)
+                self._stats.pop(key, None)
+
+    def get(self, key: str):
+        """
+        Returns the model, loading it on first use. Concurrent callers wait for a single load.
+        """
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            if key not in self._loaders:
+                raise KeyError(f"No model registered under '{key}'")
+            loader = self._loaders[key]
+            key_lock = self._locks[key]
+
+        with key_lock:
+            model = self._models.get(key)
+            if model is None:
+                rss_before = current_rss_bytes()
+                started = time.perf_counter()
+                model = loader()
+                self._stats[key] = {
+                    "load_seconds": round(time.perf_counter() - started, 4),
+                    "rss_delta_bytes": max(current_rss_bytes() - rss_before, 0)
+                }
+                self._models[key] = model
+                record_model_load(key, self._stats[key]["load_seconds"])
+                print(f"📦 Loaded {key} in {self._stats[key]['load_seconds']:.2f}s")
+        return model
+
+    def is_loaded(self, key: str) -> bool:
+        return key in self._models
+
+    def warm_up(self, keys: Optional[Iterable[str]] = None):
+        """
+        Loads the given models (default: every registered model) ahead of the first request.
+        """
+        with self._lock:
+            keys = list(keys) if keys is not None else list(self._loaders)
+        for key in keys:
+            self.get(key)
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns {model key: {"load_seconds", "rss_delta_bytes"}} for every loaded model.
+        """
+        return {key: dict(stats) for key, stats in self._stats.items()}
+
+
+registry = ModelRegistry()
+
+
+def _register_sentence_transformer(model_name: str) -> str:
+    key = f"sentence_transformer/{model_name}"
+
+    def load():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+
+    registry.register(key, load)
+    return key
+
+
+def _register_cross_encoder(model_name: str) -> str:
+    key = f"cross_encoder/{model_name}"
+
+    def load():
+        from sentence_transformers import CrossEncoder
+        return CrossEncoder(model_name)
+
+    registry.register(key, load)
+    return key
+
+
+def get_sentence_transformer(model_name: str = DEFAULT_SENTENCE_TRANSFORMER):
+    return registry.get(_register_sentence_transformer(model_name))
+
+
+def get_cross_encoder(model_name: str = DEFAULT_CROSS_ENCODER):
+    return registry.get(_register_cross_encoder(model_name))
+
+
+def warm_up_models():
+    """
+    Loads the default scoring models; call at service start-up to keep model loading off the request path.
+    """
+    registry.warm_up([
+        _register_sentence_transformer(DEFAULT_SENTENCE_TRANSFORMER),
+        _register_cross_encoder(DEFAULT_CROSS_ENCODER)
+    ])
+
+
+_model_executor = None
+_model_executor_lock = threading.Lock()
+
+
+def get_model_executor() -> ContextThreadPoolExecutor:
+    """
+    Returns the process-wide executor for model inference (MODEL_INFERENCE_WORKERS threads, default 2).
+    """
+    global _model_executor
+    with _model_executor_lock:
+        if _model_executor is None:
+            _model_executor = ContextThreadPoolExecutor(
+                max_workers=int(os.getenv("MODEL_INFERENCE_WORKERS", "2")),
+                thread_name_prefix="model-inference"
+            )
+        return _model_executor
@@ -0,0 +1,255 @@
+"""
+Workflow Orchestrator:
+Bounded in-process job queue for the API. Jobs are checkpointed workflow runs (thread id = job id)
+executed by a fixed number of async workers through the HITLHandler, each in a worker thread,
+publishing per-node progress events. A run waiting for a human test selection frees its worker
+and is queued again once the selection (or the handler's selection timeout) arrives.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.services.hitl_handler import DEFAULT_SELECTION_TIMEOUT, HITLHandler, auto_select_tests
+from app.services.metrics import get_metrics_sink
+
+QUEUED = "queued"
+RUNNING = "running"
+AWAITING_SELECTION = "awaiting_selection"
+COMPLETED = "completed"
+FAILED = "failed"
+FINISHED_STATUSES = (COMPLETED, FAILED)
+
+# State keys returned as the final artifacts of a job
+RESULT_KEYS = (
+    "request_type", "general_answer", "final_validated_codes", "scoring_results",
+    "best_code", "evaluation_summary", "optimized_code", "test_selection", "metrics"
+)
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, user_input: str, human_selection: bool):
+        self.id = uuid.uuid4().hex
+        self.user_input = user_input
+        self.human_selection = human_selection
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.current_node = None
+        self.completed_nodes: List[str] = []
+        self.selection_request: Optional[Dict] = None
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.events: List[Dict] = []
+        self.resume_value = None  # selection to resume the paused run with
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+
+class Orchestrator:
+    def __init__(
+        self,
+        max_concurrent_runs: int = 2,
+        max_queue_size: int = 100,
+        selection_timeout: Optional[float] = DEFAULT_SELECTION_TIMEOUT,
+        max_finished_jobs: int = 1000
+    ):
+        """
+        Args:
+            max_concurrent_runs (int): Workflows executing at the same time.
+            max_queue_size (int): Jobs waiting for a worker; further submissions are rejected.
+            selection_timeout (float): Seconds a job waits for a human test selection before it
+                continues with the automatic selection (None: wait forever).
+            max_finished_jobs (int): Finished jobs kept for status/result queries.
+        """
+        self.max_concurrent_runs = max_concurrent_runs
+        self.max_queue_size = max_queue_size
+        self.selection_timeout = selection_timeout
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs: Dict[str, Job] = {}
+        self.hitl = HITLHandler(timeout_seconds=selection_timeout, on_timeout=self._selection_timed_out)
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._loop = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrent_runs)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self.hitl.shutdown()
+
+    def submit(self, user_input: str, human_selection: bool = False) -> Job:
+        """
+        Queues a new workflow run.
+
+        Raises:
+            QueueFullError: The queue is at its bound.
+        """
+        job = Job(user_input, human_selection)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Job queue is full ({self.max_queue_size} jobs waiting)")
+
+        self.jobs[job.id] = job
+        self._publish(job, "queued", position=self._queue.qsize())
+        self._evict_finished()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def queue_size(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def submit_selection(self, job_id: str, valid_index: int, invalid_index: int, source: str = "human"):
+        """
+        Queues a paused job again with the selected test indices (validated and claimed through
+        the HITLHandler, so a selection and the timeout cannot both resume the job).
+
+        Raises:
+            KeyError: Unknown job, or the job is not waiting for a selection.
+            ValueError: An index is out of range.
+            QueueFullError: The queue is at its bound.
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.status != AWAITING_SELECTION:
+            raise KeyError(f"Job {job_id} is not waiting for a test selection")
+        if self._queue.full():
+            raise QueueFullError(f"Job queue is full ({self.max_queue_size} jobs waiting)")
+
+        job.resume_value = self.hitl.claim_selection(job_id, valid_index, invalid_index, source)
+        self._queue.put_nowait(job)
+        job.selection_request = None
+        job.status = QUEUED
+        self._publish(job, "selection_received", source=source, valid_index=valid_index, invalid_index=invalid_index)
+
+    async def events(self, job_id: str, after: int = 0) -> AsyncIterator[Dict]:
+        """
+        Yields the job's events with a sequence number above `after`, waiting for new ones
+        until the job has finished.
+        """
+        job = self.jobs[job_id]
+        while True:
+            changed = job._changed
+            for event in job.events[after:]:
+                after = event["seq"]
+                yield event
+            if job.finished:
+                return
+            await changed.wait()
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                get_metrics_sink().record_run(job.id, None, status=FAILED)
+                self._finish(job, FAILED, error=f"{type(exc).__name__}: {exc}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = RUNNING
+        job.started_at = job.started_at or time.time()
+        self._publish(job, "started" if job.resume_value is None else "resumed")
+
+        def on_node(node: str):
+            # Called in the worker thread; events are handed back to the event loop
+            self._loop.call_soon_threadsafe(self._node_completed, job, node)
+
+        if job.resume_value is None:
+            outcome = await asyncio.to_thread(
+                self.hitl.start_run, job.user_input, job.id, job.human_selection, on_node
+            )
+        else:
+            selection, job.resume_value = job.resume_value, None
+            outcome = await asyncio.to_thread(self.hitl.resume, job.id, selection, on_node)
+
+        if outcome["status"] == AWAITING_SELECTION:
+            self._await_selection(job, outcome)
+            return
+
+        job.result = {key: outcome["state"].get(key) for key in RESULT_KEYS if key in outcome["state"]}
+        get_metrics_sink().record_run(job.id, job.result.get("metrics"))
+        self._finish(job, COMPLETED)
+
+    def _node_completed(self, job: Job, node: str):
+        job.current_node = node
+        job.completed_nodes.append(node)
+        self._publish(job, "node_completed", node=node)
+
+    def _await_selection(self, job: Job, outcome: Dict):
+        job.status = AWAITING_SELECTION
+        job.selection_request = {"valid_tests": outcome["valid_tests"], "invalid_tests": outcome["invalid_tests"]}
+        self._publish(job, "selection_required", **job.selection_request)
+
+    def _selection_timed_out(self, pending: Dict):
+        # Called from the handler's timeout sweeper: the job is resumed by a worker, not by the sweeper
+        self._loop.call_soon_threadsafe(self._select_automatically, pending["thread_id"])
+
+    def _select_automatically(self, job_id: str):
+        job = self.jobs.get(job_id)
+        if job is None or job.status != AWAITING_SELECTION:
+            return
+        selection = auto_select_tests(job.selection_request["valid_tests"], job.selection_request["invalid_tests"])
+        try:
+            self.submit_selection(job.id, source="automatic", **selection)
+        except QueueFullError:
+            # Try again once the queue has room
+            self._loop.call_later(5.0, self._select_automatically, job_id)
+
+    def _finish(self, job: Job, status: str, error: str = None):
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        self._publish(job, status, **({"error": error} if error else {}))
+
+    def _publish(self, job: Job, event_type: str, **data):
+        job.events.append({"seq": len(job.events) + 1, "type": event_type, "time": time.time(), **data})
+        # Wake up every event stream waiting on this job
+        job._changed.set()
+        job._changed = asyncio.Event()
+
+    def _evict_finished(self):
+        finished = [job for job in self.jobs.values() if job.finished]
+        for job in sorted(finished, key=lambda job: job.finished_at)[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[job.id]
+
+
+_orchestrator = None
+
+
+def get_orchestrator() -> Orchestrator:
+    """
+    Returns the process-wide orchestrator, configured from the environment
+    (MAX_CONCURRENT_RUNS, JOB_QUEUE_SIZE, HITL_SELECTION_TIMEOUT_SECONDS; 0 or less waits forever).
+    """
+    global _orchestrator
+    if _orchestrator is None:
+        timeout = float(os.getenv("HITL_SELECTION_TIMEOUT_SECONDS", str(DEFAULT_SELECTION_TIMEOUT)))
+        _orchestrator = Orchestrator(
+            max_concurrent_runs=int(os.getenv("MAX_CONCURRENT_RUNS", "2")),
+            max_queue_size=int(os.getenv("JOB_QUEUE_SIZE", "100")),
+            selection_timeout=timeout if timeout > 0 else None
+        )
+    return _orchestrator
@@ -0,0 +1,62 @@
+"""
+Helpers:
+Small utilities shared by the agents and services.
+"""
+
+import hashlib
+import os
+import re
+
+
+def normalize_code(code: str) -> str:
+    """
+    Normalises a code string for hashing: removes ``` fences, unifies line endings,
+    strips trailing whitespace and drops blank lines.
+    """
+    code = re.sub(r"```(?:python)?|```", "", code)
+    lines = [line.rstrip() for line in code.replace("\r\n", "\n").replace("\r", "\n").split("\n")]
+    return "\n".join(line for line in lines if line.strip())
+
+
+def normalize_test(test: str) -> str:
+    """
+    Normalises a pytest function for hashing like normalize_code. Test function names are
+    positional (test_case_N), so they are normalised away.
+    """
+    return re.sub(r"def test_\w+", "def test_case", normalize_code(test))
+
+
+def content_hash(*parts: str) -> str:
+    """
+    Returns a stable SHA-256 hex digest over one or more strings.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def current_rss_bytes() -> int:
+    """
+    Returns the resident set size of this process in bytes (peak RSS where /proc is unavailable).
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(values, q: float) -> float:
+    """
+    Returns the q-th percentile (0-100) of the values by linear interpolation, or 0.0 for no values.
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
@@ -0,0 +1,70 @@
+"""
+Import Profiler:
+Reports what importing a module costs, using CPython's `-X importtime` in a fresh interpreter.
+
+Usage:
+    python -m app.utils.import_profiler graphs.workflow agents.scoring_agent --top 15
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from typing import Dict, List
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_import(module: str) -> Dict:
+    """
+    Imports `module` in a fresh interpreter and returns its total import time together with
+    the per-module breakdown: [{"module", "self_ms", "cumulative_ms", "depth"}].
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr.strip().splitlines()[-1]}")
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({
+                "module": name,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": (len(indent) - 1) // 2
+            })
+
+    total = next((e["cumulative_ms"] for e in entries if e["module"] == module), 0.0)
+    return {"module": module, "total_ms": total, "imports": entries}
+
+
+def format_report(profile: Dict, top: int = 15) -> str:
+    lines = [f"⏱️ import {profile['module']}: {profile['total_ms']:.1f} ms"]
+    top_level = sorted(
+        (e for e in profile["imports"] if e["depth"] <= 1 and e["module"] != profile["module"]),
+        key=lambda e: e["cumulative_ms"],
+        reverse=True
+    )
+    for entry in top_level[:top]:
+        lines.append(f"  {entry['cumulative_ms']:>9.1f} ms  {entry['module']}")
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Show the import-time cost of modules.")
+    parser.add_argument("modules", nargs="*", default=["graphs.workflow"])
+    parser.add_argument("--top", type=int, default=15, help="Number of heaviest dependencies to list.")
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        print(format_report(profile_import(module), args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+Benchmark Runner:
+Measures the pipeline offline: every ChatOpenAI client is replaced by the stub LLM (benchmarks/stub_llm.py)
+and the scoring models by stubs (benchmarks/stub_models.py). For each candidate count it times the agents
+one by one and the whole graph per node, and records peak RSS (this process and its worker processes)
+and the number of processes started.
+
+    python -m benchmarks.run_benchmarks --candidates 10 50 200 --latency 0.2
+    python -m benchmarks.run_benchmarks --write-baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json   # exits 1 on regressions
+
+Baselines are only comparable on the same machine with the same settings; write one there first.
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import multiprocessing.process
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Dict, List
+
+from app.utils.helpers import current_rss_bytes
+
+STAGES = (
+    "input_processing",
+    "generate_code_variants",
+    "generate_test_cases",
+    "format_test_cases",
+    "run_tests_phase1",
+    "run_tests_phase2",
+    "score_codes",
+)
+
+_process_starts = 0
+_process_lock = threading.Lock()
+
+
+def _count_process_starts():
+    """
+    Counts every subprocess.Popen and multiprocessing process start from now on.
+    """
+    def counted(original):
+        def wrapper(*args, **kwargs):
+            global _process_starts
+            with _process_lock:
+                _process_starts += 1
+            return original(*args, **kwargs)
+        return wrapper
+
+    subprocess.Popen.__init__ = counted(subprocess.Popen.__init__)
+    multiprocessing.process.BaseProcess.start = counted(multiprocessing.process.BaseProcess.start)
+
+
+def _process_rss_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class ResourceMonitor:
+    """
+    Samples RSS of this process and of its live worker processes while active, and counts process starts.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_children_rss = 0
+        self.process_starts = 0
+        self._stop = threading.Event()
+
+    def __enter__(self):
+        self._starts_before = _process_starts
+        self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        self.process_starts = _process_starts - self._starts_before
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        self.peak_rss = max(self.peak_rss, current_rss_bytes())
+        children = sum(_process_rss_bytes(child.pid) for child in multiprocessing.active_children() if child.pid)
+        self.peak_children_rss = max(self.peak_children_rss, children)
+
+    def metrics(self, seconds: float) -> Dict:
+        return {
+            "seconds": round(seconds, 4),
+            "peak_rss_mb": round(self.peak_rss / 2**20, 1),
+            "peak_children_rss_mb": round(self.peak_children_rss / 2**20, 1),
+            "process_starts": self.process_starts
+        }
+
+
+def measure(fn: Callable):
+    """
+    Runs fn under a ResourceMonitor. Returns (fn's result, metrics).
+    """
+    with ResourceMonitor() as monitor:
+        started = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - started
+    return result, monitor.metrics(seconds)
+
+
+def run_components(num_candidates: int) -> Dict[str, Dict]:
+    """
+    Times the agents one after another on the benchmark request, feeding each stage the previous one's output.
+    """
+    from agents.code_generation_agent import CodeGenerationAgent
+    from agents.execution_testing_agent import ExecutionTestingAgent
+    from agents.input_processing_agent import InputProcessingAgent
+    from agents.scoring_agent import ScoringAndRankingAgent
+    from agents.test_case_formatter_agent import TestCaseFormatterAgent
+    from agents.test_generation_agent import TestGenerationAgent
+    from agents.test_selection_agent import TestSelectionAgent
+    from app.services.execution_cache import ExecutionCache
+    from app.services.execution_matrix import ExecutionMatrix
+    from benchmarks.stub_llm import BENCHMARK_REQUEST
+
+    stages = {}
+
+    extracted, stages["input_processing"] = measure(lambda: InputProcessingAgent().process_input(BENCHMARK_REQUEST))
+    spec = {key: extracted.get(key, "") for key in ("regulatory_text", "assumptions", "input_variables")}
+
+    codes, stages["generate_code_variants"] = measure(
+        lambda: CodeGenerationAgent().generate_code_variants(num_variants=num_candidates, **spec)
+    )
+
+    test_agent = TestGenerationAgent()
+    (valid, invalid), stages["generate_test_cases"] = measure(lambda: (
+        test_agent.generate_test_cases(test_type="valid", num_cases=10, **spec),
+        test_agent.generate_test_cases(test_type="invalid", num_cases=10, **spec)
+    ))
+
+    formatter = TestCaseFormatterAgent()
+    (formatted_valid, formatted_invalid), stages["format_test_cases"] = measure(lambda: (
+        formatter.format_test_cases(valid, spec["input_variables"]),
+        formatter.format_test_cases(invalid, spec["input_variables"])
+    ))
+
+    selection = TestSelectionAgent().select(formatted_valid, formatted_invalid)
+    selected = [formatted_valid[selection["valid_index"]], formatted_invalid[selection["invalid_index"]]]
+
+    # A fresh cache per scenario, so executions are measured rather than lookups from earlier scenarios
+    execution_agent = ExecutionTestingAgent(cache=ExecutionCache())
+    matrix = ExecutionMatrix()
+    (_, filtered), stages["run_tests_phase1"] = measure(lambda: execution_agent.run_tests(codes, selected, matrix=matrix))
+    (report, final_codes), stages["run_tests_phase2"] = measure(
+        lambda: execution_agent.run_tests(filtered, formatted_valid + formatted_invalid, matrix=matrix)
+    )
+
+    test_results = {ExecutionMatrix.code_key(entry["code"]): entry["individual_test_results"] for entry in report.values()}
+    if final_codes:
+        _, stages["score_codes"] = measure(lambda: ScoringAndRankingAgent().score_codes(final_codes, test_results))
+
+    stages["generate_code_variants"]["candidates"] = len(codes)
+    stages["run_tests_phase1"]["passed"] = len(filtered)
+    stages["run_tests_phase2"]["passed"] = len(final_codes)
+    return stages
+
+
+def run_end_to_end(num_candidates: int) -> Dict:
+    """
+    Runs the whole graph (automatic test selection, no checkpointer) and times every node.
+    """
+    from app.services.execution_cache import get_execution_cache
+    from benchmarks.stub_llm import BENCHMARK_REQUEST
+    from graphs.workflow import build_workflow
+
+    get_execution_cache().clear()
+    app = build_workflow(num_variants=num_candidates).compile()
+    node_seconds = {}
+
+    def run():
+        last = time.perf_counter()
+        for update in app.stream({"user_input": BENCHMARK_REQUEST}, stream_mode="updates"):
+            now = time.perf_counter()
+            for node in update:
+                node_seconds[node] = round(node_seconds.get(node, 0.0) + now - last, 4)
+            last = now
+
+    _, metrics = measure(run)
+    metrics["nodes"] = node_seconds
+    return metrics
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float, min_seconds: float, min_rss_mb: float) -> List[str]:
+    """
+    Lists metrics that got worse than the baseline by more than the tolerance (and the absolute minimum).
+    """
+    regressions = []
+    for candidates, scenario in results["scenarios"].items():
+        base_scenario = baseline.get("scenarios", {}).get(candidates)
+        if base_scenario is None:
+            continue
+        measured = dict(scenario["stages"], end_to_end=scenario["end_to_end"])
+        expected = dict(base_scenario.get("stages", {}), end_to_end=base_scenario.get("end_to_end", {}))
+        for stage, metrics in measured.items():
+            base = expected.get(stage)
+            if not base:
+                continue
+            checks = (("seconds", min_seconds), ("peak_rss_mb", min_rss_mb), ("peak_children_rss_mb", min_rss_mb))
+            for metric, minimum in checks:
+                if metric in base and metrics[metric] > base[metric] * (1 + tolerance) and metrics[metric] - base[metric] > minimum:
+                    regressions.append(f"{candidates} candidates / {stage}: {metric} {base[metric]} -> {metrics[metric]}")
+            if metrics["process_starts"] > base.get("process_starts", metrics["process_starts"]):
+                regressions.append(
+                    f"{candidates} candidates / {stage}: process_starts {base['process_starts']} -> {metrics['process_starts']}"
+                )
+    return regressions
+
+
+def format_results(results: Dict) -> str:
+    lines = []
+    for candidates, scenario in results["scenarios"].items():
+        lines.append(f"\n⏱️ {candidates} candidates")
+        lines.append(f"   {'stage':<26}{'seconds':>10}{'RSS MB':>9}{'workers MB':>12}{'procs':>7}")
+        rows = list(scenario["stages"].items()) + [("end_to_end", scenario["end_to_end"])]
+        for stage, m in rows:
+            lines.append(
+                f"   {stage:<26}{m['seconds']:>10.3f}{m['peak_rss_mb']:>9.1f}{m['peak_children_rss_mb']:>12.1f}{m['process_starts']:>7}"
+            )
+        for node, seconds in scenario["end_to_end"]["nodes"].items():
+            lines.append(f"     ↳ {node:<22}{seconds:>10.3f}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmarks with a stub LLM.")
+    parser.add_argument("--candidates", type=int, nargs="+", default=[10, 50, 200], help="Candidate counts to run")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per stub LLM call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Relative +/- latency variation")
+    parser.add_argument("--pass-ratio", type=float, default=0.5, help="Share of correct generated variants")
+    parser.add_argument("--model-load-seconds", type=float, default=0.0, help="Simulated stub model load time")
+    parser.add_argument("--real-models", action="store_true", help="Use the real scoring models instead of stubs")
+    parser.add_argument("--skip-end-to-end", action="store_true", help="Only benchmark the agents")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--write-baseline", help="Write the results as the new baseline JSON")
+    parser.add_argument("--baseline", help="Compare against this baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown (default 25%%)")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="Ignore slowdowns below this many seconds")
+    parser.add_argument("--min-rss-mb", type=float, default=20.0, help="Ignore RSS growth below this many MB")
+    parser.add_argument("--verbose", action="store_true", help="Show the agents' own output")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    # Stub responses must not be served from (or written to) the persistent response cache
+    os.environ["LLM_CACHE_ENABLED"] = "0"
+
+    from benchmarks.stub_llm import install_stub_llm
+    from benchmarks.stub_models import install_stub_models
+    from app.services.execution_engine import get_execution_engine
+
+    install_stub_llm(latency=args.latency, jitter=args.jitter, pass_ratio=args.pass_ratio)
+    if not args.real_models:
+        install_stub_models(load_seconds=args.model_load_seconds)
+    _count_process_starts()
+
+    settings = {
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "pass_ratio": args.pass_ratio,
+        "real_models": args.real_models,
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count()
+    }
+    results = {"settings": settings, "scenarios": {}}
+
+    quiet = open(os.devnull, "w") if not args.verbose else None
+    with contextlib.redirect_stdout(quiet) if quiet else contextlib.nullcontext():
+        # Worker start-up is paid once per process, not per scenario
+        _, results["startup"] = measure(get_execution_engine().warm_up)
+        for candidates in args.candidates:
+            print(f"\n=== {candidates} candidates ===", file=sys.stderr)
+            scenario = {"stages": run_components(candidates)}
+            if not args.skip_end_to_end:
+                scenario["end_to_end"] = run_end_to_end(candidates)
+            else:
+                scenario["end_to_end"] = {"seconds": 0.0, "peak_rss_mb": 0.0, "peak_children_rss_mb": 0.0,
+                                          "process_starts": 0, "nodes": {}}
+            results["scenarios"][str(candidates)] = scenario
+    if quiet:
+        quiet.close()
+
+    print(f"\n🚀 Worker start-up: {results['startup']['seconds']:.3f}s, {results['startup']['process_starts']} processes")
+    print(format_results(results))
+
+    for path in (args.output, args.write_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as output_file:
+                json.dump(results, output_file, indent=2)
+            print(f"\n📝 Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get("settings", {}) != settings:
+            print("\n⚠️ Baseline was recorded with different settings; comparison may not be meaningful.")
+        regressions = compare(results, baseline, args.tolerance, args.min_seconds, args.min_rss_mb)
+        if regressions:
+            print("\n❌ Regressions against the baseline:")
+            for regression in regressions:
+                print(f"   {regression}")
+            return 1
+        print("\n✅ No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
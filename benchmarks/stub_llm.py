@@ -0,0 +1,210 @@
+"""
+Stub LLM:
+Deterministic local stand-in for ChatOpenAI with configurable latency. It recognises the repo's
+prompts and answers with canned replies: a request classification, code variants (a configurable
+share of them correct), JSON test case lists consistent with the reference solution, review scores
+and repaired/optimized code. Nothing leaves the machine.
+"""
+
+import importlib
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, ClassVar, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from agents.test_case_formatter_agent import INVALID_OUTPUT, parse_test_case, render_pytest_function
+from app.utils.helpers import content_hash
+
+# Every module that constructs a ChatOpenAI client
+LLM_MODULES = (
+    "agents.code_generation_agent",
+    "agents.code_optimizer_agent",
+    "agents.input_processing_agent",
+    "agents.test_case_formatter_agent",
+    "agents.test_generation_agent",
+    "graphs.general_answer_node",
+    "scoring.strategies.llm_feedback",
+)
+
+BENCHMARK_REQUEST = (
+    "Write the risk weight function for rated corporate exposures. Regulatory text: exposures rated AAA to AA "
+    "get a risk weight of 20%, A 50%, BBB to BB 100%, B 150%. Short-term exposures (maturity of 3 years or less) "
+    "rated A or better get 20%. Assumptions: maturity is a non-negative integer number of years. "
+    "Input variables: rating, maturity."
+)
+
+RATING_WEIGHTS = {"AAA": 20, "AA": 20, "A": 50, "BBB": 100, "BB": 100, "B": 150}
+INVALID_INPUTS = [
+    ("ZZZ", 2), ("", 1), (None, 4), ("AAA", -1), ("BBB", "five"), ("aa", 3),
+    ("C", 0), ("A", None), ("AAA", 2.5), ("BB", True), ("AAA ", 1), ("BBB", -3)
+]
+
+_call_counts = {}
+_counter_lock = threading.Lock()
+
+
+def reference_risk_weight(rating, maturity):
+    if rating not in RATING_WEIGHTS or not isinstance(maturity, int) or isinstance(maturity, bool) or maturity < 0:
+        return INVALID_OUTPUT
+    weight = RATING_WEIGHTS[rating]
+    if maturity <= 3 and weight <= 50:
+        weight = 20
+    return weight
+
+
+CORRECT_CODE = '''def calculate_risk_weight(rating, maturity):
+    # Risk weights by external rating{comment}
+    weights = {{"AAA": 20, "AA": 20, "A": 50, "BBB": 100, "BB": 100, "B": 150}}
+    # Reject unknown ratings and invalid maturities
+    if rating not in weights or not isinstance(maturity, int) or isinstance(maturity, bool) or maturity < 0:
+        return "Invalid input value!"
+    weight = weights[rating]
+    # Short-term exposures of good quality get the preferential weight
+    if maturity <= 3 and weight <= 50:
+        weight = 20
+    return weight'''
+
+BUGGY_CODES = [
+    # Off-by-one in the short-term threshold
+    '''def calculate_risk_weight(rating, maturity):
+    # Risk weights by external rating{comment}
+    weights = {{"AAA": 20, "AA": 20, "A": 50, "BBB": 100, "BB": 100, "B": 150}}
+    if rating not in weights or not isinstance(maturity, int) or maturity < 0:
+        return "Invalid input value!"
+    if maturity < 3 and weights[rating] <= 50:
+        return 20
+    return weights[rating]''',
+    # No input validation
+    '''def calculate_risk_weight(rating, maturity):
+    # Lookup only{comment}
+    weights = {{"AAA": 20, "AA": 20, "A": 50, "BBB": 100, "BB": 100, "B": 150}}
+    weight = weights.get(rating, 150)
+    if maturity <= 3 and weight <= 50:
+        weight = 20
+    return weight''',
+    # Ignores the short-term treatment
+    '''def calculate_risk_weight(rating, maturity):{comment}
+    weights = {{"AAA": 20, "AA": 20, "A": 50, "BBB": 100, "BB": 100, "B": 150}}
+    if rating not in weights or not isinstance(maturity, int) or maturity < 0:
+        return "Invalid input value!"
+    return weights[rating]''',
+]
+
+
+class StubChatModel(BaseChatModel):
+    """
+    Accepts the ChatOpenAI constructor arguments used in the repo and ignores the model settings.
+    """
+    model: Any = None
+    model_name: Any = None
+    temperature: Any = None
+    api_key: Any = None
+    openai_api_key: Any = None
+
+    # Class-level settings, see install_stub_llm
+    latency: ClassVar[float] = 0.0
+    jitter: ClassVar[float] = 0.0
+    pass_ratio: ClassVar[float] = 0.5
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _generate(self, messages: List, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        prompt = messages[-1].content if messages else ""
+        rng = self._rng(prompt)
+        if self.latency:
+            time.sleep(max(0.0, self.latency * (1 + self.jitter * (2 * rng.random() - 1))))
+
+        reply = stub_reply(prompt, rng, self.pass_ratio)
+        usage = {
+            "input_tokens": len(prompt) // 4,
+            "output_tokens": len(reply) // 4,
+            "total_tokens": (len(prompt) + len(reply)) // 4
+        }
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=reply, usage_metadata=usage))])
+
+    def _rng(self, prompt: str) -> random.Random:
+        # Same prompt, same call number -> same reply, across runs and processes
+        key = content_hash(prompt)
+        with _counter_lock:
+            _call_counts[key] = _call_counts.get(key, 0) + 1
+            count = _call_counts[key]
+        return random.Random(f"{key}-{count}")
+
+
+def stub_reply(prompt: str, rng: random.Random, pass_ratio: float = 0.5) -> str:
+    if "classification and extraction agent" in prompt:
+        if "risk weight" not in prompt.lower():
+            return json.dumps({"request_type": "general"})
+        return json.dumps({
+            "request_type": "code_request",
+            "regulatory_text": BENCHMARK_REQUEST.split("Regulatory text: ")[1].split(" Assumptions:")[0],
+            "assumptions": "maturity is a non-negative integer number of years",
+            "input_variables": "rating, maturity"
+        })
+
+    if "Write a Python function which computes" in prompt:
+        comment = f"\n    # Variant {rng.randrange(1000)}" if rng.random() < 0.7 else ""
+        template = CORRECT_CODE if rng.random() < pass_ratio else rng.choice(BUGGY_CODES)
+        return f"```python\n{template.format(comment=comment)}\n```"
+
+    if "Fix the function so that it passes these tests" in prompt:
+        return f"```python\n{CORRECT_CODE.format(comment='')}\n```"
+
+    if "JSON list" in prompt and "distinct" in prompt:
+        num_cases = int(re.search(r"generate (\d+) distinct", prompt).group(1))
+        return json.dumps(_test_cases(num_cases, "invalid test" in prompt, rng))
+
+    if "JSON object that maps every code id" in prompt:
+        return json.dumps({code_id: rng.randint(5, 9) for code_id in re.findall(r"### (code_\d+):", prompt)})
+
+    if "code reviewer" in prompt:
+        return str(rng.randint(5, 9))
+
+    if "code optimizer" in prompt:
+        return f"```python\n{CORRECT_CODE.format(comment='')}\n```"
+
+    if "pytest-style" in prompt:
+        parsed = parse_test_case(prompt, "rating, maturity")
+        if parsed:
+            return render_pytest_function(parsed[0], parsed[1], 1)
+        return render_pytest_function({"rating": "AAA", "maturity": 1}, 20, 1)
+
+    return "This is a stub answer."
+
+
+def _test_cases(num_cases: int, invalid: bool, rng: random.Random) -> List[dict]:
+    if invalid:
+        inputs = list(INVALID_INPUTS)
+    else:
+        inputs = [(rating, maturity) for rating in RATING_WEIGHTS for maturity in range(8)]
+    rng.shuffle(inputs)
+    return [
+        {"inputs": {"rating": rating, "maturity": maturity}, "riskweight": reference_risk_weight(rating, maturity)}
+        for rating, maturity in (inputs * (num_cases // len(inputs) + 1))[:num_cases]
+    ]
+
+
+def install_stub_llm(latency: float = 0.0, jitter: float = 0.0, pass_ratio: float = 0.5):
+    """
+    Replaces ChatOpenAI with StubChatModel in every module that uses it. Call before the agents
+    are constructed; agents built afterwards (including lazily built graph nodes) get the stub.
+
+    Args:
+        latency (float): Seconds each call takes.
+        jitter (float): Relative +/- variation of the latency.
+        pass_ratio (float): Share of generated code variants that are correct.
+    """
+    StubChatModel.latency = latency
+    StubChatModel.jitter = jitter
+    StubChatModel.pass_ratio = pass_ratio
+    for module_name in LLM_MODULES:
+        module = importlib.import_module(module_name)
+        module.ChatOpenAI = StubChatModel
@@ -0,0 +1,71 @@
+"""
+Stub Scoring Models:
+Lightweight stand-ins for the SentenceTransformer and CrossEncoder models, registered in the model
+registry in place of the real ones. Embeddings are hashed bags of tokens, cross-encoder scores
+compare token overlap and length, so scoring costs are measured without downloading or loading torch models.
+"""
+
+import re
+import time
+
+import numpy as np
+
+from app.services.model_registry import (
+    DEFAULT_CROSS_ENCODER,
+    DEFAULT_SENTENCE_TRANSFORMER,
+    registry,
+)
+from app.utils.helpers import content_hash
+
+TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+class StubSentenceTransformer:
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, sentences, batch_size: int = 32, convert_to_tensor: bool = False,
+               convert_to_numpy: bool = True, normalize_embeddings: bool = False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        embeddings = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in TOKEN.findall(text):
+                embeddings[row, int(content_hash(token)[:8], 16) % self.dimension] += 1.0
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.where(norms == 0, 1.0, norms)
+        return embeddings[0] if single else embeddings
+
+
+class StubCrossEncoder:
+    def predict(self, pairs, batch_size: int = 32, **kwargs):
+        scores = []
+        for first, second in pairs:
+            first_tokens, second_tokens = set(TOKEN.findall(first)), set(TOKEN.findall(second))
+            overlap = len(first_tokens & second_tokens) / max(len(first_tokens | second_tokens), 1)
+            # Prefer the more thoroughly commented/longer candidate of a pair, damped by their overlap
+            scores.append(float(1 / (1 + np.exp(-(len(first) - len(second)) / 50)) * (1 - overlap / 2) + overlap / 4))
+        return np.asarray(scores)
+
+
+def install_stub_models(load_seconds: float = 0.0):
+    """
+    Registers the stub models under the default scoring model keys (replacing the real loaders).
+
+    Args:
+        load_seconds (float): Simulated load time per model, to benchmark warm-up paths.
+    """
+    def loader(model_class):
+        def load():
+            if load_seconds:
+                time.sleep(load_seconds)
+            return model_class()
+        return load
+
+    registry.register(f"sentence_transformer/{DEFAULT_SENTENCE_TRANSFORMER}", loader(StubSentenceTransformer), replace=True)
+    registry.register(f"cross_encoder/{DEFAULT_CROSS_ENCODER}", loader(StubCrossEncoder), replace=True)
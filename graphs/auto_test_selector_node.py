@@ -0,0 +1,29 @@
+"""
+Automatic Test Selector Node:
+Picks the most complex valid and invalid test case by structural features (TestSelectionAgent),
+so runs need no human for Phase 1. Human selection (HumanTestSelectorNode) stays available as an opt-in.
+"""
+
+from langchain_core.runnables import Runnable
+from agents.test_selection_agent import TestSelectionAgent
+
+class AutoTestSelectorNode(Runnable):
+    def __init__(self):
+        self.agent = TestSelectionAgent()
+
+    def invoke(self, state: dict, config: dict = None) -> dict:
+        valid_tests = state.get("formatted_valid_tests", [])
+        invalid_tests = state.get("formatted_invalid_tests", [])
+
+        selection = self.agent.select(valid_tests, invalid_tests)
+        print(
+            f"\n🎯 Selected complex tests automatically: VALID [{selection['valid_index']}] "
+            f"(confidence {selection['valid_confidence']:.2f}), INVALID [{selection['invalid_index']}] "
+            f"(confidence {selection['invalid_confidence']:.2f})"
+        )
+
+        return {
+            "selected_valid_test": valid_tests[selection["valid_index"]] if valid_tests else "",
+            "selected_invalid_test": invalid_tests[selection["invalid_index"]] if invalid_tests else "",
+            "test_selection": {**selection, "source": "auto"}
+        }
@@ -3,19 +3,62 @@ from langchain_core.runnables import Runnable
 from agents.code_generation_agent import CodeGenerationAgent
 
 class CodeGenerationNode(Runnable):
-    def __init__(self):
+    def __init__(self, num_variants: int = 10, repair: bool = True, repair_candidates: int = 3, repair_token_budget: int = None):
+        """
+        Args:
+            num_variants (int): Number of variants generated from scratch.
+            repair (bool): On regeneration, repair the most promising failed candidates using their
+                pytest failure reports instead of generating all variants again.
+            repair_candidates (int): Number of failed candidates repaired per round.
+            repair_token_budget (int): Total tokens repair calls may use over a run (None: unlimited).
+        """
         self.agent = CodeGenerationAgent()
+        self.num_variants = num_variants
+        self.repair = repair
+        self.repair_candidates = repair_candidates
+        self.repair_token_budget = repair_token_budget
     
     def invoke(self, input: dict, config: dict = None) -> dict:
         regulatory_text = input.get("regulatory_text", "")
         assumptions = input.get("assumptions", "")
         input_variables = input.get("input_variables", "")
 
+        regeneration_round = input.get("regeneration_round", 0)
+        if input.get("regenerate_code"):
+            regeneration_round += 1
+            regeneration_input = input.get("regeneration_input", {})
+            failure_reports = regeneration_input.get("failure_reports", {})
+
+            if self.repair and any(entry.get("code") for entry in failure_reports.values()):
+                tokens_used = input.get("repair_tokens_used", 0)
+                remaining = None if self.repair_token_budget is None else self.repair_token_budget - tokens_used
+                print(f"\n🛠️ Repair round {regeneration_round}: fixing the most promising failed candidates...")
+
+                codes, tokens = self.agent.repair_code_variants(
+                    regulatory_text=regulatory_text,
+                    assumptions=assumptions,
+                    input_variables=input_variables,
+                    failure_reports=failure_reports,
+                    test_cases=regeneration_input.get("test_cases", []),
+                    num_candidates=self.repair_candidates,
+                    token_budget=remaining
+                )
+                if not codes and remaining is not None:
+                    # Not even one repair fits into what is left: mark the budget as spent
+                    tokens = remaining
+
+                return {
+                    "generated_codes": [code.content for code in codes],
+                    "regeneration_round": regeneration_round,
+                    "repair_tokens_used": tokens_used + tokens
+                }
+
         codes: List[str] = self.agent.generate_code_variants(
             regulatory_text=regulatory_text,
             assumptions=assumptions,
             input_variables=input_variables,
-            num_variants=10
+            num_variants=self.num_variants
         )
 
-        return {"generated_codes": codes}
\ No newline at end of file
+        # Only the code text is kept in the (checkpointed) state, not the full LLM responses
+        return {"generated_codes": [code.content for code in codes], "regeneration_round": regeneration_round}
@@ -2,18 +2,38 @@
 Execution & Filtering Node:
 Reusable node to run any list of codes against any set of test cases.
 Filters out failing codes and returns execution report.
+Phase 1 first collapses equivalent candidates (CodeDeduplicationAgent), so only unique
+implementations are executed and scored. Outcomes are kept in the state's execution matrix,
+so Phase 2 only runs the tests a code has not run yet (optionally stopping at its first failure).
 """
 
 from langchain_core.runnables import Runnable
+from agents.code_deduplication_agent import CodeDeduplicationAgent
 from agents.execution_testing_agent import ExecutionTestingAgent
+from app.services.execution_matrix import ExecutionMatrix
 
 class ExecutionFilteringNode(Runnable):
-    def __init__(self):
+    def __init__(self, phase: int = None, fail_fast: bool = False):
+        """
+        Args:
+            phase (int): 1 for the selected complex tests, 2 for the full test suite.
+                If not set, the phase is inferred from the state.
+            fail_fast (bool): Phase 2 stops each code at its first failing test, running the
+                tests that failed most often in this run first.
+        """
         self.agent = ExecutionTestingAgent()
+        self.dedup_agent = CodeDeduplicationAgent()
+        self.phase = phase
+        self.fail_fast = fail_fast
 
     def invoke(self, state: dict, config: dict = None) -> dict:
-        # Detect if this is second filtering phase (full test suite)
-        is_second_pass = "filtered_codes" in state
+        # Detect if this is second filtering phase (full test suite). Inferring it from the state
+        # only works for the first round: after a regeneration "filtered_codes" is always set.
+        if self.phase is not None:
+            is_second_pass = self.phase == 2
+        else:
+            is_second_pass = "filtered_codes" in state
+        matrix = ExecutionMatrix(state.get("execution_matrix"))
 
         if is_second_pass:
             print("\n🔁 Phase 2: Running full test suite on previously filtered codes...")
@@ -21,7 +41,8 @@ class ExecutionFilteringNode(Runnable):
             codes = state["filtered_codes"]
             test_suite = state.get("formatted_valid_tests", []) + state.get("formatted_invalid_tests", [])
 
-            results, final_codes = self.agent.run_tests(codes, test_suite)
+            # Tests already run in Phase 1 (or an earlier round) come from the matrix
+            results, final_codes = self.agent.run_tests(codes, test_suite, matrix=matrix, fail_fast=self.fail_fast)
 
             # Determine if all failed again
             regenerate = len(final_codes) == 0
@@ -29,31 +50,40 @@ class ExecutionFilteringNode(Runnable):
             return {
                 "execution_report_final": results,
                 "final_validated_codes": final_codes,
+                "execution_matrix": matrix.data,
                 "regenerate_code": regenerate,
                 "regeneration_input": {
-                    "failed_codes": codes,
-                    "failure_reports": results
+                    "failure_reports": results,
+                    "test_cases": test_suite
                 }
             }
 
         else:
             print("\n🚦 Phase 1: Running initial filtering with selected complex test cases...")
             # ✅ First phase: test all generated codes against 2 selected tests
-            codes = state["generated_codes"]
+            codes = [self.agent.clean_code_block(code) for code in state["generated_codes"]]
+            deduplicated = self.dedup_agent.deduplicate(codes)
+            if len(deduplicated["codes"]) < len(codes):
+                print(f"🧬 {len(codes)} candidates, {len(deduplicated['codes'])} unique implementations.")
             valid_test = state.get("selected_valid_test", "")
             invalid_test = state.get("selected_invalid_test", "")
             test_suite = [valid_test, invalid_test]
 
-            results, filtered = self.agent.run_tests(codes, test_suite)
+            results, filtered = self.agent.run_tests(deduplicated["codes"], test_suite, matrix=matrix)
 
             regenerate = len(filtered) == 0
 
             return {
                 "execution_report": results,
                 "filtered_codes": filtered,
+                "code_multiplicity": {
+                    ExecutionMatrix.code_key(code): count
+                    for code, count in zip(deduplicated["codes"], deduplicated["multiplicity"])
+                },
+                "execution_matrix": matrix.data,
                 "regenerate_code": regenerate,
                 "regeneration_input": {
-                    "failed_codes": codes,
-                    "failure_reports": results
+                    "failure_reports": results,
+                    "test_cases": test_suite
                 }
             }
\ No newline at end of file
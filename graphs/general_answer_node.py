@@ -7,6 +7,7 @@ It uses an LLM to generate a helpful answer.
 from langchain_openai import ChatOpenAI
 from langchain_core.runnables import Runnable
 from prompts.general_answer_prompt import general_answer_prompt
+from app.services.llm_cache import response_cache_for
 import os
 from dotenv import load_dotenv
 
@@ -17,7 +18,8 @@ class GeneralAnswerNode(Runnable):
         self.llm = ChatOpenAI(
             model=model_name,
             temperature=temperature,
-            api_key=os.getenv("OPENAI_API_KEY")
+            api_key=os.getenv("OPENAI_API_KEY"),
+            cache=response_cache_for(temperature)
         )
 
     def invoke(self, input: dict, config: dict = None) -> dict:
@@ -1,28 +1,63 @@
 """
 Human-in-the-Loop Test Selector Node:
 Displays all formatted valid and invalid test cases and allows a human to select the most complex ones.
+In "interrupt" mode the run pauses (graph interrupt, state persisted by the checkpointer) until
+a selection is submitted, e.g. through app/services/hitl_handler.py, instead of blocking on stdin.
 """
 
+from typing import Dict, List
 from langchain_core.runnables import Runnable
+from langgraph.types import interrupt
+
+def prompt_console_selection(valid_tests: List[str], invalid_tests: List[str]) -> Dict[str, int]:
+    """
+    Asks on the console for the most complex valid and invalid test case.
+
+    Returns:
+        Dict[str, int]: Selection {"valid_index": ..., "invalid_index": ...}.
+    """
+    print("\n✅ Select the most complex VALID test case:")
+    for idx, test in enumerate(valid_tests):
+        print(f"\n[{idx}]\n{test}\n")
+
+    selected_valid_idx = int(input("Enter the index of the most complex VALID test case: "))
+
+    print("\n🚫 Select the most complex INVALID test case:")
+    for idx, test in enumerate(invalid_tests):
+        print(f"\n[{idx}]\n{test}\n")
+
+    selected_invalid_idx = int(input("Enter the index of the most complex INVALID test case: "))
+
+    return {"valid_index": selected_valid_idx, "invalid_index": selected_invalid_idx}
 
 class HumanTestSelectorNode(Runnable):
+    def __init__(self, mode: str = "console"):
+        """
+        Args:
+            mode (str): "console" asks on stdin (blocking), "interrupt" pauses the run until
+                it is resumed with Command(resume={"valid_index": ..., "invalid_index": ...}).
+                Interrupt mode needs a checkpointed graph.
+        """
+        if mode not in ("console", "interrupt"):
+            raise ValueError(f"Unknown selection mode: {mode}")
+        self.mode = mode
+
     def invoke(self, state: dict, config: dict = None) -> dict:
         valid_tests = state.get("formatted_valid_tests", [])
         invalid_tests = state.get("formatted_invalid_tests", [])
 
-        print("\n✅ Select the most complex VALID test case:")
-        for idx, test in enumerate(valid_tests):
-            print(f"\n[{idx}]\n{test}\n")
-
-        selected_valid_idx = int(input("Enter the index of the most complex VALID test case: "))
-
-        print("\n🚫 Select the most complex INVALID test case:")
-        for idx, test in enumerate(invalid_tests):
-            print(f"\n[{idx}]\n{test}\n")
-
-        selected_invalid_idx = int(input("Enter the index of the most complex INVALID test case: "))
+        if self.mode == "interrupt":
+            # The node restarts from the top on resume; interrupt() then returns the submitted selection
+            selection = interrupt({"valid_tests": valid_tests, "invalid_tests": invalid_tests})
+        else:
+            selection = prompt_console_selection(valid_tests, invalid_tests)
 
         return {
-            "selected_valid_test": valid_tests[selected_valid_idx],
-            "selected_invalid_test": invalid_tests[selected_invalid_idx]
-        }
\ No newline at end of file
+            "selected_valid_test": valid_tests[int(selection["valid_index"])],
+            "selected_invalid_test": invalid_tests[int(selection["invalid_index"])],
+            "test_selection": {
+                "valid_index": int(selection["valid_index"]),
+                "invalid_index": int(selection["invalid_index"]),
+                "source": selection.get("source", "human")
+            }
+        }
@@ -1,5 +1,15 @@
 from langchain_core.runnables import Runnable
 from agents.scoring_agent import ScoringAndRankingAgent
+from app.services.execution_matrix import ExecutionMatrix
+
+STRATEGY_LABELS = {
+    "quality": "Quality",
+    "elo": "Elo",
+    "llm_feedback": "LLM Feedback",
+    "test_coverage": "Test Coverage",
+    "complexity": "Complexity",
+    "similarity": "Similarity"
+}
 
 class ScoringNode(Runnable):
     def __init__(self):
@@ -16,27 +26,42 @@ class ScoringNode(Runnable):
                 "evaluation_summary": ""
             }
 
-        # Extrahiere Teststatus aus Report (code_1 → True/False pro Test)
+        # Per-test pass/fail results from the report, keyed by code hash; the report's code IDs
+        # follow the tested codes, not the filtered final_validated_codes
         test_results = {}
-        for code_id, data in test_report.items():
-            test_results[code_id] = data.get("individual_test_results", [])
+        for data in test_report.values():
+            test_results[ExecutionMatrix.code_key(data["code"])] = data.get("individual_test_results", [])
+
+        # Create the agent (and its models) only once; test_results are passed per call
+        if self.agent is None:
+            self.agent = ScoringAndRankingAgent()
 
-        # Übergib test_results an den Agenten
-        self.agent = ScoringAndRankingAgent(test_results)
+        # Score and rank
+        ranked = self.agent.score_codes(codes, test_results)
 
-        # Score und ranke
-        ranked = self.agent.score_codes(codes)
+        # How many generated candidates each (deduplicated) implementation stands for, by code key
+        multiplicity = state.get("code_multiplicity", {})
+        for entry in ranked:
+            entry["multiplicity"] = multiplicity.get(ExecutionMatrix.code_key(entry["code"]), 1)
 
         best_code_entry = ranked[0] if ranked else None
 
         summary_lines = []
         for entry in ranked:
-            summary_lines.append(f"Code ID: {entry['code_id']}")
+            summary_lines.append(f"Code ID: {entry['code_id']} (generated {entry['multiplicity']}x)")
             summary_lines.append(f"- Total Score: {entry['total_score']}")
-            summary_lines.append(f"- Quality: {entry['quality']:.2f}, Elo: {entry['elo']}, LLM Feedback: {entry['llm_feedback']}")
-            summary_lines.append(f"- Test Coverage: {entry['test_coverage']}, Complexity: {entry['complexity']}, Similarity: {entry['similarity']:.2f}")
+            # Only the strategies that ran (disabled and skipped ones have no raw score)
+            strategy_scores = [
+                f"{label}: {entry[key]:.2f}" for key, label in STRATEGY_LABELS.items() if key in entry
+            ]
+            summary_lines.append(f"- {', '.join(strategy_scores)}")
             summary_lines.append("")
 
+        if ranked and ranked[0]["degraded_strategies"]:
+            summary_lines.append(f"Degraded strategies (neutral score): {', '.join(ranked[0]['degraded_strategies'])}")
+        if ranked and ranked[0]["skipped_strategies"]:
+            summary_lines.append(f"Skipped strategies (ranking already decided): {', '.join(ranked[0]['skipped_strategies'])}")
+
         evaluation_summary = "\n".join(summary_lines)
 
         return {
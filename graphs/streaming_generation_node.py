@@ -0,0 +1,167 @@
+"""
+Streaming Generation Node:
+Streaming alternative to code_generation_node + Phase 1 execution_filtering.
+Each generated variant is run against the selected complex tests as soon as it arrives,
+and generation is cancelled once enough candidates have passed.
+On regeneration, the most promising failed candidates are repaired instead.
+Variants equivalent to one already tested (CodeDeduplicationAgent) are only counted, not run again.
+"""
+
+from langchain_core.runnables import Runnable
+from agents.code_deduplication_agent import CodeDeduplicationAgent
+from agents.code_generation_agent import CodeGenerationAgent
+from agents.execution_testing_agent import ExecutionTestingAgent
+from app.services.execution_matrix import ExecutionMatrix
+
+class StreamingGenerationNode(Runnable):
+    def __init__(
+        self,
+        num_variants: int = 10,
+        target_passing: int = 3,
+        max_in_flight: int = 5,
+        repair: bool = True,
+        repair_candidates: int = 3,
+        repair_token_budget: int = None
+    ):
+        """
+        Args:
+            num_variants (int): Maximum number of variants to generate.
+            target_passing (int): Stop generating once this many variants passed the selected tests.
+            max_in_flight (int): Concurrent generation calls; calls beyond this are only
+                issued while no early stop has happened.
+            repair (bool): On regeneration, repair failed candidates from their failure reports.
+            repair_candidates (int): Number of failed candidates repaired per round.
+            repair_token_budget (int): Total tokens repair calls may use over a run (None: unlimited).
+        """
+        self.generation_agent = CodeGenerationAgent()
+        self.execution_agent = ExecutionTestingAgent()
+        self.dedup_agent = CodeDeduplicationAgent()
+        self.num_variants = num_variants
+        self.target_passing = target_passing
+        self.max_in_flight = max_in_flight
+        self.repair = repair
+        self.repair_candidates = repair_candidates
+        self.repair_token_budget = repair_token_budget
+
+    def invoke(self, state: dict, config: dict = None) -> dict:
+        test_suite = [state.get("selected_valid_test", ""), state.get("selected_invalid_test", "")]
+        matrix = ExecutionMatrix(state.get("execution_matrix"))
+
+        regeneration_round = state.get("regeneration_round", 0)
+        if state.get("regenerate_code"):
+            regeneration_round += 1
+            regeneration_input = state.get("regeneration_input", {})
+            failure_reports = regeneration_input.get("failure_reports", {})
+            if self.repair and any(entry.get("code") for entry in failure_reports.values()):
+                return self._repair(
+                    state, failure_reports, regeneration_input.get("test_cases", []), test_suite, regeneration_round, matrix
+                )
+
+        print("\n🌊 Streaming code generation into Phase 1 filtering with selected complex test cases...")
+
+        generated = {}
+        results = {}
+        representatives = {}  # canonical key -> index of the first equivalent variant
+        multiplicity = {}
+        passed_count = 0
+
+        stream = self.generation_agent.stream_code_variants(
+            regulatory_text=state.get("regulatory_text", ""),
+            assumptions=state.get("assumptions", ""),
+            input_variables=state.get("input_variables", ""),
+            num_variants=self.num_variants,
+            max_concurrency=self.max_in_flight
+        )
+        try:
+            for idx, response in stream:
+                code_id = f"code_{idx + 1}"
+                generated[idx] = response.content
+
+                code = self.execution_agent.clean_code_block(response.content)
+                key = self.dedup_agent.key(code)
+                if key in representatives:
+                    multiplicity[representatives[key]] += 1
+                    continue
+                representatives[key] = idx
+                multiplicity[idx] = 1
+
+                report, _ = self.execution_agent.run_tests([code], test_suite, code_ids=[code_id], matrix=matrix)
+                results.update(report)
+                passed_count += report[code_id]["passed"]
+
+                if passed_count >= self.target_passing:
+                    print(f"\n⏹️ {passed_count} candidates passed the selected tests, cancelling remaining generation.")
+                    break
+        finally:
+            stream.close()
+
+        # Report in generation order, independent of arrival order
+        codes = [generated[idx] for idx in sorted(generated)]
+        tested = sorted(multiplicity)
+        execution_report = {f"code_{idx + 1}": results[f"code_{idx + 1}"] for idx in tested}
+        filtered = [entry["code"] for entry in execution_report.values() if entry["passed"]]
+        if len(tested) < len(codes):
+            print(f"🧬 {len(codes)} candidates, {len(tested)} unique implementations.")
+
+        return {
+            "generated_codes": codes,
+            "regeneration_round": regeneration_round,
+            "execution_report": execution_report,
+            "filtered_codes": filtered,
+            "code_multiplicity": {
+                ExecutionMatrix.code_key(execution_report[f"code_{idx + 1}"]["code"]): multiplicity[idx] for idx in tested
+            },
+            "execution_matrix": matrix.data,
+            "regenerate_code": len(filtered) == 0,
+            "regeneration_input": {
+                "failure_reports": execution_report,
+                "test_cases": test_suite
+            }
+        }
+
+    def _repair(
+        self,
+        state: dict,
+        failure_reports: dict,
+        failed_test_suite: list,
+        test_suite: list,
+        regeneration_round: int,
+        matrix: ExecutionMatrix
+    ) -> dict:
+        tokens_used = state.get("repair_tokens_used", 0)
+        remaining = None if self.repair_token_budget is None else self.repair_token_budget - tokens_used
+        print(f"\n🛠️ Repair round {regeneration_round}: fixing the most promising failed candidates...")
+
+        codes, tokens = self.generation_agent.repair_code_variants(
+            regulatory_text=state.get("regulatory_text", ""),
+            assumptions=state.get("assumptions", ""),
+            input_variables=state.get("input_variables", ""),
+            failure_reports=failure_reports,
+            test_cases=failed_test_suite,
+            num_candidates=self.repair_candidates,
+            token_budget=remaining
+        )
+        if not codes and remaining is not None:
+            # Not even one repair fits into what is left: mark the budget as spent
+            tokens = remaining
+        codes = [code.content for code in codes]
+        deduplicated = self.dedup_agent.deduplicate([self.execution_agent.clean_code_block(code) for code in codes])
+
+        execution_report, filtered = self.execution_agent.run_tests(deduplicated["codes"], test_suite, matrix=matrix)
+
+        return {
+            "generated_codes": codes,
+            "regeneration_round": regeneration_round,
+            "repair_tokens_used": tokens_used + tokens,
+            "execution_report": execution_report,
+            "filtered_codes": filtered,
+            "code_multiplicity": {
+                ExecutionMatrix.code_key(code): count for code, count in zip(deduplicated["codes"], deduplicated["multiplicity"])
+            },
+            "execution_matrix": matrix.data,
+            "regenerate_code": len(filtered) == 0,
+            "regeneration_input": {
+                "failure_reports": execution_report,
+                "test_cases": test_suite
+            }
+        }
@@ -0,0 +1,91 @@
+"""
+Test Deduplication Node:
+Drops duplicate and conflicting test cases before formatting, so every distinct case is formatted
+and executed once. Optionally tops the sets up to the requested size with newly generated cases.
+"""
+
+from langchain_core.runnables import Runnable
+from agents.test_deduplication_agent import TestDeduplicationAgent
+
+class TestDeduplicationNode(Runnable):
+    def __init__(self, top_up: bool = False, num_cases: int = 10, max_top_up_rounds: int = 2):
+        """
+        Args:
+            top_up (bool): Generate new cases for the ones dropped, until each set has num_cases again.
+            num_cases (int): Requested cases per test type.
+            max_top_up_rounds (int): Generation calls per test type spent on topping up.
+        """
+        self.agent = TestDeduplicationAgent()
+        self.top_up = top_up
+        self.num_cases = num_cases
+        self.max_top_up_rounds = max_top_up_rounds
+        self.generation_agent = None
+
+    def invoke(self, input: dict, config: dict = None) -> dict:
+        input_variables = input.get("input_variables", "")
+        valid_tests = input.get("valid_test_cases", [])
+        invalid_tests = input.get("invalid_test_cases", [])
+
+        result = self.agent.deduplicate(valid_tests, invalid_tests, input_variables)
+        conflicts = result["conflicts"]
+        topped_up = {"valid": 0, "invalid": 0}
+
+        for _ in range(self.max_top_up_rounds if self.top_up else 0):
+            missing = {
+                test_type: self.num_cases - len(result[f"{test_type}_tests"])
+                for test_type in ("valid", "invalid")
+            }
+            if all(count <= 0 for count in missing.values()):
+                break
+            new_tests = {
+                test_type: self._generate(input, test_type, count, result["valid_tests"] + result["invalid_tests"])
+                for test_type, count in missing.items() if count > 0
+            }
+            kept_before = {test_type: len(result[f"{test_type}_tests"]) for test_type in ("valid", "invalid")}
+            result = self.agent.deduplicate(
+                result["valid_tests"] + new_tests.get("valid", []),
+                result["invalid_tests"] + new_tests.get("invalid", []),
+                input_variables
+            )
+            conflicts += result["conflicts"]
+            for test_type in topped_up:
+                topped_up[test_type] += len(result[f"{test_type}_tests"]) - kept_before[test_type]
+
+        deduplication = {
+            test_type: {
+                "generated": len(input.get(f"{test_type}_test_cases", [])),
+                "kept": len(result[f"{test_type}_tests"]),
+                "topped_up": topped_up[test_type]
+            }
+            for test_type in ("valid", "invalid")
+        }
+        deduplication["conflicts"] = conflicts
+
+        print(
+            f"\n🧹 Deduplicated tests: {deduplication['valid']['generated']} → {deduplication['valid']['kept']} valid, "
+            f"{deduplication['invalid']['generated']} → {deduplication['invalid']['kept']} invalid"
+        )
+        for conflict in conflicts:
+            expectations = ", ".join(f"{e['expected']!r} ({e['test_type']})" for e in conflict["expectations"])
+            outcome = f"kept {conflict['kept']!r}" if conflict["kept"] is not None else "dropped all"
+            print(f"⚠️ Conflicting expectations for {conflict['inputs']}: {expectations} → {outcome}")
+
+        return {
+            "valid_test_cases": result["valid_tests"],
+            "invalid_test_cases": result["invalid_tests"],
+            "test_deduplication": deduplication
+        }
+
+    def _generate(self, input: dict, test_type: str, num_cases: int, existing: list) -> list:
+        if self.generation_agent is None:
+            from agents.test_generation_agent import TestGenerationAgent
+            self.generation_agent = TestGenerationAgent()
+        return self.generation_agent.generate_test_cases(
+            regulatory_text=input.get("regulatory_text", ""),
+            assumptions=input.get("assumptions", ""),
+            input_variables=input.get("input_variables", ""),
+            test_type=test_type,
+            num_cases=num_cases,
+            max_retries=0,
+            exclude=existing
+        )
@@ -14,9 +14,10 @@ class TestFormatterNode(Runnable):
     def invoke(self, input: dict, config: dict = None) -> dict:
         valid_test_cases = input.get("valid_test_cases", [])
         invalid_test_cases = input.get("invalid_test_cases", [])
-    
-        formatted_valid = self.agent.format_test_cases(valid_test_cases)
-        formatted_invalid = self.agent.format_test_cases(invalid_test_cases)
+        input_variables = input.get("input_variables", "")
+
+        formatted_valid = self.agent.format_test_cases(valid_test_cases, input_variables)
+        formatted_invalid = self.agent.format_test_cases(invalid_test_cases, input_variables)
 
 
         return {
@@ -1,20 +1,21 @@
 """
 LangGraph Workflow:
 This graph handles branching based on whether the input is a general question or a Basel III code request.
+The graph is built and compiled on demand (get_app), and every node is imported and constructed
+lazily on its first run, so importing this module does not create LLM clients or load torch.
+Runs are checkpointed per node under a thread id, so they can be resumed and inspected.
 """
 
+import importlib
+import os
+import threading
+import uuid
+from typing import Annotated
+
+from langchain_core.runnables import Runnable
 from langgraph.graph import StateGraph, END
-from langgraph.graph.message import add_messages
-
-from graphs.input_processor_node import InputProcessorNode
-from graphs.general_answer_node import GeneralAnswerNode
-from graphs.code_generation_node import CodeGenerationNode
-from graphs.test_generation_node import TestGenerationNode
-from graphs.test_formatter_node import TestFormatterNode
-from graphs.human_test_selector_node import HumanTestSelectorNode
-from graphs.execution_filtering_node import ExecutionFilteringNode
-from graphs.scoring_and_ranking_node import ScoringNode
-from graphs.code_optimizer_node import CodeOptimizerNode
+
+from app.services.metrics import format_metrics, get_metrics_sink, merge_metrics, track_node
 
 # Define shared state
 class WorkflowState(dict):
@@ -27,95 +28,293 @@ class WorkflowState(dict):
     generated_codes: list
     valid_test_cases: list
     invalid_test_cases: list
+    test_deduplication: dict
     formatted_valid_tests: list
     formatted_invalid_tests: list
     selected_valid_test: str
     selected_invalid_test: str
+    test_selection: dict
     filtered_codes: list
+    code_multiplicity: dict
+    execution_matrix: dict
     final_validated_codes: list
     execution_report: dict
     execution_report_final: dict
     regenerate_code: bool
     regeneration_input: dict
+    regeneration_round: int
+    repair_tokens_used: int
     scoring_results: list
     best_code: str
     evaluation_summary: str
     optimized_code: str
+    metrics: Annotated[dict, merge_metrics]
+
+class LazyNode(Runnable):
+    """
+    Imports and constructs the wrapped node on its first run, and records the metrics of every run
+    of it (see app.services.metrics) into the state.
+    """
 
-# Step 1: Initialize nodes
-input_processor_node = InputProcessorNode()
-general_answer_node = GeneralAnswerNode()
-code_generation_node = CodeGenerationNode()
-test_generation_node = TestGenerationNode()
-test_formatter_node = TestFormatterNode()
-human_test_selector_node = HumanTestSelectorNode()
-execution_filtering_node = ExecutionFilteringNode()
-scoring_node = ScoringNode()
-
-# Step 2: Define graph
-workflow = StateGraph(WorkflowState)
-
-workflow.add_node("input_processor", input_processor_node)
-workflow.add_node("generate_general_answer", general_answer_node)
-workflow.add_node("code_generation_node", code_generation_node)
-workflow.add_node("test_generation", test_generation_node)
-workflow.add_node("test_formatter", test_formatter_node)
-workflow.add_node("select_complex_tests", human_test_selector_node)
-workflow.add_node("execution_filtering", execution_filtering_node)
-workflow.add_node("execution_filtering_all", ExecutionFilteringNode())
-workflow.add_node("scoring_node", scoring_node)
+    def __init__(self, target: str, **kwargs):
+        self.target = target  # "module.path:ClassName"
+        self.kwargs = kwargs
+        self._node = None
+        self._lock = threading.Lock()
+
+    def get_node(self) -> Runnable:
+        if self._node is None:
+            with self._lock:
+                if self._node is None:
+                    module_name, class_name = self.target.split(":")
+                    node_class = getattr(importlib.import_module(module_name), class_name)
+                    self._node = node_class(**self.kwargs)
+        return self._node
+
+    def invoke(self, input: dict, config: dict = None) -> dict:
+        node_name = ((config or {}).get("metadata") or {}).get("langgraph_node", self.target)
+        with track_node(node_name, previous=input.get("metrics")) as node_metrics:
+            output = self.get_node().invoke(input, config)
+        if isinstance(output, dict):
+            output = {**output, "metrics": {"nodes": [node_metrics.as_dict()]}}
+        return output
 
 def route_request_type(state: dict):
     if state["request_type"] == "general":
         return "general_answer"
     else:
         return "code_generation"
-    
-# Step 4: Define edges
-workflow.set_entry_point("input_processor")
-workflow.add_conditional_edges(
-    "input_processor",
-    route_request_type,
-    {
-        "general_answer": "generate_general_answer",
-        "code_generation": "code_generation_node"
-    }
-)
-workflow.add_edge("generate_general_answer", END)
-workflow.add_edge("code_generation_node", "test_generation")
-workflow.add_edge("test_generation", "test_formatter")
-workflow.add_edge("test_formatter", "select_complex_tests")
-workflow.add_edge("select_complex_tests", "execution_filtering")
-
-# Phase 1: Filtering with selected test cases
-workflow.add_conditional_edges(
-    "execution_filtering",
-    lambda state: "regenerate_code" if state.get("regenerate_code") else "continue",
-    {
-        "regenerate_code": "code_generation_node",
-        "continue": "execution_filtering_all"
-    }
-)
-
-# Phase 2: Filtering with full test suite
-workflow.add_conditional_edges(
-    "execution_filtering_all",
-    lambda state: "regenerate_code" if state.get("regenerate_code") else "continue",
-    {
-        "regenerate_code": "code_generation_node",
-        "continue": "scoring_node"
+
+def route_after_code_generation(state: dict):
+    # Repaired/regenerated codes are checked against the tests the run already has
+    if state.get("selected_valid_test") or state.get("selected_invalid_test"):
+        return "execution_filtering"
+    return "test_generation"
+
+def build_workflow(
+    streaming: bool = False,
+    target_passing: int = 3,
+    max_regeneration_rounds: int = 3,
+    repair_token_budget: int = None,
+    selection_mode: str = "auto",
+    num_variants: int = 10,
+    top_up_tests: bool = False,
+    fail_fast: bool = False
+) -> StateGraph:
+    """
+    Builds the (uncompiled) workflow graph.
+
+    Args:
+        streaming (bool): Generate tests first, then stream code variants straight into
+            Phase 1 filtering (streaming_generation) instead of generating all variants up front.
+        target_passing (int): Streaming only. Stop generating once this many variants passed Phase 1.
+        max_regeneration_rounds (int): Give up after this many repair/regeneration rounds.
+        repair_token_budget (int): Give up once repair calls used this many tokens (None: unlimited).
+        selection_mode (str): How the complex tests for Phase 1 are picked: "auto" ranks them
+            locally (TestSelectionAgent); human selection is opt-in, either "console" (stdin)
+            or "interrupt" (pauses the run until a selection is resumed into it; needs a checkpointer).
+        num_variants (int): Code variants generated per run (upper bound in streaming mode).
+        top_up_tests (bool): Replace test cases dropped as duplicates or conflicts with newly generated ones.
+        fail_fast (bool): Phase 2 stops each code at its first failing test.
+    """
+    # In streaming mode one node replaces code generation + Phase 1 filtering
+    generation_node = "streaming_generation" if streaming else "code_generation_node"
+    phase_one_node = "streaming_generation" if streaming else "execution_filtering"
+
+    def route_after_filtering(state: dict):
+        if not state.get("regenerate_code"):
+            return "continue"
+        if state.get("regeneration_round", 0) >= max_regeneration_rounds:
+            print(f"\n🛑 No code passed after {max_regeneration_rounds} regeneration rounds, giving up.")
+            return "give_up"
+        if repair_token_budget is not None and state.get("repair_tokens_used", 0) >= repair_token_budget:
+            print(f"\n🛑 Repair token budget of {repair_token_budget} exhausted, giving up.")
+            return "give_up"
+        return "regenerate_code"
+
+    # Step 1: Define graph with lazily constructed nodes
+    workflow = StateGraph(WorkflowState)
+
+    workflow.add_node("input_processor", LazyNode("graphs.input_processor_node:InputProcessorNode"))
+    workflow.add_node("generate_general_answer", LazyNode("graphs.general_answer_node:GeneralAnswerNode"))
+    workflow.add_node("test_generation", LazyNode("graphs.test_generation_node:TestGenerationNode"))
+    workflow.add_node("test_deduplication", LazyNode(
+        "graphs.test_deduplication_node:TestDeduplicationNode", top_up=top_up_tests
+    ))
+    workflow.add_node("test_formatter", LazyNode("graphs.test_formatter_node:TestFormatterNode"))
+    if selection_mode == "auto":
+        workflow.add_node("select_complex_tests", LazyNode("graphs.auto_test_selector_node:AutoTestSelectorNode"))
+    else:
+        workflow.add_node("select_complex_tests", LazyNode(
+            "graphs.human_test_selector_node:HumanTestSelectorNode", mode=selection_mode
+        ))
+    if streaming:
+        workflow.add_node("streaming_generation", LazyNode(
+            "graphs.streaming_generation_node:StreamingGenerationNode",
+            num_variants=num_variants, target_passing=target_passing, repair_token_budget=repair_token_budget
+        ))
+    else:
+        workflow.add_node("code_generation_node", LazyNode(
+            "graphs.code_generation_node:CodeGenerationNode",
+            num_variants=num_variants, repair_token_budget=repair_token_budget
+        ))
+        workflow.add_node("execution_filtering", LazyNode("graphs.execution_filtering_node:ExecutionFilteringNode", phase=1))
+    workflow.add_node("execution_filtering_all", LazyNode(
+        "graphs.execution_filtering_node:ExecutionFilteringNode", phase=2, fail_fast=fail_fast
+    ))
+    workflow.add_node("scoring_node", LazyNode("graphs.scoring_and_ranking_node:ScoringNode"))
+
+    # Step 2: Define edges
+    workflow.set_entry_point("input_processor")
+    workflow.add_conditional_edges(
+        "input_processor",
+        route_request_type,
+        {
+            "general_answer": "generate_general_answer",
+            "code_generation": "test_generation" if streaming else "code_generation_node"
+        }
+    )
+    workflow.add_edge("generate_general_answer", END)
+    if not streaming:
+        workflow.add_conditional_edges(
+            "code_generation_node",
+            route_after_code_generation,
+            {
+                "test_generation": "test_generation",
+                "execution_filtering": "execution_filtering"
+            }
+        )
+    workflow.add_edge("test_generation", "test_deduplication")
+    workflow.add_edge("test_deduplication", "test_formatter")
+    workflow.add_edge("test_formatter", "select_complex_tests")
+    workflow.add_edge("select_complex_tests", phase_one_node)
+
+    # Phase 1: Filtering with selected test cases
+    workflow.add_conditional_edges(
+        phase_one_node,
+        route_after_filtering,
+        {
+            "regenerate_code": generation_node,
+            "continue": "execution_filtering_all",
+            "give_up": END
+        }
+    )
+
+    # Phase 2: Filtering with full test suite
+    workflow.add_conditional_edges(
+        "execution_filtering_all",
+        route_after_filtering,
+        {
+            "regenerate_code": generation_node,
+            "continue": "scoring_node",
+            "give_up": END
+        }
+    )
+
+    workflow.add_edge("scoring_node", END)
+
+    return workflow
+
+# Step 3: Compile the graph on first use
+_apps = {}
+_app_lock = threading.Lock()
+
+def get_app(streaming: bool = None, checkpointed: bool = None, human_selection: bool = None):
+    """
+    Returns the compiled workflow, building it on first use.
+
+    Args:
+        streaming (bool): Use the streaming pipeline (defaults to the STREAMING_PIPELINE env var;
+            STREAMING_TARGET_PASSING sets its early-stop threshold).
+        checkpointed (bool): Persist a checkpoint after every node in the local SQLite checkpointer
+            (defaults to the WORKFLOW_CHECKPOINTS env var; run_workflow always checkpoints).
+            Checkpointed runs need a thread id in the config, see run_config.
+        human_selection (bool): Let a person pick the complex tests instead of the automatic
+            selector (defaults to TEST_SELECTION_MODE=human). Checkpointed runs pause for the
+            selection, others read it from stdin.
+
+    MAX_REGENERATION_ROUNDS and REPAIR_TOKEN_BUDGET (env) cap the repair loop; TEST_TOP_UP=1
+    replaces deduplicated test cases with new ones; PHASE2_FAIL_FAST=1 stops Phase 2 at a code's first failure.
+    """
+    if streaming is None:
+        streaming = os.getenv("STREAMING_PIPELINE", "0") == "1"
+    if checkpointed is None:
+        checkpointed = os.getenv("WORKFLOW_CHECKPOINTS", "0") == "1"
+    if human_selection is None:
+        human_selection = os.getenv("TEST_SELECTION_MODE", "auto") == "human"
+
+    key = (streaming, checkpointed, human_selection)
+    with _app_lock:
+        if key not in _apps:
+            target_passing = int(os.getenv("STREAMING_TARGET_PASSING", "3"))
+            max_rounds = int(os.getenv("MAX_REGENERATION_ROUNDS", "3"))
+            token_budget = os.getenv("REPAIR_TOKEN_BUDGET")
+            checkpointer = None
+            if checkpointed:
+                from app.services.checkpointer import get_checkpointer
+                checkpointer = get_checkpointer()
+            if not human_selection:
+                selection_mode = "auto"
+            else:
+                selection_mode = "interrupt" if checkpointed else "console"
+            _apps[key] = build_workflow(
+                streaming=streaming,
+                target_passing=target_passing,
+                max_regeneration_rounds=max_rounds,
+                repair_token_budget=int(token_budget) if token_budget else None,
+                selection_mode=selection_mode,
+                top_up_tests=os.getenv("TEST_TOP_UP", "0") == "1",
+                fail_fast=os.getenv("PHASE2_FAIL_FAST", "0") == "1"
+            ).compile(checkpointer=checkpointer)
+        return _apps[key]
+
+def __getattr__(name):
+    # Keeps `from graphs.workflow import app` working without compiling at import time
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def run_config(thread_id: str, streaming: bool = None, human_selection: bool = None) -> dict:
+    """
+    Builds the invoke config for a checkpointed run. The graph variant (arguments as for get_app)
+    is stored in the checkpoint metadata, so resume_workflow picks the same graph again.
+    """
+    if streaming is None:
+        streaming = os.getenv("STREAMING_PIPELINE", "0") == "1"
+    if human_selection is None:
+        human_selection = os.getenv("TEST_SELECTION_MODE", "auto") == "human"
+    return {
+        "configurable": {"thread_id": thread_id},
+        "metadata": {"streaming": streaming, "human_selection": human_selection}
     }
-)
 
-workflow.add_edge("scoring_node", END)
+def get_run_app(thread_id: str):
+    """
+    Returns the checkpointed workflow variant a stored run was started with.
+
+    Raises:
+        ValueError: No checkpoints are stored for the run.
+    """
+    from app.services.checkpointer import get_checkpointer
 
-# Step 5: Compile the graph
-app = workflow.compile()
+    checkpoint = get_checkpointer().get_tuple({"configurable": {"thread_id": thread_id}})
+    if checkpoint is None:
+        raise ValueError(f"No checkpoints stored for run {thread_id!r}")
+    return get_app(
+        streaming=bool(checkpoint.metadata.get("streaming", False)),
+        checkpointed=True,
+        human_selection=bool(checkpoint.metadata.get("human_selection", False))
+    )
 
-# Step 6: Expose only final formatted test output for display
-def run_workflow(user_input: str):
-    final_state = app.invoke({"user_input": user_input})
+def _console_hitl():
+    # Checkpointed runs pause for the test selection; the CLI answers them through the same
+    # HITLHandler as the API, just without a selection timeout
+    from app.services.hitl_handler import HITLHandler
 
+    return HITLHandler(timeout_seconds=None)
+
+# Step 4: Expose only final formatted test output for display
+def print_results(final_state: dict):
     if final_state.get("final_validated_codes"):
         print("\n✅ Final Validated Codes:")
         for i, code in enumerate(final_state["final_validated_codes"], start=1):
@@ -132,4 +331,88 @@ def run_workflow(user_input: str):
         print("\n🏆 Best Code:")
         print(final_state["best_code"])
 
-    return final_state
\ No newline at end of file
+    if final_state.get("metrics"):
+        print("\n⏱️ Run Metrics:")
+        print(format_metrics(final_state["metrics"]))
+
+def run_workflow(user_input: str, thread_id: str = None, human_selection: bool = None):
+    """
+    Runs the workflow as a checkpointed run.
+
+    Args:
+        user_input (str): The user's question or code request.
+        thread_id (str): Run id to store the checkpoints under (default: a new random id).
+        human_selection (bool): Ask on the console for the complex tests instead of selecting
+            them automatically (defaults to TEST_SELECTION_MODE=human).
+    """
+    thread_id = thread_id or uuid.uuid4().hex
+    print(f"\n🧵 Run {thread_id} (resume with resume_workflow({thread_id!r}))")
+
+    from app.services.hitl_handler import answer_on_console
+
+    handler = _console_hitl()
+    final_state = answer_on_console(handler, handler.start_run(user_input, thread_id, human_selection))
+    get_metrics_sink().record_run(thread_id, final_state.get("metrics"))
+    print_results(final_state)
+    return final_state
+
+def resume_workflow(thread_id: str):
+    """
+    Resumes a checkpointed run from its last completed node. Nodes that already completed are
+    not run (or paid for) again; a finished run just returns its final state, and a run paused
+    for the test selection asks for it on the console.
+    """
+    app = get_run_app(thread_id)
+    config = {"configurable": {"thread_id": thread_id}}
+
+    snapshot = app.get_state(config)
+    if not snapshot.next:
+        print(f"\n✅ Run {thread_id} already finished.")
+        final_state = snapshot.values
+    else:
+        from app.services.hitl_handler import answer_on_console
+
+        handler = _console_hitl()
+        if snapshot.interrupts:
+            payload = snapshot.interrupts[0].value
+            outcome = {"thread_id": thread_id, "status": "awaiting_selection", **payload}
+        else:
+            print(f"\n⏯️ Resuming run {thread_id} at {', '.join(snapshot.next)}...")
+            outcome = handler.resume(thread_id)
+        final_state = answer_on_console(handler, outcome)
+        get_metrics_sink().record_run(thread_id, final_state.get("metrics"))
+
+    print_results(final_state)
+    return final_state
+
+def inspect_run(thread_id: str, history: bool = False) -> dict:
+    """
+    Returns the stored state of a checkpointed run.
+
+    Args:
+        thread_id (str): Run id.
+        history (bool): Also list every stored checkpoint (newest first).
+
+    Returns:
+        dict: "values" (the latest state), "next" (nodes still to run; empty once finished),
+            "step", "created_at", "awaiting_selection" and, if requested, "history" with the step, the nodes that
+            were next and the creation time of each checkpoint.
+    """
+    app = get_run_app(thread_id)
+    config = {"configurable": {"thread_id": thread_id}}
+
+    snapshot = app.get_state(config)
+    run = {
+        "thread_id": thread_id,
+        "values": snapshot.values,
+        "next": list(snapshot.next),
+        "step": snapshot.metadata.get("step") if snapshot.metadata else None,
+        "created_at": snapshot.created_at,
+        "awaiting_selection": bool(snapshot.interrupts)
+    }
+    if history:
+        run["history"] = [
+            {"step": state.metadata.get("step"), "next": list(state.next), "created_at": state.created_at}
+            for state in app.get_state_history(config)
+        ]
+    return run
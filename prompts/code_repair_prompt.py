@@ -0,0 +1,30 @@
+from langchain.prompts import PromptTemplate
+
+# Prompt for repairing a generated function using the tests it fails and their observed results
+code_repair_prompt = PromptTemplate.from_template("""
+The following Python function computes the risk weight for exposures according to the given regulatory text,
+but it fails the test cases listed below. For each failing test you get its source code and the observed result
+(the values the assertion compared, or the error raised). Fix the function so that it passes these tests.
+
+Use the following instructions for fixing the python function:
+- Instruction 1: Keep the function name `calculate_risk_weight` and the input variables in this precise order:
+{input_variables}
+- Instruction 2: The output should be an integer representing the risk weight (e.g., 20, 100) or a string "Invalid input value!" if the python function fails to assign a risk weight for the given input.
+- Instruction 3: Always comment the code of the python function, so that it is clear to the user what the code does.
+
+### Assumptions:
+{assumptions}
+
+### Regulatory Text:
+{regulatory_text}
+
+### Function:
+```python
+{code}
+```
+
+### Failing Tests:
+{failing_tests}
+
+Provide only the fixed Code without any explanation or text.
+""")
@@ -26,4 +26,31 @@ Please generate one test case and output it in the following format:
                                                 
 
 Think step-by-step to ensure accurate assignment of the risk weight.
-""")
\ No newline at end of file
+""")
+
+test_case_batch_prompt = PromptTemplate.from_template("""
+You are given a regulatory text, and I want you to compute the risk weight for given input values using the regulatory text.
+Your task is to generate {num_cases} distinct {test_type} test cases that will be used to evaluate the function `calculate_risk_weight()`.
+
+The expected result of each test case should be:
+- an integer representing the corresponding risk weight (e.g., 20, 100)
+- or the string "Invalid input value!" if the test case is invalid
+
+### Test Type:
+{test_type}  # valid or invalid
+
+Here is the regulatory text:
+{regulatory_text}
+
+Here are the assumptions for the input values:
+{assumptions}
+
+Here are the input values:
+{input_variables}
+
+Think step-by-step to ensure accurate assignment of the risk weight, and make every test case use a different combination of input values.
+{excluded_cases}
+Return only a JSON list with exactly {num_cases} objects and nothing else. Each object must have this format:
+  "inputs": {{"<input variable>": <value>, ...}},   // one entry per input variable
+  "riskweight": <integer or "Invalid input value!">
+""")
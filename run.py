@@ -0,0 +1,69 @@
+"""
+Batch Runner CLI:
+Runs every request of a JSONL file through the workflow, e.g. a whole regulatory section overnight.
+
+    python run.py requests.jsonl --output results.jsonl --concurrency 16 --timeout 900
+
+Each input line is a JSON object with the request text in "user_input" (or "body"/"request"/"text")
+and an optional "id". Results are appended to the output as they finish; rerunning the same command
+skips requests that already completed.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run a JSONL file of requests through the workflow.")
+    parser.add_argument("input", help="JSONL file with one request per line")
+    parser.add_argument("--output", help="Output JSONL (default: <input>.results.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=None, help="Requests in flight at once (default: 4 per CPU)")
+    parser.add_argument("--timeout", type=float, default=900, help="Seconds per request (0: no limit)")
+    parser.add_argument("--streaming", action="store_true", help="Use the streaming generation pipeline")
+    parser.add_argument("--no-resume", action="store_true", help="Also rerun requests already completed in the output")
+    parser.add_argument("--no-checkpoints", action="store_true", help="Do not store per-request checkpoints")
+    parser.add_argument("--summary-json", help="Also write the summary to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Show the workflow's own output")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    from app.services.batch_runner import BatchRunner, format_summary
+
+    output = args.output or f"{os.path.splitext(args.input)[0]}.results.jsonl"
+    runner = BatchRunner(
+        concurrency=args.concurrency,
+        timeout=args.timeout or None,
+        streaming=args.streaming,
+        checkpointed=not args.no_checkpoints
+    )
+
+    def progress(record):
+        print(f"{'✅' if record['status'] == 'completed' else '❌'} {record['id']}: {record['status']} "
+              f"in {record['seconds']:.1f}s", file=sys.stderr, flush=True)
+
+    # Concurrent runs interleave their prints; only progress lines are shown unless --verbose
+    quiet = open(os.devnull, "w") if not args.verbose else None
+    with contextlib.redirect_stdout(quiet) if quiet else contextlib.nullcontext():
+        summary = runner.run(args.input, output, resume=not args.no_resume, progress=progress)
+    if quiet:
+        quiet.close()
+
+    print(format_summary(summary))
+    print(f"\n📝 Results written to {output}")
+    if args.summary_json:
+        with open(args.summary_json, "w", encoding="utf-8") as summary_file:
+            json.dump(summary, summary_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
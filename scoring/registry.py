@@ -0,0 +1,188 @@
+"""
+Scoring Strategy Registry:
+Strategies register a name, a cost class (CPU < MODEL < NETWORK) and a weight. The cost tiers run
+from the cheapest to the most expensive one, and before an expensive tier starts the partial weighted
+scores are checked: if the remaining weight cannot change which codes are in the top-k, the remaining
+tiers are skipped. Normalised scores lie in [0, 1], so the partial scores of two codes differ by at
+most the weight already run; a tier whose remaining weight is at least that can never be skipped and
+runs concurrently with the tiers before it instead (see stages). With the default weights the CPU and
+MODEL tiers (0.8) therefore run together, and the NETWORK tier (llm_feedback, 0.2) is skipped when the
+top-k lead by more than 0.2. Weights and disabled strategies come from the configuration
+(SCORING_WEIGHTS, SCORING_DISABLED_STRATEGIES).
+"""
+
+import os
+from typing import Callable, Dict, Iterable, List
+
+from scoring.scheduler import CPU, MODEL, NETWORK, NEUTRAL_SCORE, ScoringScheduler
+
+COST_ORDER = [CPU, MODEL, NETWORK]
+
+DEFAULT_WEIGHTS = {
+    "quality": 0.15,
+    "similarity": 0.10,
+    "elo": 0.20,
+    "complexity": 0.15,
+    "llm_feedback": 0.20,
+    "test_coverage": 0.20
+}
+
+
+def parse_weights(value: str) -> Dict[str, float]:
+    """
+    Parses "name=weight,name=weight" (as in SCORING_WEIGHTS).
+
+    Raises:
+        ValueError: An entry is not of the form name=weight.
+    """
+    weights = {}
+    for item in filter(None, (part.strip() for part in (value or "").split(","))):
+        name, separator, weight = item.partition("=")
+        if not separator:
+            raise ValueError(f"Invalid scoring weight {item!r}, expected name=weight")
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+def parse_names(value: str) -> List[str]:
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+class ScoringStrategyRegistry:
+    def __init__(
+        self,
+        weights: Dict[str, float] = None,
+        disabled: Iterable[str] = None,
+        top_k: int = None,
+        early_termination: bool = None,
+        scheduler: ScoringScheduler = None
+    ):
+        """
+        Args:
+            weights (Dict[str, float]): Weight overrides by strategy name (defaults to SCORING_WEIGHTS).
+                A weight of 0 disables the strategy.
+            disabled: Strategy names not to run (defaults to SCORING_DISABLED_STRATEGIES).
+            top_k (int): Number of leading codes whose membership must be settled before
+                expensive tiers are skipped (defaults to SCORING_TOP_K, 1).
+            early_termination (bool): Skip tiers that cannot change the top-k
+                (defaults to SCORING_EARLY_TERMINATION, on).
+            scheduler (ScoringScheduler): Runs the strategies of one stage concurrently.
+        """
+        if weights is None:
+            weights = parse_weights(os.getenv("SCORING_WEIGHTS", ""))
+        if disabled is None:
+            disabled = parse_names(os.getenv("SCORING_DISABLED_STRATEGIES", ""))
+        if top_k is None:
+            top_k = int(os.getenv("SCORING_TOP_K", "1"))
+        if early_termination is None:
+            early_termination = os.getenv("SCORING_EARLY_TERMINATION", "1") == "1"
+
+        self.weight_overrides = dict(weights)
+        self.disabled = set(disabled)
+        self.top_k = max(top_k, 1)
+        self.early_termination = early_termination
+        self.scheduler = scheduler or ScoringScheduler()
+        self.strategies: Dict[str, Dict] = {}
+
+    def is_enabled(self, name: str) -> bool:
+        return name not in self.disabled and self.weight(name) > 0
+
+    def weight(self, name: str) -> float:
+        return self.weight_overrides.get(name, DEFAULT_WEIGHTS.get(name, 0.0))
+
+    def register(self, name: str, cost: str, score: Callable[[List[str], Dict], List[float]], weight: float = None):
+        """
+        Registers a strategy. Disabled strategies are not registered.
+
+        Args:
+            name (str): Strategy name, also the key of its raw score in the scored entries.
+            cost (str): CPU, MODEL or NETWORK; decides the tier and where the strategy runs.
+            score: Callable taking the codes and the run context and returning one raw
+                score per code (higher is better).
+            weight (float): Default weight if none is configured for the name.
+        """
+        if cost not in COST_ORDER:
+            raise ValueError(f"Unknown cost class {cost!r} for scoring strategy {name!r}")
+        if weight is not None:
+            self.weight_overrides.setdefault(name, weight)
+        if self.is_enabled(name):
+            self.strategies[name] = {"cost": cost, "score": score, "weight": self.weight(name)}
+
+    def stages(self) -> List[List[str]]:
+        """
+        Groups the registered strategies into stages that run one after another, cheapest first.
+        A cost tier starts a new stage only if it can be skipped, i.e. the weight run before it
+        exceeds the weight still to run; otherwise it joins the stage before it. Without early
+        termination every strategy runs in one stage.
+        """
+        stages, done, total = [], 0.0, self.total_weight()
+        for cost in COST_ORDER:
+            tier = [name for name, spec in self.strategies.items() if spec["cost"] == cost]
+            if not tier:
+                continue
+            if stages and (not self.early_termination or done <= total - done):
+                stages[-1].extend(tier)
+            else:
+                stages.append(tier)
+            done += sum(self.strategies[name]["weight"] for name in tier)
+        return stages
+
+    def run(self, codes: List[str], normalize: Callable[[List[float]], List[float]], context: Dict = None) -> Dict:
+        """
+        Runs the registered strategies stage by stage (see stages).
+
+        Args:
+            codes (List[str]): Codes to score.
+            normalize: Maps one strategy's raw scores to [0, 1].
+            context (Dict): Per-call inputs passed to every strategy (e.g. test results).
+
+        Returns:
+            Dict: "scores" and "normalized" ({name: one value per code}, skipped strategies
+                are missing from "scores" and NEUTRAL_SCORE in "normalized"), "degraded"
+                ({name: reason}) and "skipped" (names of strategies that did not run).
+        """
+        scores, normalized, degraded, skipped = {}, {}, {}, []
+        partial = [0.0] * len(codes)
+        remaining = self.total_weight()
+
+        stages = self.stages()
+        for position, stage in enumerate(stages):
+            if position > 0 and self._top_k_decided(partial, remaining):
+                later = [name for names in stages[position:] for name in names]
+                print(f"⏭️ Top-{self.top_k} already decided; skipping scoring strategies: {', '.join(later)}")
+                for name in later:
+                    normalized[name] = [NEUTRAL_SCORE] * len(codes)
+                skipped.extend(later)
+                break
+
+            stage_scores, stage_degraded = self.scheduler.run(
+                {
+                    name: (self.strategies[name]["cost"], lambda score=self.strategies[name]["score"]: score(codes, context or {}))
+                    for name in stage
+                },
+                len(codes)
+            )
+            degraded.update(stage_degraded)
+            for name in stage:
+                weight = self.strategies[name]["weight"]
+                scores[name] = stage_scores[name]
+                if name in stage_degraded:
+                    # Neutral for every code: the strategy does not influence the ranking
+                    normalized[name] = [NEUTRAL_SCORE] * len(codes)
+                else:
+                    normalized[name] = normalize(stage_scores[name])
+                partial = [total + weight * value for total, value in zip(partial, normalized[name])]
+                remaining -= weight
+
+        return {"scores": scores, "normalized": normalized, "degraded": degraded, "skipped": skipped}
+
+    def total_weight(self) -> float:
+        return sum(spec["weight"] for spec in self.strategies.values())
+
+    def _top_k_decided(self, partial: List[float], remaining: float) -> bool:
+        # Normalised scores lie in [0, 1], so no code can gain more than the remaining weight on another
+        if len(partial) <= self.top_k:
+            return True
+        ranked = sorted(partial, reverse=True)
+        return ranked[self.top_k - 1] > ranked[self.top_k] + remaining
+
@@ -0,0 +1,109 @@
+"""
+Scoring Scheduler:
+Runs independent scoring strategies concurrently, so scoring takes as long as the slowest strategy
+instead of the sum of all. Network-bound strategies (LLM calls) run on their own threads,
+model-bound ones (embeddings, CrossEncoder) on the shared model executor, and cheap CPU-bound
+ones inline while the others are in flight. A strategy that fails or exceeds its timeout yields
+a neutral score for every code and is reported as degraded instead of failing the ranking.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Callable, Dict, List, Tuple
+
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+
+from app.services.model_registry import get_model_executor
+
+NETWORK = "network"
+MODEL = "model"
+CPU = "cpu"
+
+NEUTRAL_SCORE = 0.5
+DEFAULT_TIMEOUT_SECONDS = 120.0
+
+
+class ScoringScheduler:
+    def __init__(self, timeouts: Dict[str, float] = None, default_timeout: float = None):
+        """
+        Args:
+            timeouts (Dict[str, float]): Seconds per strategy name, overriding the default.
+            default_timeout (float): Seconds a network or model strategy may take
+                (defaults to SCORING_TIMEOUT_SECONDS, 120). CPU strategies run inline and are not timed out.
+        """
+        self.timeouts = timeouts or {}
+        if default_timeout is None:
+            default_timeout = float(os.getenv("SCORING_TIMEOUT_SECONDS", str(DEFAULT_TIMEOUT_SECONDS)))
+        self.default_timeout = default_timeout
+
+    def run(self, strategies: Dict[str, Tuple[str, Callable[[], List[float]]]], num_codes: int):
+        """
+        Runs every strategy and waits at most its timeout for it. The timeout counts from the
+        moment the strategy starts running, so time spent queued on the shared model executor
+        does not count against it.
+
+        Args:
+            strategies: {name: (NETWORK | MODEL | CPU, callable returning one score per code)}.
+            num_codes (int): Number of codes being scored.
+
+        Returns:
+            Tuple:
+                - scores: {name: one score per code}, NEUTRAL_SCORE for degraded strategies.
+                - degraded: {name: reason} for strategies that failed or timed out.
+        """
+        scores, degraded, futures = {}, {}, {}
+        started_at, started = {}, {name: threading.Event() for name in strategies}
+
+        def timed(name, score):
+            def run():
+                started_at[name] = time.perf_counter()
+                started[name].set()
+                return score()
+            return run
+
+        network_strategies = [name for name, (kind, _) in strategies.items() if kind == NETWORK]
+        network_executor = ContextThreadPoolExecutor(max_workers=max(len(network_strategies), 1))
+        try:
+            for name, (kind, score) in strategies.items():
+                if kind == NETWORK:
+                    futures[name] = network_executor.submit(timed(name, score))
+                elif kind == MODEL:
+                    futures[name] = get_model_executor().submit(timed(name, score))
+                else:
+                    continue
+                # Also wakes the wait below if the future ends without ever running
+                futures[name].add_done_callback(lambda _, event=started[name]: event.set())
+
+            for name, (kind, score) in strategies.items():
+                if kind not in (NETWORK, MODEL):
+                    try:
+                        scores[name] = score()
+                    except Exception as exc:
+                        degraded[name] = f"{type(exc).__name__}: {exc}"
+
+            for name, future in futures.items():
+                timeout = self.timeouts.get(name, self.default_timeout)
+                try:
+                    started[name].wait()
+                    elapsed = time.perf_counter() - started_at.get(name, time.perf_counter())
+                    scores[name] = future.result(timeout=max(timeout - elapsed, 0.0))
+                except FuturesTimeoutError:
+                    # A running strategy cannot be interrupted; its result is ignored when it arrives
+                    future.cancel()
+                    degraded[name] = f"timed out after {timeout:g}s"
+                except Exception as exc:
+                    degraded[name] = f"{type(exc).__name__}: {exc}"
+        finally:
+            network_executor.shutdown(wait=False, cancel_futures=True)
+
+        for name, values in list(scores.items()):
+            if name not in degraded and len(values) != num_codes:
+                degraded[name] = f"returned {len(values)} scores for {num_codes} codes"
+
+        for name, reason in degraded.items():
+            print(f"⚠️ Scoring strategy '{name}' degraded ({reason}); using a neutral score of {NEUTRAL_SCORE}.")
+            scores[name] = [NEUTRAL_SCORE] * num_codes
+
+        return scores, degraded
@@ -1,14 +1,19 @@
 """
 LLM Feedback Scoring Strategy:
 Uses an LLM to rate the code's clarity, readability, and quality on a 0 to 10 scale.
+By default all candidates are rated in one structured request; candidates missing from
+that reply are rated individually (concurrently), and unparseable replies are retried.
 """
 
 import os
 import re
 from dotenv import load_dotenv
-from typing import List
+from typing import Dict, List, Optional
 from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.exceptions import OutputParserException
+from app.services.llm_cache import response_cache_for
 
 load_dotenv()
 
@@ -25,35 +30,121 @@ Evaluate the following Python function and assign a score from 0 to 10 based on:
 ### Code:
 ```python
 {code}
-                                               
+
 Respond only with a single integer number (0 to 10). """)
 
-class LLMFeedbackScoringStrategy: 
-    def __init__(self, model_name="gpt-4o", temperature=0.0): 
-        self.llm = ChatOpenAI( 
-            model=model_name, 
-            temperature=temperature, 
-            api_key=os.getenv("OPENAI_API_KEY")
+# Used when a reply to feedback_prompt could not be parsed
+retry_feedback_prompt = PromptTemplate.from_template("""
+You are a code reviewer.
+
+Rate the following Python function from 0 to 10 for clarity, readability, structure, style and overall quality.
+
+### Code:
+```python
+{code}
+```
+
+Your previous answer could not be read. Reply with the integer score only, e.g. 7.
+""")
+
+batch_feedback_prompt = PromptTemplate.from_template("""
+You are a code reviewer.
+
+Evaluate each of the following Python functions independently and assign each a score from 0 to 10 based on:
+- Clarity and readability
+- Proper use of comments and structure
+- Code style and cleanliness
+- Overall implementation quality
+
+{codes}
+
+Respond only with a JSON object that maps every code id to its integer score, e.g. {{"code_1": 7, "code_2": 5}}.
+""")
+
+class LLMFeedbackScoringStrategy:
+    def __init__(
+        self,
+        model_name="gpt-4o",
+        temperature=0.0,
+        batched: bool = True,
+        max_concurrency: int = 5,
+        max_retries: int = 1
+    ):
+        """
+        Args:
+            batched (bool): Rate all candidates in a single request first.
+            max_concurrency (int): Worker limit for the per-candidate requests.
+            max_retries (int): Individual retries for replies that could not be parsed.
+        """
+        self.llm = ChatOpenAI(
+            model=model_name,
+            temperature=temperature,
+            api_key=os.getenv("OPENAI_API_KEY"),
+            cache=response_cache_for(temperature)
         )
-    
+        self.parser = JsonOutputParser()
+        self.batched = batched
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+
     def name(self) -> str:
         return "llm_feedback"
-    
+
     def score(self, codes: List[str]) -> List[float]:
-        scores = []
-        for code in codes:
-            prompt = feedback_prompt.format(code=code)
-            response = self.llm.invoke(prompt).content
-
-            try:
-                match = re.search(r"\d+", response)
-                if match:
-                    numeric = int(match.group())
-                    normalized = min(max(numeric / 10, 0.0), 1.0)
-                else:
-                    normalized = 0.0
-            except:
-                normalized = 0.0
-
-            scores.append(normalized)
-        return scores
\ No newline at end of file
+        code_ids = [f"code_{i+1}" for i in range(len(codes))]
+        scores: Dict[str, Optional[float]] = {code_id: None for code_id in code_ids}
+
+        if self.batched and len(codes) > 1:
+            scores.update(self._score_batch(codes, code_ids))
+
+        # Candidates the batch reply did not cover are rated one by one, then retried if unparseable
+        prompts = [feedback_prompt, *[retry_feedback_prompt] * self.max_retries]
+        for prompt in prompts:
+            missing = [i for i, code_id in enumerate(code_ids) if scores[code_id] is None]
+            if not missing:
+                break
+            replies = self.llm.batch(
+                [prompt.format(code=codes[i]) for i in missing],
+                config={"max_concurrency": self.max_concurrency},
+                return_exceptions=True
+            )
+            for i, reply in zip(missing, replies):
+                if not isinstance(reply, Exception):
+                    scores[code_ids[i]] = self._parse_score(reply.content)
+
+        unscored = [code_id for code_id in code_ids if scores[code_id] is None]
+        if unscored:
+            print(f"⚠️ LLM feedback could not be parsed for {', '.join(unscored)}; scoring them 0.0.")
+
+        return [scores[code_id] if scores[code_id] is not None else 0.0 for code_id in code_ids]
+
+    def _score_batch(self, codes: List[str], code_ids: List[str]) -> Dict[str, float]:
+        """
+        Rates all candidates in one request. Returns only the scores that could be parsed.
+        """
+        listing = "\n\n".join(f"### {code_id}:\n```python\n{code}\n```" for code_id, code in zip(code_ids, codes))
+        try:
+            reply = self.llm.invoke(batch_feedback_prompt.format(codes=listing))
+            parsed = self.parser.parse(reply.content)
+        except (OutputParserException, ValueError):
+            return {}
+        except Exception as exc:
+            print(f"⚠️ Batched LLM feedback failed: {exc}")
+            return {}
+
+        if not isinstance(parsed, dict):
+            return {}
+
+        scores = {}
+        for code_id in code_ids:
+            if code_id in parsed:
+                score = self._parse_score(str(parsed[code_id]))
+                if score is not None:
+                    scores[code_id] = score
+        return scores
+
+    def _parse_score(self, response: str) -> Optional[float]:
+        match = re.search(r"\d+(?:\.\d+)?", response or "")
+        if not match:
+            return None
+        return min(max(float(match.group()) / 10, 0.0), 1.0)
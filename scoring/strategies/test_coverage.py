@@ -1,41 +1,46 @@
 """
 Test Coverage Scoring Strategy:
-Scores each code based on how many test cases it passed.
+Scores each code based on how many test cases it passed. Results are keyed by the code's content
+hash (ExecutionMatrix.code_key), so they stay attached to the right code after filtering and
+deduplication reorder or drop codes.
 """
 
 from typing import List, Dict
 
+from app.services.execution_matrix import ExecutionMatrix
+
 class TestCoverageScoringStrategy:
-    def __init__(self, test_results: Dict[str, List[bool]]):
+    def __init__(self, test_results: Dict[str, List[bool]] = None):
         """
         Args:
-            test_results: A dictionary like:
+            test_results: Pass/fail per test by code key (ExecutionMatrix.code_key), like:
               {
-                  "code_1": [True, True, False],
-                  "code_2": [True, True, True],
+                  "3f2a...": [True, True, False],
+                  "9c41...": [True, True, True],
                   ...
               }
         """
-        self.test_results = test_results
+        self.test_results = test_results or {}
     
     def name(self) -> str:
         return "test_coverage"
     
-    def score(self, codes: List[str]) -> List[float]:
+    def score(self, codes: List[str], test_results: Dict[str, List[bool]] = None) -> List[float]:
         """
         Scores codes by their test pass ratio (0.0 - 1.0)
 
         Args:
-            codes (List[str]): The actual code list, used to determine order.
+            codes (List[str]): The codes to score; looked up by their content hash.
+            test_results: Per-call results; defaults to the ones given at construction.
 
         Returns:
             List[float]: Test coverage score per code.
         """
         scores = []
+        test_results = self.test_results if test_results is None else test_results
 
-        for idx in range(len(codes)):
-            code_id = f"code_{idx+1}"
-            results = self.test_results.get(code_id, [])
+        for code in codes:
+            results = test_results.get(ExecutionMatrix.code_key(code), [])
             if not results:
                 scores.append(0.0)
             else:
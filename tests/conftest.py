@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the packages the same way the app does, from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def counting_engine():
+    """
+    Execution engine that records every source it is asked to run.
+    """
+    from app.services.execution_engine import ExecutionEngine
+
+    class CountingEngine(ExecutionEngine):
+        def __init__(self):
+            super().__init__(processes=1, timeout=2)
+            self.sources = []
+
+        def run(self, sources, fail_fast=False):
+            self.sources.extend(sources)
+            return super().run(sources, fail_fast=fail_fast)
+
+    engine = CountingEngine()
+    yield engine
+    engine.shutdown()
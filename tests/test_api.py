@@ -0,0 +1,154 @@
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import TypedDict
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, StateGraph
+from langgraph.types import interrupt
+
+import app.api.routes as routes
+import app.services.hitl_handler as hitl_handler
+import app.services.orchestrator as orchestrator_module
+from app.services.metrics import MetricsSink
+from app.services.orchestrator import AWAITING_SELECTION, COMPLETED, Orchestrator
+
+VALID_TESTS = ["def test_a(): ...", "def test_b(): ..."]
+INVALID_TESTS = ["def test_c(): ..."]
+
+
+class State(TypedDict, total=False):
+    user_input: str
+    general_answer: str
+    test_selection: dict
+
+
+def build_graph(human_selection):
+    def select(state):
+        if not human_selection:
+            return {"test_selection": {"valid_index": 0, "invalid_index": 0, "source": "auto"}}
+        return {"test_selection": interrupt({"valid_tests": VALID_TESTS, "invalid_tests": INVALID_TESTS})}
+
+    def answer(state):
+        return {"general_answer": state["user_input"].upper()}
+
+    workflow = StateGraph(State)
+    workflow.add_node("select", select)
+    workflow.add_node("answer", answer)
+    workflow.set_entry_point("select")
+    workflow.add_edge("select", "answer")
+    workflow.add_edge("answer", END)
+    return workflow.compile(checkpointer=MemorySaver())
+
+
+@pytest.fixture
+def orchestrator(monkeypatch):
+    graphs = {False: build_graph(False), True: build_graph(True)}
+    monkeypatch.setattr(hitl_handler, "get_app", lambda human_selection=True, **kwargs: graphs[human_selection])
+    monkeypatch.setattr(hitl_handler, "get_run_app", lambda thread_id: graphs[True])
+    monkeypatch.setattr(hitl_handler, "run_config", lambda thread_id, **kwargs: {"configurable": {"thread_id": thread_id}})
+    sink = MetricsSink()
+    monkeypatch.setattr(orchestrator_module, "get_metrics_sink", lambda: sink)
+    monkeypatch.setattr(routes, "get_metrics_sink", lambda: sink)
+
+    orchestrator = Orchestrator(max_concurrent_runs=1, selection_timeout=None)
+    monkeypatch.setattr(routes, "get_orchestrator", lambda: orchestrator)
+    return orchestrator
+
+
+@pytest.fixture
+def client(orchestrator):
+    @asynccontextmanager
+    async def lifespan(app):
+        await orchestrator.start()
+        yield
+        await orchestrator.stop()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(routes.router)
+    with TestClient(app) as client:
+        yield client
+
+
+def wait_for_status(client, job_id, status, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] == status:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} did not reach {status}")
+
+
+def read_events(client, job_id, **headers):
+    events = []
+    with client.stream("GET", f"/jobs/{job_id}/events", headers=headers) as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        for block in response.read().decode().strip().split("\n\n"):
+            fields = dict(line.split(": ", 1) for line in block.splitlines())
+            events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_job_runs_to_completion(client):
+    response = client.post("/jobs", json={"user_input": "what is a risk weight?"})
+
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    job = wait_for_status(client, job_id, COMPLETED)
+    assert job["completed_nodes"] == ["select", "answer"]
+
+    result = client.get(f"/jobs/{job_id}/result").json()
+    assert result["general_answer"] == "WHAT IS A RISK WEIGHT?"
+    assert result["test_selection"]["source"] == "auto"
+    assert 'codegen_runs_total{status="completed"} 1' in client.get("/metrics").text
+
+
+def test_events_are_streamed_and_replayed_after_the_last_id(client):
+    job_id = client.post("/jobs", json={"user_input": "request"}).json()["job_id"]
+    wait_for_status(client, job_id, COMPLETED)
+
+    events = read_events(client, job_id)
+
+    assert [event_type for _, event_type, _ in events] == [
+        "queued", "started", "node_completed", "node_completed", "completed"
+    ]
+    assert [data["node"] for _, event_type, data in events if event_type == "node_completed"] == ["select", "answer"]
+    assert [seq for seq, _, _ in read_events(client, job_id, **{"Last-Event-ID": "3"})] == [4, 5]
+
+
+def test_selection_resumes_a_paused_job(client):
+    job_id = client.post("/jobs", json={"user_input": "request", "human_selection": True}).json()["job_id"]
+    job = wait_for_status(client, job_id, AWAITING_SELECTION)
+    assert job["selection_request"] == {"valid_tests": VALID_TESTS, "invalid_tests": INVALID_TESTS}
+    assert client.get(f"/jobs/{job_id}/result").status_code == 409
+
+    assert client.post(f"/jobs/{job_id}/selection", json={"valid_index": 5, "invalid_index": 0}).status_code == 422
+    assert client.post(f"/jobs/{job_id}/selection", json={"valid_index": 1, "invalid_index": 0}).status_code == 202
+
+    wait_for_status(client, job_id, COMPLETED)
+    result = client.get(f"/jobs/{job_id}/result").json()
+    assert result["test_selection"] == {"valid_index": 1, "invalid_index": 0, "source": "human"}
+    assert client.post(f"/jobs/{job_id}/selection", json={"valid_index": 0, "invalid_index": 0}).status_code == 409
+
+
+def test_selection_claimed_elsewhere_is_not_found(client, orchestrator):
+    job_id = client.post("/jobs", json={"user_input": "request", "human_selection": True}).json()["job_id"]
+    wait_for_status(client, job_id, AWAITING_SELECTION)
+    # e.g. the selection timeout resumed the run first
+    orchestrator.hitl.claim_selection(job_id, 0, 0, "automatic")
+
+    response = client.post(f"/jobs/{job_id}/selection", json={"valid_index": 1, "invalid_index": 0})
+
+    assert response.status_code == 404
+
+
+def test_unknown_jobs_are_not_found(client):
+    assert client.get("/jobs/missing").status_code == 404
+    assert client.get("/jobs/missing/events").status_code == 404
+    assert client.get("/jobs/missing/result").status_code == 404
+    assert client.post("/jobs/missing/selection", json={"valid_index": 0, "invalid_index": 0}).status_code == 404
+    assert client.post("/jobs", json={"user_input": ""}).status_code == 422
@@ -0,0 +1,72 @@
+import json
+import time
+from typing import TypedDict
+
+from langgraph.graph import END, StateGraph
+
+import app.services.batch_runner as batch_runner
+from app.services.batch_runner import COMPLETED, TIMED_OUT, BatchRunner
+
+
+class State(TypedDict, total=False):
+    user_input: str
+    general_answer: str
+
+
+def build_app(slow_inputs, finished_nodes, events=None):
+    events = [] if events is None else events
+
+    def answer(state):
+        events.append(("start", state["user_input"]))
+        if state["user_input"] in slow_inputs:
+            time.sleep(1.5)
+        events.append(("end", state["user_input"]))
+        return {"general_answer": state["user_input"].upper()}
+
+    def finish(state):
+        finished_nodes.append(state["user_input"])
+        return {}
+
+    workflow = StateGraph(State)
+    workflow.add_node("answer", answer)
+    workflow.add_node("finish", finish)
+    workflow.set_entry_point("answer")
+    workflow.add_edge("answer", "finish")
+    workflow.add_edge("finish", END)
+    return workflow.compile()
+
+
+def test_timeout_is_enforced_while_a_node_runs(tmp_path, monkeypatch):
+    finished_nodes = []
+    monkeypatch.setattr(batch_runner, "get_app", lambda **kwargs: build_app({"slow"}, finished_nodes))
+    input_path = tmp_path / "requests.jsonl"
+    output_path = tmp_path / "results.jsonl"
+    input_path.write_text("\n".join(json.dumps({"id": text, "user_input": text}) for text in ("fast", "slow")))
+
+    started = time.time()
+    summary = BatchRunner(concurrency=2, timeout=0.3, checkpointed=False).run(str(input_path), str(output_path))
+    elapsed = time.time() - started
+
+    records = {record["id"]: record for record in map(json.loads, output_path.read_text().splitlines())}
+    assert records["fast"]["status"] == COMPLETED
+    assert records["fast"]["result"]["general_answer"] == "FAST"
+    assert records["slow"]["status"] == TIMED_OUT
+    assert summary["statuses"] == {COMPLETED: 1, TIMED_OUT: 1}
+    assert elapsed < 1.2
+
+    # The abandoned run is stopped before its next node
+    time.sleep(1.5)
+    assert finished_nodes == ["fast"]
+
+
+def test_abandoned_run_keeps_its_concurrency_slot(tmp_path, monkeypatch):
+    events = []
+    monkeypatch.setattr(batch_runner, "get_app", lambda **kwargs: build_app({"slow"}, [], events))
+    input_path = tmp_path / "requests.jsonl"
+    output_path = tmp_path / "results.jsonl"
+    input_path.write_text("\n".join(json.dumps({"id": text, "user_input": text}) for text in ("slow", "fast")))
+
+    BatchRunner(concurrency=1, timeout=0.3, checkpointed=False).run(str(input_path), str(output_path))
+
+    # The next request only starts once the timed-out run has left its node
+    assert events == [("start", "slow"), ("end", "slow"), ("start", "fast"), ("end", "fast")]
@@ -0,0 +1,52 @@
+from agents.code_deduplication_agent import CodeDeduplicationAgent, canonical_code
+
+BASE = '''
+def calculate_risk_weight(rating, maturity):
+    """Looks up the risk weight."""
+    weights = {"AAA": 20, "AA": 20}
+    return weights.get(rating, 100)
+'''
+
+RENAMED = '''
+def calculate_risk_weight(r, m):
+    # Same lookup, other names
+    table = {"AAA": 20, "AA": 20}
+    return table.get(r, 100)
+'''
+
+
+def test_equivalent_candidates_are_collapsed():
+    different = BASE.replace("100", "150")
+
+    result = CodeDeduplicationAgent().deduplicate([BASE, RENAMED, different, BASE])
+
+    assert result["codes"] == [BASE, different]
+    assert result["multiplicity"] == [3, 1]
+
+
+def test_entry_point_and_free_names_keep_their_names():
+    canonical = canonical_code("import math\ndef calculate_risk_weight(x):\n    return math.floor(len(x))\n")
+
+    assert "def calculate_risk_weight(v0)" in canonical
+    assert "math.floor(len(v0))" in canonical
+
+
+def test_keywords_of_other_functions_are_not_renamed():
+    code = "def calculate_risk_weight(values, key):\n    return sorted(values, key=key)\n"
+
+    assert "sorted(v0, key=v1)" in canonical_code(code)
+
+
+def test_keywords_of_own_functions_follow_their_parameters():
+    first = "def helper(rate):\n    return rate\ndef calculate_risk_weight(x):\n    return helper(rate=x)\n"
+    second = "def convert(value):\n    return value\ndef calculate_risk_weight(y):\n    return convert(value=y)\n"
+
+    assert canonical_code(first) == canonical_code(second)
+
+
+def test_unparseable_candidates_are_only_grouped_when_identical():
+    broken = "def calculate_risk_weight(:\n"
+
+    result = CodeDeduplicationAgent().deduplicate([broken, broken + "\n", "def calculate_risk_weight(x:\n"])
+
+    assert result["multiplicity"] == [2, 1]
@@ -0,0 +1,159 @@
+from types import SimpleNamespace
+
+from langgraph.graph import END
+
+from agents.code_generation_agent import CodeGenerationAgent
+from graphs.code_generation_node import CodeGenerationNode
+from graphs.workflow import build_workflow, route_after_code_generation
+from prompts.code_repair_prompt import code_repair_prompt
+
+TESTS = [
+    "```python\ndef test_case_1():\n    assert calculate_risk_weight('A', 1) == 20\n```",
+    "def test_case_2():\n    assert calculate_risk_weight('B', 5) == 150\n",
+    "def test_case_3():\n    assert calculate_risk_weight('ZZZ', 1) == 'Invalid input value!'\n"
+]
+
+
+def report(code, results):
+    failures = [{"test": idx, "detail": f"assert {idx} == 20"} for idx, passed in enumerate(results) if not passed]
+    return {"code": code, "report": "1 failed", "failures": failures, "individual_test_results": results}
+
+
+FAILURE_REPORTS = {
+    "code_1": report("def calculate_risk_weight(r, m):\n    return 1\n", [False, False, False]),
+    "code_2": report("def calculate_risk_weight(r, m):\n    return 2\n", [True, True, False]),
+    "code_3": report("def calculate_risk_weight(r, m):\n    return 3\n", [True, False, False]),
+    "code_4": {"code": "", "report": "import failed", "failures": [], "individual_test_results": []}
+}
+
+
+class StubLLM:
+    def __init__(self, replies=None):
+        self.replies = replies
+        self.prompts = []
+
+    def batch(self, prompts, config=None, return_exceptions=False):
+        self.prompts.append(list(prompts))
+        if self.replies is not None:
+            return self.replies[:len(prompts)]
+        return [SimpleNamespace(content=f"fixed {idx}", usage_metadata={"total_tokens": 100}) for idx in range(len(prompts))]
+
+
+def build_agent(llm):
+    agent = object.__new__(CodeGenerationAgent)
+    agent.llm = llm
+    agent.max_concurrency = 1
+    return agent
+
+
+def repair_prompt(entry):
+    return code_repair_prompt.format(
+        regulatory_text="text",
+        assumptions="assumptions",
+        input_variables="rating, maturity",
+        code=entry["code"],
+        failing_tests=build_agent(None)._describe_failures(entry, TESTS)
+    )
+
+
+def repair(agent, **kwargs):
+    return agent.repair_code_variants("text", "assumptions", "rating, maturity", FAILURE_REPORTS, TESTS, **kwargs)
+
+
+def test_failures_show_test_source_and_observed_result():
+    description = build_agent(None)._describe_failures(FAILURE_REPORTS["code_3"], TESTS)
+
+    assert "```python\ndef test_case_2():" in description
+    assert "Observed: assert 1 == 20" in description
+    assert "test_case_1" not in description
+    assert description.count("```python") == 2
+
+
+def test_failures_are_limited_and_fall_back_to_the_report():
+    agent = build_agent(None)
+
+    assert agent._describe_failures(FAILURE_REPORTS["code_1"], TESTS, max_tests=1).count("Observed:") == 1
+    assert "Observed: assert 0 == 20" in agent._describe_failures(FAILURE_REPORTS["code_1"], [])
+    assert "test_case_1" in agent._describe_failures(FAILURE_REPORTS["code_1"], [])
+    assert agent._describe_failures(FAILURE_REPORTS["code_4"], TESTS) == "```\nimport failed\n```"
+
+
+def test_candidates_are_repaired_by_pass_ratio():
+    llm = StubLLM()
+
+    repaired, tokens = repair(build_agent(llm), num_candidates=2)
+
+    assert llm.prompts == [[repair_prompt(FAILURE_REPORTS["code_2"]), repair_prompt(FAILURE_REPORTS["code_3"])]]
+    assert [response.content for response in repaired] == ["fixed 0", "fixed 1"]
+    assert tokens == 200
+
+
+def test_token_budget_uses_four_characters_per_token():
+    entries = [FAILURE_REPORTS["code_2"], FAILURE_REPORTS["code_3"]]
+    estimates = [(len(repair_prompt(entry)) + len(entry["code"])) // 4 for entry in entries]
+    llm = StubLLM()
+
+    repair(build_agent(llm), token_budget=sum(estimates) - 1)
+    repair(build_agent(llm), token_budget=sum(estimates))
+
+    assert [len(prompts) for prompts in llm.prompts] == [1, 2]
+
+
+def test_nothing_is_called_when_no_repair_fits_the_budget():
+    llm = StubLLM()
+
+    assert repair(build_agent(llm), token_budget=10) == ([], 0)
+    assert llm.prompts == []
+
+
+def test_tokens_are_estimated_without_usage_and_failed_repairs_are_dropped():
+    llm = StubLLM([SimpleNamespace(content="x" * 40), RuntimeError("rate limited")])
+
+    repaired, tokens = repair(build_agent(llm), num_candidates=2)
+
+    assert [response.content for response in repaired] == ["x" * 40]
+    assert tokens == (len(llm.prompts[0][0]) + 40) // 4
+
+
+def test_exhausted_budget_is_recorded_as_spent():
+    node = object.__new__(CodeGenerationNode)
+    node.agent = build_agent(StubLLM())
+    node.repair, node.repair_candidates, node.repair_token_budget = True, 3, 1000
+    state = {
+        "regenerate_code": True,
+        "regeneration_round": 1,
+        "repair_tokens_used": 990,
+        "regeneration_input": {"failure_reports": FAILURE_REPORTS, "test_cases": TESTS}
+    }
+
+    result = node.invoke(state)
+
+    assert result == {"generated_codes": [], "regeneration_round": 2, "repair_tokens_used": 1000}
+
+
+def test_regenerated_codes_skip_test_generation_once_tests_exist():
+    assert route_after_code_generation({}) == "test_generation"
+    assert route_after_code_generation({"selected_valid_test": "def test_a(): ..."}) == "execution_filtering"
+
+
+def route(workflow, node, state):
+    (branch,) = workflow.branches[node].values()
+    return branch.ends[branch.path.invoke(state)]
+
+
+def test_filtering_routes_to_repair_until_rounds_or_budget_run_out():
+    workflow = build_workflow(max_regeneration_rounds=2, repair_token_budget=1000)
+
+    assert route(workflow, "execution_filtering", {"regenerate_code": False}) == "execution_filtering_all"
+    assert route(workflow, "execution_filtering_all", {"regenerate_code": False}) == "scoring_node"
+    assert route(workflow, "execution_filtering", {"regenerate_code": True, "regeneration_round": 1}) == "code_generation_node"
+    assert route(workflow, "execution_filtering", {"regenerate_code": True, "regeneration_round": 2}) == END
+    assert route(workflow, "execution_filtering_all", {"regenerate_code": True, "repair_tokens_used": 1000}) == END
+
+
+def test_unlimited_budget_and_streaming_routes():
+    workflow = build_workflow(streaming=True, max_regeneration_rounds=3)
+    state = {"regenerate_code": True, "regeneration_round": 2, "repair_tokens_used": 10 ** 9}
+
+    assert route(workflow, "streaming_generation", state) == "streaming_generation"
+    assert route(workflow, "streaming_generation", {"regenerate_code": False}) == "execution_filtering_all"
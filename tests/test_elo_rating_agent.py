@@ -0,0 +1,69 @@
+import numpy as np
+
+import agents.elo_rating_agent as elo_rating_agent
+from agents.elo_rating_agent import EloRatingAgent
+
+LOGITS = {"a": {"b": 4.0, "c": 6.0}, "b": {"a": -4.0, "c": 2.0}, "c": {"a": -6.0, "b": -2.0}}
+PROBABILITIES = {
+    first: {second: 1.0 / (1.0 + np.exp(-logit)) for second, logit in row.items()} for first, row in LOGITS.items()
+}
+
+
+class Identity:
+    pass
+
+
+class Sigmoid:
+    pass
+
+
+class FakeCrossEncoder:
+    def __init__(self, scores, activation=None):
+        self.scores = scores
+        if activation is not None:
+            self.activation_fct = activation
+
+    def predict(self, pairs, batch_size=32):
+        return [self.scores[first][second] for first, second in pairs]
+
+
+def build_agent(monkeypatch, scores, activation=None, **kwargs):
+    model = FakeCrossEncoder(scores, activation)
+    monkeypatch.setattr(elo_rating_agent, "get_cross_encoder", lambda model_name: model)
+    return EloRatingAgent(**kwargs)
+
+
+def test_output_mode_follows_the_model_activation(monkeypatch):
+    assert build_agent(monkeypatch, LOGITS, Identity()).logits is True
+    assert build_agent(monkeypatch, LOGITS, Sigmoid()).logits is False
+    assert build_agent(monkeypatch, LOGITS).logits is False
+    assert build_agent(monkeypatch, LOGITS, Sigmoid(), logits=True).logits is True
+
+
+def test_logit_mode_maps_scores_through_a_sigmoid(monkeypatch):
+    from_logits = build_agent(monkeypatch, LOGITS, logits=True).compute_elo_scores(["a", "b", "c"])
+    from_probabilities = build_agent(monkeypatch, PROBABILITIES, logits=False).compute_elo_scores(["a", "b", "c"])
+
+    assert from_logits[0] > from_logits[1] > from_logits[2]
+    assert np.allclose(from_logits, from_probabilities)
+
+
+def test_mode_does_not_depend_on_the_batch_range(monkeypatch):
+    # Logits that happen to lie in [0, 1] are still logits; probabilities are never squashed again
+    in_range = np.array([0.6, 0.4])
+
+    as_logits = build_agent(monkeypatch, LOGITS, logits=True)._to_probabilities(in_range)
+    as_probabilities = build_agent(monkeypatch, LOGITS, logits=False)._to_probabilities(in_range)
+
+    assert np.allclose(as_logits, 1.0 / (1.0 + np.exp(-in_range)))
+    assert np.allclose(as_probabilities, in_range)
+
+
+def test_certain_preferences_stay_finite(monkeypatch):
+    scores = {"a": {"b": 1.0}, "b": {"a": 0.0}}
+
+    ratings = build_agent(monkeypatch, scores, logits=False).compute_elo_scores(["a", "b"])
+
+    assert all(np.isfinite(ratings))
+    assert ratings[0] > ratings[1]
+    assert np.isclose(np.mean(ratings), 1000.0)
@@ -0,0 +1,54 @@
+import numpy as np
+
+from app.services.embedding_store import EmbeddingStore, cosine_similarity_matrix
+
+
+class FakeModel:
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts, convert_to_numpy=True):
+        self.batches.append(list(texts))
+        return np.array([[len(text), text.count("return"), 1.0] for text in texts])
+
+
+CODES = ["def f(x):\n    return x\n", "def g(x):\n    return 2 * x\n"]
+
+
+def test_only_unseen_codes_are_encoded_once_per_batch():
+    store, model = EmbeddingStore(), FakeModel()
+
+    first = store.embed(CODES + [CODES[0]], model, "model")
+    second = store.embed(["```python\n" + CODES[1] + "\n```", "def h():\n    pass\n"], model, "model")
+
+    assert len(model.batches) == 2
+    assert len(model.batches[0]) == 2 and len(model.batches[1]) == 1
+    assert first.dtype == np.float32 and first.shape == (3, 3)
+    assert np.array_equal(first[0], first[2])
+    assert np.array_equal(second[0], first[1])
+
+
+def test_embeddings_are_keyed_by_model():
+    store, model = EmbeddingStore(), FakeModel()
+
+    store.embed(CODES, model, "model-a")
+    store.embed(CODES, model, "model-b")
+
+    assert len(model.batches) == 2
+
+
+def test_embeddings_persist_on_disk(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite")
+    expected = EmbeddingStore(path=path).embed(CODES, FakeModel(), "model")
+
+    model = FakeModel()
+    loaded = EmbeddingStore(path=path).embed(CODES, model, "model")
+
+    assert model.batches == []
+    assert np.array_equal(loaded, expected)
+
+
+def test_cosine_similarity_handles_zero_vectors():
+    similarities = cosine_similarity_matrix(np.array([[1.0, 0.0], [2.0, 0.0], [0.0, 0.0]]))
+
+    assert np.allclose(similarities[0], [1.0, 1.0, 0.0])
@@ -0,0 +1,74 @@
+from agents.execution_testing_agent import ExecutionTestingAgent
+from app.services.execution_cache import ExecutionCache
+from app.services.execution_matrix import ExecutionMatrix
+
+CODE = "def calculate_risk_weight(x):\n    return x\n"
+TESTS = [
+    "def test_one():\n    assert calculate_risk_weight(1) == 1\n",
+    "def test_two():\n    assert calculate_risk_weight(2) == 3\n"
+]
+
+
+def test_key_ignores_formatting_and_test_names():
+    key = ExecutionCache.key(CODE, TESTS[0])
+
+    assert ExecutionCache.key(f"```python\n{CODE}\n\n```", TESTS[0].replace("test_one", "test_case_7")) == key
+    assert ExecutionCache.key(CODE, TESTS[1]) != key
+    assert ExecutionCache.key(CODE.replace("return x", "return -x"), TESTS[0]) != key
+
+
+def test_memory_entries_are_bounded_least_recently_used():
+    cache = ExecutionCache(max_entries=2)
+    cache.put("a", {"passed": True, "detail": ""})
+    cache.put("b", {"passed": True, "detail": ""})
+    cache.get("a")
+    cache.put("c", {"passed": False, "detail": "boom"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"passed": True, "detail": ""}
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_outcomes_persist_on_disk(tmp_path):
+    path = str(tmp_path / "outcomes.sqlite")
+    ExecutionCache(path=path).put("a", {"passed": False, "detail": "boom"})
+
+    assert ExecutionCache(path=path).get("a") == {"passed": False, "detail": "boom"}
+
+
+def test_identical_pairs_execute_once(counting_engine):
+    agent = ExecutionTestingAgent(engine=counting_engine, cache=ExecutionCache())
+
+    first, _ = agent.run_tests([CODE], TESTS)
+    second, _ = agent.run_tests([f"```python\n{CODE}```"], list(reversed(TESTS)))
+
+    assert len(counting_engine.sources) == 1
+    assert first["code_1"]["individual_test_results"] == [True, False]
+    assert second["code_1"]["individual_test_results"] == [False, True]
+
+
+class CrashingOnceEngine:
+    def __init__(self):
+        self.calls = 0
+
+    def run(self, sources, fail_fast=False):
+        self.calls += 1
+        if self.calls == 1:
+            return [{"outcomes": [], "error": "Worker crashed (exit code -9)", "timed_out": False, "unsupported": False}]
+        outcomes = [{"name": f"test_case_{j + 1}", "passed": True, "detail": ""} for j in range(len(TESTS))]
+        return [{"outcomes": outcomes, "error": None, "timed_out": False, "unsupported": False}]
+
+
+def test_infrastructure_failures_are_not_cached():
+    cache = ExecutionCache()
+    agent = ExecutionTestingAgent(engine=CrashingOnceEngine(), cache=cache)
+    matrix = ExecutionMatrix()
+
+    crashed, _ = agent.run_tests([CODE], TESTS, matrix=matrix)
+    retried, passed = agent.run_tests([CODE], TESTS, matrix=matrix)
+
+    assert crashed["code_1"]["individual_test_results"] == [False, False]
+    assert "Worker crashed" in crashed["code_1"]["report"]
+    assert agent.engine.calls == 2
+    assert retried["code_1"]["individual_test_results"] == [True, True]
+    assert passed == [CODE.strip()]
@@ -0,0 +1,97 @@
+import threading
+
+import pytest
+
+from app.services.execution_engine import ExecutionEngine, format_report
+
+CODE = "def calculate_risk_weight(x):\n    return x\n\n"
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = ExecutionEngine(processes=2, timeout=1)
+    yield engine
+    engine.shutdown()
+
+
+def test_reports_pass_and_fail_per_test(engine):
+    source = CODE + (
+        "def test_case_1():\n    assert calculate_risk_weight(1) == 1\n\n"
+        "def test_case_2():\n    assert calculate_risk_weight(2) == 3\n"
+    )
+    [result] = engine.run([source])
+
+    assert result["error"] is None
+    assert [o["passed"] for o in result["outcomes"]] == [True, False]
+
+
+def test_failed_assert_shows_observed_values(engine):
+    source = CODE + (
+        "def test_case_1():\n"
+        "    result = calculate_risk_weight(0.5)\n"
+        "    expected_output = 1.0\n"
+        "    assert result == expected_output\n"
+    )
+    [result] = engine.run([source])
+
+    detail = result["outcomes"][0]["detail"]
+    assert "assert 0.5 == 1.0" in detail
+    assert "result == expected_output" in detail
+    assert "assert 0.5 == 1.0" in format_report(result["outcomes"])
+
+
+def test_fail_fast_stops_at_first_failure(engine):
+    source = CODE + "".join(f"def test_case_{i}():\n    assert calculate_risk_weight({i}) == 2\n\n" for i in (1, 2, 3))
+    [result] = engine.run([source], fail_fast=True)
+
+    assert [o["name"] for o in result["outcomes"]] == ["test_case_1"]
+
+
+def test_syntax_error_is_an_error_not_a_timeout(engine):
+    [result] = engine.run(["def broken(:\n"])
+
+    assert result["error"].startswith("SyntaxError")
+    assert result["timed_out"] is False
+
+
+def test_fixtures_are_unsupported(engine):
+    [result] = engine.run([CODE + "def test_case_1(tmp_path):\n    assert True\n"])
+
+    assert result["unsupported"] is True
+
+
+def test_crashed_worker_is_reported_and_replaced(engine):
+    [crashed] = engine.run([CODE + "import os\n\ndef test_case_1():\n    os._exit(3)\n"])
+    assert crashed["timed_out"] is False
+    assert "exit code 3" in crashed["error"]
+
+    results = engine.run([CODE + "def test_case_1():\n    assert True\n"] * 4)
+    assert all(r["outcomes"][0]["passed"] for r in results)
+
+
+def test_stuck_candidate_does_not_affect_concurrent_callers(engine):
+    # Swallows the worker's own timeout, so only the parent can stop it
+    stuck = (
+        "import time\n\ndef test_case_1():\n"
+        "    while True:\n        try:\n            time.sleep(10)\n        except BaseException:\n            pass\n"
+    )
+    passing = CODE + "def test_case_1():\n    assert calculate_risk_weight(1) == 1\n"
+    stuck_result = {}
+    thread = threading.Thread(target=lambda: stuck_result.update(result=engine.run([stuck])[0]))
+    thread.start()
+    results = engine.run([passing] * 20)
+    thread.join()
+
+    assert all(r["outcomes"] and r["outcomes"][0]["passed"] for r in results)
+    assert stuck_result["result"]["timed_out"] is True
+
+
+def test_format_report_counts_skipped_tests():
+    outcomes = [
+        {"name": "test_case_1", "passed": False, "detail": "AssertionError: assert 1 == 2"},
+        {"name": "test_case_2", "passed": False, "detail": "Not run (fail-fast)", "skipped": True}
+    ]
+    report = format_report(outcomes)
+
+    assert report.splitlines()[0] == "Fs"
+    assert report.splitlines()[-1] == "1 failed, 1 skipped"
@@ -0,0 +1,55 @@
+from agents.execution_testing_agent import ExecutionTestingAgent
+from app.services.execution_matrix import ExecutionMatrix
+
+CODE = "def calculate_risk_weight(x):\n    return x\n"
+PASSING = "def test_passing():\n    assert calculate_risk_weight(1) == 1\n"
+FAILING = "def test_failing():\n    assert calculate_risk_weight(2) == 3\n"
+ALSO_PASSING = "def test_also_passing():\n    assert calculate_risk_weight(4) == 4\n"
+
+
+def test_failure_rate_is_smoothed_and_orders_tests():
+    matrix = ExecutionMatrix()
+    passing, failing, unknown = (ExecutionMatrix.test_key(test) for test in (PASSING, FAILING, ALSO_PASSING))
+    for code in ("a", "b"):
+        matrix.put(code, passing, {"passed": True, "detail": ""})
+        matrix.put(code, failing, {"passed": False, "detail": "boom"})
+
+    assert matrix.failure_rate(passing) == 0.25
+    assert matrix.failure_rate(failing) == 0.75
+    assert matrix.failure_rate(unknown) == 0.5
+    assert matrix.order_tests([passing, unknown, failing]) == [2, 1, 0]
+
+
+def test_state_data_is_copied():
+    data = {"code": {"test": {"passed": True, "detail": ""}}}
+
+    ExecutionMatrix(data).put("code", "other", {"passed": False, "detail": ""})
+
+    assert data == {"code": {"test": {"passed": True, "detail": ""}}}
+
+
+def test_second_phase_only_runs_new_pairs(counting_engine):
+    agent = ExecutionTestingAgent(engine=counting_engine, use_cache=False)
+    matrix = ExecutionMatrix()
+
+    agent.run_tests([CODE], [PASSING], matrix=matrix)
+    results, passed = agent.run_tests([CODE], [PASSING, ALSO_PASSING], matrix=matrix)
+
+    assert passed == [CODE.strip()]
+    assert len(counting_engine.sources) == 2
+    assert "calculate_risk_weight(1)" not in counting_engine.sources[1] and "calculate_risk_weight(4)" in counting_engine.sources[1]
+    assert results["code_1"]["individual_test_results"] == [True, True]
+
+
+def test_fail_fast_runs_known_failures_first(counting_engine):
+    agent = ExecutionTestingAgent(engine=counting_engine, use_cache=False)
+    matrix = ExecutionMatrix()
+    matrix.put("earlier code", ExecutionMatrix.test_key(FAILING), {"passed": False, "detail": "boom"})
+
+    results, passed = agent.run_tests([CODE], [PASSING, ALSO_PASSING, FAILING], matrix=matrix, fail_fast=True)
+
+    assert passed == []
+    assert results["code_1"]["individual_test_results"] == [False, False, False]
+    assert "1 failed, 2 skipped" in results["code_1"]["report"]
+    assert [failure["test"] for failure in results["code_1"]["failures"]] == [2]
+    assert counting_engine.sources[0].index("calculate_risk_weight(2)") < counting_engine.sources[0].index("calculate_risk_weight(1)")
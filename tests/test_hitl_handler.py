@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, StateGraph
+from langgraph.types import interrupt
+
+import app.services.hitl_handler as hitl_handler
+from app.services.hitl_handler import HITLHandler
+
+VALID_TESTS = ["def test_a(): ...", "def test_b(): ..."]
+INVALID_TESTS = ["def test_c(): ..."]
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    def select(state):
+        return {"selection": interrupt({"valid_tests": VALID_TESTS, "invalid_tests": INVALID_TESTS})}
+
+    workflow = StateGraph(dict)
+    workflow.add_node("select", select)
+    workflow.set_entry_point("select")
+    workflow.add_edge("select", END)
+    app = workflow.compile(checkpointer=MemorySaver())
+
+    monkeypatch.setattr(hitl_handler, "get_app", lambda **kwargs: app)
+    monkeypatch.setattr(hitl_handler, "get_run_app", lambda thread_id: app)
+    monkeypatch.setattr(hitl_handler, "run_config", lambda thread_id, **kwargs: {"configurable": {"thread_id": thread_id}})
+    monkeypatch.setattr(hitl_handler, "auto_select_tests", lambda valid, invalid: {"valid_index": 1, "invalid_index": 0})
+    return app
+
+
+def test_run_pauses_and_resumes_with_selection(graph):
+    handler = HITLHandler(timeout_seconds=None)
+    nodes = []
+
+    paused = handler.start_run("request", thread_id="run-1")
+
+    assert paused["status"] == "awaiting_selection"
+    assert paused["valid_tests"] == VALID_TESTS
+    assert [pending["thread_id"] for pending in handler.pending_runs()] == ["run-1"]
+
+    with pytest.raises(ValueError):
+        handler.submit_selection("run-1", 5, 0)
+
+    done = handler.submit_selection("run-1", 1, 0, on_node=nodes.append)
+
+    assert done["status"] == "completed"
+    assert done["state"]["selection"] == {"valid_index": 1, "invalid_index": 0, "source": "human"}
+    assert nodes == ["select"]
+    assert handler.pending_runs() == []
+
+
+def test_selection_is_accepted_once(graph):
+    handler = HITLHandler(timeout_seconds=None)
+    handler.start_run("request", thread_id="run-1")
+
+    handler.claim_selection("run-1", 0, 0)
+
+    with pytest.raises(KeyError):
+        handler.claim_selection("run-1", 0, 0)
+
+
+def test_timed_out_run_resumes_automatically(graph):
+    finished = threading.Event()
+    results = {}
+
+    def on_complete(thread_id, result):
+        results[thread_id] = result
+        finished.set()
+
+    handler = HITLHandler(timeout_seconds=60, on_complete=on_complete)
+    handler.start_run("request", thread_id="run-1")
+
+    assert handler.expire_pending() == []
+    assert handler.expire_pending(now=handler.get_pending("run-1")["deadline"]) == ["run-1"]
+    assert finished.wait(10)
+    assert results["run-1"]["state"]["selection"]["source"] == "automatic"
+    handler.shutdown()
+
+
+def test_timeout_hook_replaces_automatic_resume(graph):
+    expired = []
+    handler = HITLHandler(timeout_seconds=60, on_timeout=expired.append)
+    handler.start_run("request", thread_id="run-1")
+
+    handler.expire_pending(now=handler.get_pending("run-1")["deadline"])
+
+    assert [pending["thread_id"] for pending in expired] == ["run-1"]
+    assert handler.get_pending("run-1") is not None
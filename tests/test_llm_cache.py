@@ -0,0 +1,40 @@
+from langchain_core.outputs import Generation
+
+import app.services.llm_cache as llm_cache
+from app.services.llm_cache import SQLiteResponseCache, get_response_cache, response_cache_for
+
+
+def test_hit_after_update_and_expiry(tmp_path, monkeypatch):
+    cache = SQLiteResponseCache(path=str(tmp_path / "cache.sqlite"), ttl_seconds=60)
+    cache.update("prompt", "model=gpt-4o,temperature=0", [Generation(text="answer")])
+
+    assert cache.lookup("prompt", "model=gpt-4o,temperature=1") is None
+    assert cache.lookup("prompt", "model=gpt-4o,temperature=0")[0].text == "answer"
+
+    now = llm_cache.time.time()
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now + 61)
+    assert cache.lookup("prompt", "model=gpt-4o,temperature=0") is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "entries": 0}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = SQLiteResponseCache(path=str(tmp_path / "cache.sqlite"), max_entries=2)
+    for prompt in ("a", "b", "c"):
+        cache.update(prompt, "model", [Generation(text=prompt)])
+
+    assert cache.lookup("a", "model") is None
+    assert cache.stats()["entries"] == 2
+
+
+def test_configuration_from_environment(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "_cache", None)
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "cache.sqlite"))
+    monkeypatch.setenv("LLM_CACHE_TTL_SECONDS", "0")
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "1")
+
+    assert get_response_cache().ttl_seconds is None
+    assert response_cache_for(0.0) is get_response_cache()
+    assert response_cache_for(1.0) is False
+
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "0")
+    assert response_cache_for(0.0) is False
@@ -0,0 +1,51 @@
+import json
+from types import SimpleNamespace
+
+import scoring.strategies.llm_feedback as llm_feedback
+
+
+class FakeLLM:
+    def __init__(self, batch_reply, single_replies):
+        self.batch_reply = batch_reply
+        self.single_replies = list(single_replies)
+        self.invoked = []
+        self.batched = []
+
+    def invoke(self, prompt):
+        self.invoked.append(prompt)
+        return SimpleNamespace(content=self.batch_reply)
+
+    def batch(self, prompts, config=None, return_exceptions=False):
+        self.batched.append(prompts)
+        return [SimpleNamespace(content=self.single_replies.pop(0)) for _ in prompts]
+
+
+def build_strategy(monkeypatch, batch_reply, single_replies=()):
+    llm = FakeLLM(batch_reply, single_replies)
+    monkeypatch.setattr(llm_feedback, "ChatOpenAI", lambda **kwargs: llm)
+    monkeypatch.setattr(llm_feedback, "response_cache_for", lambda temperature: False)
+    return llm_feedback.LLMFeedbackScoringStrategy(), llm
+
+
+def test_all_candidates_are_rated_in_one_request(monkeypatch):
+    strategy, llm = build_strategy(monkeypatch, json.dumps({"code_1": 7, "code_2": 4, "code_3": 10}))
+
+    assert strategy.score(["a", "b", "c"]) == [0.7, 0.4, 1.0]
+    assert len(llm.invoked) == 1 and llm.batched == []
+    assert "### code_3:" in llm.invoked[0]
+
+
+def test_missing_and_unparseable_scores_fall_back_to_single_requests(monkeypatch):
+    strategy, llm = build_strategy(monkeypatch, json.dumps({"code_1": 7, "code_2": "n/a"}), ["6", "no idea", "12"])
+
+    scores = strategy.score(["a", "b", "c"])
+
+    # code_2 and code_3 are rated one by one, code_3 is retried once; scores are clipped to 1.0
+    assert scores == [0.7, 0.6, 1.0]
+    assert [len(prompts) for prompts in llm.batched] == [2, 1]
+
+
+def test_unreadable_batch_reply_rates_every_candidate(monkeypatch):
+    strategy, llm = build_strategy(monkeypatch, "I like them all", ["5", "3"])
+
+    assert strategy.score(["a", "b"]) == [0.5, 0.3]
@@ -0,0 +1,132 @@
+import json
+import threading
+import time
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+
+from app.services.metrics import MetricsSink, merge_metrics, record, record_cache_lookup, track_node
+
+
+def replies(*messages):
+    for message in messages:
+        if isinstance(message, Exception):
+            raise message
+        yield message
+
+
+def usage(prompt_tokens, completion_tokens, **extra):
+    return {"input_tokens": prompt_tokens, "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens, **extra}
+
+
+def test_counts_from_worker_threads_land_in_their_node():
+    barrier = threading.Barrier(2)
+
+    def node(name, subprocesses):
+        with track_node(name) as metrics:
+            with ContextThreadPoolExecutor(max_workers=subprocesses) as executor:
+                list(executor.map(lambda _: record(subprocesses=1), range(subprocesses)))
+            record_cache_lookup("execution", hit=True)
+            # Keep both nodes open at once
+            barrier.wait(timeout=5)
+        return metrics.as_dict()
+
+    with ContextThreadPoolExecutor(max_workers=2) as executor:
+        first, second = executor.map(node, ["first", "second"], [3, 5])
+
+    assert (first["node"], first["subprocesses"]) == ("first", 3)
+    assert (second["node"], second["subprocesses"]) == ("second", 5)
+    assert first["caches"] == {"execution": {"hits": 1, "misses": 0}}
+
+
+def test_chat_model_calls_are_counted_with_their_tokens():
+    model = GenericFakeChatModel(messages=replies(
+        AIMessage(content="a", usage_metadata=usage(10, 3)),
+        AIMessage(content="b", usage_metadata=usage(7, 2, total_cost=0)),
+        RuntimeError("rate limited")
+    ))
+
+    with track_node("code_generation") as metrics:
+        model.invoke("first")
+        model.invoke("cached")
+        try:
+            model.invoke("failing")
+        except RuntimeError:
+            pass
+
+    counters = metrics.as_dict()
+    assert (counters["llm_calls"], counters["llm_cached_calls"], counters["llm_errors"]) == (3, 1, 1)
+    # Cached responses cost no tokens
+    assert (counters["prompt_tokens"], counters["completion_tokens"]) == (10, 3)
+
+
+def test_queue_time_is_measured_from_the_previous_node():
+    previous = {"nodes": [{"ended_at": time.time() - 2.0}]}
+
+    with track_node("next", previous=previous) as metrics:
+        pass
+
+    assert 2.0 <= metrics.counters["queue_seconds"] < 3.0
+
+
+def test_merging_appends_node_records_and_recomputes_totals():
+    with track_node("quality") as quality:
+        record(model_calls=2)
+        record_cache_lookup("embeddings", hit=False)
+    with track_node("similarity") as similarity:
+        record(model_calls=1)
+        record_cache_lookup("embeddings", hit=True)
+
+    # Concurrent branches each contribute an update; the reducer folds them into the run
+    merged = merge_metrics(merge_metrics(None, {"nodes": [quality.as_dict()]}), {"nodes": [similarity.as_dict()]})
+
+    assert [node["node"] for node in merged["nodes"]] == ["quality", "similarity"]
+    assert merged["totals"]["model_calls"] == 3
+    assert merged["totals"]["caches"] == {"embeddings": {"hits": 1, "misses": 1}}
+    assert merge_metrics(None, None)["totals"]["llm_calls"] == 0
+
+
+def run_metrics(node, llm_calls, cached_calls, prompt_tokens):
+    with track_node(node) as metrics:
+        metrics.add(llm_calls=llm_calls, llm_cached_calls=cached_calls, prompt_tokens=prompt_tokens)
+    return merge_metrics(None, {"nodes": [metrics.as_dict()]})
+
+
+def test_sink_writes_jsonl_and_prometheus_text(tmp_path):
+    jsonl_path, prometheus_path = tmp_path / "runs.jsonl", tmp_path / "metrics.prom"
+    sink = MetricsSink(jsonl_path=str(jsonl_path), prometheus_path=str(prometheus_path))
+
+    sink.record_run("run-1", run_metrics("code_generation", 3, 1, 100))
+    sink.record_run("run-2", run_metrics("code_generation", 2, 0, 50))
+    sink.record_run("run-3", None, status="failed")
+
+    records = [json.loads(line) for line in jsonl_path.read_text().splitlines()]
+    assert [(record["run_id"], record["status"]) for record in records] == [
+        ("run-1", "completed"), ("run-2", "completed"), ("run-3", "failed")
+    ]
+    assert records[0]["totals"]["llm_calls"] == 3
+    assert records[2]["nodes"] == []
+
+    text = prometheus_path.read_text()
+    assert text == sink.prometheus_text()
+    lines = text.splitlines()
+    assert "# TYPE codegen_runs_total counter" in lines
+    assert 'codegen_runs_total{status="completed"} 2' in lines
+    assert 'codegen_runs_total{status="failed"} 1' in lines
+    assert 'codegen_llm_calls_total{cached="false",node="code_generation"} 4' in lines
+    assert 'codegen_llm_calls_total{cached="true",node="code_generation"} 1' in lines
+    assert 'codegen_llm_tokens_total{node="code_generation",type="prompt"} 150' in lines
+    assert "# TYPE codegen_node_seconds summary" in lines
+    assert 'codegen_node_seconds_count{node="code_generation"} 2' in lines
+    # One TYPE line per metric family
+    assert len([line for line in lines if line.startswith("# TYPE")]) == len({line.split()[2] for line in lines if line.startswith("# TYPE")})
+
+
+def test_label_values_are_escaped():
+    sink = MetricsSink()
+
+    sink.record_run("run-1", run_metrics('node "a"\\b', 1, 0, 0))
+
+    assert 'codegen_llm_calls_total{cached="false",node="node \\"a\\"\\\\b"} 1' in sink.prometheus_text().splitlines()
@@ -0,0 +1,83 @@
+import threading
+
+from scoring.registry import ScoringStrategyRegistry
+from scoring.scheduler import CPU, MODEL, NETWORK, NEUTRAL_SCORE, ScoringScheduler
+
+
+def min_max(values):
+    low, high = min(values), max(values)
+    return [(value - low) / (high - low) if high > low else 0.0 for value in values]
+
+
+def build_registry(cpu_scores, model_scores, llm_calls, **kwargs):
+    registry = ScoringStrategyRegistry(
+        weights={}, disabled=[], top_k=1, scheduler=ScoringScheduler(default_timeout=5), **kwargs
+    )
+    for name in ("quality", "complexity", "test_coverage"):
+        registry.register(name, CPU, lambda codes, context: cpu_scores)
+    for name in ("similarity", "elo"):
+        registry.register(name, MODEL, lambda codes, context: model_scores)
+
+    def llm_feedback(codes, context):
+        llm_calls.append(codes)
+        return [1.0] * len(codes)
+
+    registry.register("llm_feedback", NETWORK, llm_feedback)
+    return registry
+
+
+def test_default_weights_run_cpu_and_model_tiers_together():
+    registry = build_registry([1, 0], [1, 0], [])
+
+    assert registry.stages() == [
+        ["quality", "complexity", "test_coverage", "similarity", "elo"],
+        ["llm_feedback"]
+    ]
+    assert build_registry([1, 0], [1, 0], [], early_termination=False).stages() == [
+        ["quality", "complexity", "test_coverage", "similarity", "elo", "llm_feedback"]
+    ]
+
+
+def test_network_tier_is_skipped_when_top_k_is_decided():
+    llm_calls = []
+    registry = build_registry([3, 1, 0], [2, 1, 0], llm_calls)
+
+    result = registry.run(["a", "b", "c"], min_max)
+
+    assert result["skipped"] == ["llm_feedback"]
+    assert result["normalized"]["llm_feedback"] == [NEUTRAL_SCORE] * 3
+    assert "llm_feedback" not in result["scores"]
+    assert llm_calls == []
+
+
+def test_network_tier_runs_when_the_lead_is_small():
+    llm_calls = []
+    registry = build_registry([3, 1, 0], [0, 1, 2], llm_calls)
+
+    result = registry.run(["a", "b", "c"], min_max)
+
+    assert result["skipped"] == []
+    assert len(llm_calls) == 1
+
+
+def test_strategies_of_a_stage_run_concurrently():
+    model_started = threading.Event()
+    registry = ScoringStrategyRegistry(
+        weights={"quality": 0.1, "similarity": 0.1}, disabled=[], scheduler=ScoringScheduler(default_timeout=2)
+    )
+
+    def cpu_strategy(codes, context):
+        # Only finishes if the model strategy is already in flight
+        assert model_started.wait(1)
+        return [1.0, 0.0]
+
+    def model_strategy(codes, context):
+        model_started.set()
+        return [1.0, 0.0]
+
+    registry.register("quality", CPU, cpu_strategy)
+    registry.register("similarity", MODEL, model_strategy)
+
+    result = registry.run(["a", "b"], min_max)
+
+    assert result["degraded"] == {}
@@ -0,0 +1,41 @@
+import time
+
+import pytest
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+
+import scoring.scheduler as scheduler
+from scoring.scheduler import MODEL, NETWORK, NEUTRAL_SCORE, ScoringScheduler
+
+
+@pytest.fixture
+def single_model_worker(monkeypatch):
+    executor = ContextThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(scheduler, "get_model_executor", lambda: executor)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def sleeping(seconds):
+    def score():
+        time.sleep(seconds)
+        return [1.0, 0.0]
+    return score
+
+
+def test_queued_strategy_is_timed_from_its_start(single_model_worker):
+    # "fast" waits behind "slow" on the only model worker for longer than its own timeout
+    strategies = {"slow": (MODEL, sleeping(0.5)), "fast": (MODEL, sleeping(0.05))}
+
+    scores, degraded = ScoringScheduler(timeouts={"fast": 0.3}, default_timeout=2).run(strategies, 2)
+
+    assert degraded == {}
+    assert scores == {"slow": [1.0, 0.0], "fast": [1.0, 0.0]}
+
+
+def test_running_strategy_still_times_out(single_model_worker):
+    strategies = {"slow": (MODEL, sleeping(0.5)), "network": (NETWORK, sleeping(0.5))}
+
+    scores, degraded = ScoringScheduler(default_timeout=0.2).run(strategies, 2)
+
+    assert set(degraded) == {"slow", "network"}
+    assert scores["slow"] == [NEUTRAL_SCORE] * 2
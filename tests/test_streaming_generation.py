@@ -0,0 +1,125 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from agents.code_deduplication_agent import CodeDeduplicationAgent
+from agents.code_generation_agent import CodeGenerationAgent
+from agents.execution_testing_agent import ExecutionTestingAgent
+from app.services.execution_cache import ExecutionCache
+from graphs.streaming_generation_node import StreamingGenerationNode
+
+PASSING = [
+    "def calculate_risk_weight(x):\n    return x\n",
+    "def calculate_risk_weight(x):\n    return x * 1\n",
+    "def calculate_risk_weight(x):\n    return 0 + x\n"
+]
+FAILING = [
+    "def calculate_risk_weight(x):\n    return -x\n",
+    "def calculate_risk_weight(x):\n    return x + 1\n"
+]
+STATE = {
+    "selected_valid_test": "def test_valid():\n    assert calculate_risk_weight(2) == 2\n",
+    "selected_invalid_test": "def test_invalid():\n    assert calculate_risk_weight(3) == 3\n"
+}
+
+
+class StubLLM:
+    """
+    Answers the n-th call with the n-th reply after `delay` seconds; replies that are exceptions are raised.
+    """
+    def __init__(self, replies, delay=0.0):
+        self.replies = list(replies)
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt):
+        with self._lock:
+            reply = self.replies[self.calls % len(self.replies)]
+            self.calls += 1
+        time.sleep(self.delay)
+        if isinstance(reply, Exception):
+            raise reply
+        return SimpleNamespace(content=f"```python\n{reply}```")
+
+
+def build_generation_agent(llm):
+    agent = object.__new__(CodeGenerationAgent)
+    agent.llm = llm
+    agent.max_concurrency = 1
+    return agent
+
+
+@pytest.fixture
+def build_node(counting_engine):
+    def build(llm, num_variants, target_passing):
+        node = object.__new__(StreamingGenerationNode)
+        node.generation_agent = build_generation_agent(llm)
+        node.execution_agent = ExecutionTestingAgent(engine=counting_engine, cache=ExecutionCache())
+        node.dedup_agent = CodeDeduplicationAgent()
+        # One call in flight keeps the arrival order deterministic
+        node.num_variants, node.target_passing, node.max_in_flight = num_variants, target_passing, 1
+        node.repair, node.repair_candidates, node.repair_token_budget = False, 3, None
+        return node
+    return build
+
+
+def test_stream_skips_failed_generations():
+    llm = StubLLM([PASSING[0], RuntimeError("rate limited"), PASSING[1]])
+
+    variants = list(build_generation_agent(llm).stream_code_variants("text", "assumptions", "x", num_variants=3))
+
+    assert [idx for idx, _ in variants] == [0, 2]
+    assert llm.calls == 3
+
+
+def test_closing_the_stream_cancels_pending_generations():
+    llm = StubLLM(PASSING, delay=0.1)
+    stream = build_generation_agent(llm).stream_code_variants("text", "assumptions", "x", num_variants=10)
+
+    next(stream)
+    stream.close()
+
+    # At most the call already running on the single worker completes
+    assert llm.calls <= 2
+
+
+def test_generation_stops_once_target_passing_is_reached(build_node):
+    llm = StubLLM(FAILING[:1] + PASSING, delay=0.1)
+
+    result = build_node(llm, num_variants=10, target_passing=2).invoke(STATE)
+
+    assert len(result["generated_codes"]) == 3
+    assert list(result["execution_report"]) == ["code_1", "code_2", "code_3"]
+    assert len(result["filtered_codes"]) == 2
+    assert result["regenerate_code"] is False
+    assert llm.calls < 10
+
+
+def test_all_variants_are_tested_when_the_target_is_never_reached(build_node, counting_engine):
+    llm = StubLLM(FAILING)
+
+    result = build_node(llm, num_variants=4, target_passing=2).invoke(STATE)
+
+    assert llm.calls == 4
+    assert len(result["generated_codes"]) == 4
+    # Repeated variants are counted, not executed again
+    assert list(result["execution_report"]) == ["code_1", "code_2"]
+    assert len(counting_engine.sources) == 2
+    assert sorted(result["code_multiplicity"].values()) == [2, 2]
+    assert result["filtered_codes"] == []
+    assert result["regenerate_code"] is True
+    assert result["regeneration_input"]["failure_reports"] == result["execution_report"]
+
+
+def test_failed_generation_does_not_stop_the_stream(build_node):
+    llm = StubLLM([RuntimeError("rate limited"), PASSING[0], FAILING[0]])
+
+    result = build_node(llm, num_variants=3, target_passing=3).invoke(STATE)
+
+    assert list(result["execution_report"]) == ["code_2", "code_3"]
+    assert len(result["generated_codes"]) == 2
+    assert len(result["filtered_codes"]) == 1
+    assert result["regenerate_code"] is False
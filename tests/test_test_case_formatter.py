@@ -0,0 +1,119 @@
+from types import SimpleNamespace
+
+from agents import test_case_formatter_agent
+from agents.test_case_formatter_agent import (
+    INVALID_OUTPUT,
+    parse_input_variable_names,
+    parse_test_case,
+    render_pytest_function
+)
+
+
+def test_parses_inputs_in_declared_order():
+    raw = "maturity = 3\nrating = \"AAA\"\n<riskweight>20</riskweight>"
+
+    inputs, expected = parse_test_case(raw, "rating, maturity")
+
+    assert list(inputs.items()) == [("rating", "AAA"), ("maturity", 3)]
+    assert expected == 20
+
+
+def test_rejects_case_missing_a_declared_input():
+    raw = "rating = \"AAA\"\n<riskweight>20</riskweight>"
+
+    assert parse_test_case(raw, "rating, maturity") is None
+
+
+def test_keywords_in_description_are_not_inputs():
+    assert parse_input_variable_names("rating and maturity") == ["rating", "maturity"]
+    assert parse_test_case("rating = 'A'\nmaturity = 1\n<riskweight>50</riskweight>", "rating and maturity")
+
+
+def test_unparseable_input_falls_back():
+    raw = "rating = AAA rated bond\nmaturity = 1\n<riskweight>20</riskweight>"
+
+    assert parse_test_case(raw, "rating, maturity") is None
+
+
+def test_conflicting_or_missing_expectation_falls_back():
+    assert parse_test_case("rating = 'A'\n<riskweight>20</riskweight><riskweight>50</riskweight>", "rating") is None
+    assert parse_test_case("rating = 'A'", "rating") is None
+
+
+def test_invalid_expectation_and_percentages():
+    assert parse_test_case("rating = 'X'\n<riskweight>Invalid input</riskweight>", "rating")[1] == INVALID_OUTPUT
+    assert parse_test_case("rating = 'A'\n<riskweight>50%</riskweight>", "rating")[1] == 50
+
+
+def test_without_declaration_result_names_are_not_inputs():
+    inputs, _ = parse_test_case("rating = 'A'\nexpected_riskweight = 50\n<riskweight>50</riskweight>")
+
+    assert inputs == {"rating": "A"}
+
+
+def test_rendered_function_calls_with_all_inputs():
+    source = render_pytest_function({"rating": "A", "maturity": 2}, 50, 3)
+    namespace = {"calculate_risk_weight": lambda rating, maturity: 50}
+    exec(source, namespace)
+
+    assert "calculate_risk_weight(rating, maturity)" in source
+    namespace["test_case_3"]()
+
+
+def build_formatter(llm):
+    agent = object.__new__(test_case_formatter_agent.TestCaseFormatterAgent)
+    agent.llm = llm
+    return agent
+
+
+PROSE_INPUTS = "The external credit rating of the exposure (e.g. AAA) and its residual maturity in years"
+
+
+def test_structured_and_prose_descriptions():
+    assert parse_input_variable_names("rating; maturity") == ["rating", "maturity"]
+    assert parse_input_variable_names("- rating\n- maturity") == ["rating", "maturity"]
+    assert parse_input_variable_names(PROSE_INPUTS) == []
+
+
+def test_prose_description_parses_locally_in_mention_order():
+    raw = "maturity = 3\nrating = \"AAA\"\n<riskweight>20</riskweight>"
+
+    inputs, expected = parse_test_case(raw, PROSE_INPUTS)
+
+    assert list(inputs.items()) == [("rating", "AAA"), ("maturity", 3)]
+    assert expected == 20
+
+
+def test_prose_description_rejects_unmentioned_inputs():
+    raw = "rating = \"AAA\"\ncountry = \"DE\"\n<riskweight>20</riskweight>"
+
+    assert parse_test_case(raw, PROSE_INPUTS) is None
+
+
+def test_formatter_needs_no_llm_for_prose_descriptions():
+    agent = build_formatter(llm=None)  # any LLM call would fail
+    raw_cases = [
+        "rating = \"AAA\"\nmaturity = 3\n<riskweight>20</riskweight>",
+        "rating = \"BB\"\nmaturity = 1\n<riskweight>100</riskweight>"
+    ]
+
+    formatted = agent.format_test_cases(raw_cases, PROSE_INPUTS)
+
+    assert all("calculate_risk_weight(rating, maturity)" in test for test in formatted)
+
+
+def test_prose_cases_with_another_signature_go_to_the_llm():
+    class FakeLLM:
+        def batch(self, prompts):
+            return [SimpleNamespace(content="def test_case_3(): ...") for _ in prompts]
+
+    agent = build_formatter(llm=FakeLLM())
+    raw_cases = [
+        "rating = \"AAA\"\nmaturity = 3\n<riskweight>20</riskweight>",
+        "rating = \"BB\"\nmaturity = 1\n<riskweight>100</riskweight>",
+        "rating = \"A\"\n<riskweight>50</riskweight>"
+    ]
+
+    formatted = agent.format_test_cases(raw_cases, PROSE_INPUTS)
+
+    assert formatted[2] == "def test_case_3(): ..."
@@ -0,0 +1,23 @@
+from app.services.execution_matrix import ExecutionMatrix
+from scoring.strategies import test_coverage
+
+FIRST = "def calculate_risk_weight(rating):\n    return 20\n"
+SECOND = "def calculate_risk_weight(rating):\n    return 50\n"
+
+
+def test_results_follow_the_code_not_its_position():
+    test_results = {
+        ExecutionMatrix.code_key(FIRST): [True, False],
+        ExecutionMatrix.code_key(SECOND): [True, True]
+    }
+
+    # Filtering dropped FIRST, so SECOND is now the first code
+    assert test_coverage.TestCoverageScoringStrategy().score([SECOND], test_results) == [1.0]
+    assert test_coverage.TestCoverageScoringStrategy(test_results).score([SECOND, FIRST]) == [1.0, 0.5]
+
+
+def test_lookup_ignores_formatting_differences():
+    test_results = {ExecutionMatrix.code_key(FIRST): [True, True, False, False]}
+
+    assert test_coverage.TestCoverageScoringStrategy().score([f"```python\n{FIRST}\n```"], test_results) == [0.5]
+    assert test_coverage.TestCoverageScoringStrategy().score(["def other():\n    pass\n"], test_results) == [0.0]
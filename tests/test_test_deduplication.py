@@ -0,0 +1,51 @@
+from agents import test_deduplication_agent
+
+INPUTS = "rating, maturity"
+
+
+def case(rating, maturity, expected, quote='"'):
+    return f"rating = {quote}{rating}{quote}\nmaturity = {maturity}\n<riskweight>{expected}</riskweight>"
+
+
+def deduplicate(valid, invalid=()):
+    return test_deduplication_agent.TestDeduplicationAgent().deduplicate(list(valid), list(invalid), INPUTS)
+
+
+def test_equivalent_cases_are_kept_once():
+    reordered = 'maturity = 3\nrating = "AAA"\n<riskweight>20</riskweight>'
+
+    result = deduplicate([case("AAA", 3, 20), reordered, case("AAA", 3, 20, quote="'"), case("BBB", 3, 100)])
+
+    assert result["valid_tests"] == [case("AAA", 3, 20), case("BBB", 3, 100)]
+    assert result["dropped"] == {"valid": 2, "invalid": 0}
+    assert result["conflicts"] == []
+
+
+def test_input_types_are_not_merged():
+    result = deduplicate([case("AAA", 3, 20), case("AAA", 3.0, 20)])
+
+    assert len(result["valid_tests"]) == 2
+
+
+def test_majority_wins_a_conflict():
+    result = deduplicate([case("AAA", 3, 20), case("AAA", 3, 20)], [case("AAA", 3, "Invalid input value!")])
+
+    assert result["valid_tests"] == [case("AAA", 3, 20)]
+    assert result["invalid_tests"] == []
+    assert result["conflicts"][0]["kept"] == 20
+    assert result["conflicts"][0]["inputs"] == {"rating": "AAA", "maturity": 3}
+
+
+def test_conflict_without_majority_is_dropped():
+    result = deduplicate([case("AAA", 3, 20)], [case("AAA", 3, "Invalid input value!")])
+
+    assert result["valid_tests"] == [] and result["invalid_tests"] == []
+    assert result["conflicts"][0]["kept"] is None
+
+
+def test_unparseable_cases_only_merge_when_identical():
+    raw = "A AAA rated bond with a maturity of three years has a risk weight of 20%."
+
+    result = deduplicate([raw, raw + "  ", raw.replace("20%", "50%")])
+
+    assert result["valid_tests"] == [raw, raw.replace("20%", "50%")]
@@ -0,0 +1,102 @@
+from agents import test_selection_agent
+from agents.test_case_formatter_agent import INVALID_OUTPUT, render_pytest_function
+from agents.test_selection_agent import extract_test_features
+from app.services.hitl_handler import auto_select_tests
+from graphs.auto_test_selector_node import AutoTestSelectorNode
+
+VALID_TESTS = [
+    render_pytest_function({"rating": "A", "maturity": 5}, 50, 1),
+    render_pytest_function({"rating": "A", "maturity": 3}, 20, 2),
+    render_pytest_function({"rating": "A", "maturity": 4}, 50, 3),
+    render_pytest_function({"rating": "BBB", "maturity": 10}, 100, 4)
+]
+INVALID_TESTS = [
+    render_pytest_function({"rating": "ZZZ", "maturity": 2}, INVALID_OUTPUT, 1),
+    render_pytest_function({"rating": None, "maturity": -1}, INVALID_OUTPUT, 2)
+]
+
+
+def build_agent(**weights):
+    return test_selection_agent.TestSelectionAgent(weights=weights or None)
+
+
+def test_features_are_read_from_the_test_function():
+    features = extract_test_features(f"```python\n{VALID_TESTS[1]}\n```")
+
+    assert features["inputs"] == {"rating": "A", "maturity": 3}
+    assert features["expected"] == 20
+    assert features["ast_size"] > 0
+    assert extract_test_features("def test_case_1(:") is None
+    assert extract_test_features("x = 1") is None
+
+
+def test_boundary_values_favour_edges_and_output_changes():
+    ranking = build_agent(boundary_values=1.0).rank_tests(VALID_TESTS)
+
+    # maturity 3 sits where the expected weight changes, 10 is the largest tested maturity
+    assert [entry["index"] for entry in ranking][:2] == [1, 3]
+    assert ranking[0]["features"]["boundary_values"] == 1.0
+
+
+def test_disagreement_favours_tests_contradicting_similar_ones():
+    ranking = build_agent(disagreement=1.0).rank_tests(VALID_TESTS)
+
+    # Test 1 is the only rating "A" test expecting 20, so it disagrees with both other "A" tests
+    assert ranking[0]["index"] == 1
+
+
+def test_distinct_values_favour_unusual_inputs():
+    ranking = build_agent(distinct_values=1.0).rank_tests(INVALID_TESTS + [render_pytest_function({}, INVALID_OUTPUT, 3)])
+
+    assert ranking[-1]["index"] == 2
+    assert ranking[-1]["score"] == 0.0
+
+
+def test_ranking_is_normalized_and_unparseable_tests_score_zero():
+    ranking = build_agent().rank_tests(VALID_TESTS + ["not a test"])
+
+    assert [entry["score"] for entry in ranking] == sorted((entry["score"] for entry in ranking), reverse=True)
+    assert all(0.0 <= value <= 1.0 for entry in ranking for value in entry["features"].values())
+    assert ranking[-1] == {"index": 4, "score": 0.0, "features": {name: 0.0 for name in test_selection_agent.DEFAULT_FEATURE_WEIGHTS}}
+
+
+def test_confidence_measures_the_lead_over_the_runner_up():
+    agent = build_agent()
+
+    selection = agent.select(VALID_TESTS, INVALID_TESTS[:1])
+    ranking = agent.rank_tests(VALID_TESTS)
+
+    assert selection["valid_index"] == ranking[0]["index"]
+    assert selection["valid_confidence"] == round((ranking[0]["score"] - ranking[1]["score"]) / ranking[0]["score"], 4)
+    assert 0.0 < selection["valid_confidence"] < 1.0
+    # A single candidate is a certain pick, a tie is not
+    assert selection["invalid_confidence"] == 1.0
+    assert agent.select([VALID_TESTS[0]] * 2, [])["valid_confidence"] == 0.0
+
+
+def test_missing_tests_select_nothing():
+    assert build_agent().select([], []) == {
+        "valid_index": None, "valid_confidence": 0.0, "invalid_index": None, "invalid_confidence": 0.0
+    }
+
+
+def test_node_returns_the_selected_tests():
+    node = AutoTestSelectorNode()
+    selection = node.agent.select(VALID_TESTS, INVALID_TESTS)
+
+    result = node.invoke({"formatted_valid_tests": VALID_TESTS, "formatted_invalid_tests": []})
+
+    assert result["selected_valid_test"] == VALID_TESTS[selection["valid_index"]]
+    assert result["selected_invalid_test"] == ""
+    assert result["test_selection"]["source"] == "auto"
+    assert result["test_selection"]["invalid_index"] is None
+
+
+def test_unanswered_human_selection_falls_back_to_the_automatic_pick():
+    selection = build_agent().select(VALID_TESTS, INVALID_TESTS)
+
+    assert auto_select_tests(VALID_TESTS, INVALID_TESTS) == {
+        "valid_index": selection["valid_index"], "invalid_index": selection["invalid_index"]
+    }
+    # The graph needs an index even when a kind has no tests
+    assert auto_select_tests(VALID_TESTS, []) == {"valid_index": selection["valid_index"], "invalid_index": 0}